@@ -0,0 +1,51 @@
+"""
+Micro-benchmark for the verified-JWT cache in main.verify_mcp_token.
+
+    python benchmarks/bench_jwt_cache.py [iterations]
+
+Compares a full jwt.decode on every call with repeat calls served from the cache.
+"""
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MCP_SECRET", "benchmark-secret-benchmark-secret-0123")
+
+import jwt  # noqa: E402
+import main  # noqa: E402
+
+
+class _Request:
+    def __init__(self, token: str):
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+
+def run(iterations: int):
+    token = jwt.encode(
+        {"uid": "bench", "mcp": "github", "exp": int(time.time()) + 3600},
+        main.MCP_SECRET,
+        algorithm="HS256",
+    )
+    request = _Request(token)
+
+    def uncached():
+        main._verified_jwts.clear()
+        main.verify_mcp_token(request)
+
+    def cached():
+        main.verify_mcp_token(request)
+
+    main.verify_mcp_token(request)
+    cold = min(timeit.repeat(uncached, number=iterations, repeat=5)) / iterations
+    warm = min(timeit.repeat(cached, number=iterations, repeat=5)) / iterations
+
+    print(f"iterations per run : {iterations}")
+    print(f"full verification  : {cold * 1e6:8.2f} us/request")
+    print(f"cached verification: {warm * 1e6:8.2f} us/request")
+    print(f"saving             : {(cold - warm) * 1e6:8.2f} us/request ({cold / warm:.1f}x)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
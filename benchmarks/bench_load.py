@@ -0,0 +1,193 @@
+"""
+Load test of /mcp against a local fake GitHub API (benchmarks/fake_github.py).
+
+    python benchmarks/bench_load.py [--concurrency 16] [--requests 200] [--latency-ms 20]
+                                    [--tools list_issues,get_file_contents] [--upstream URL]
+                                    [--redis-url URL] [--json results.json]
+
+Drives every read-only tool through the full stack (JWT check, token lookup,
+dispatch, make_request, serializers, response encoding) and reports
+p50/p95/p99 latency, throughput and process memory per tool. The MCP app and
+the fake API run in-process over ASGI transports unless --upstream points at
+a running fake_github.py; Redis is fakeredis unless --redis-url is given.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+IN_PROCESS_BASE_URL = "http://fake-github.local"
+TOKEN = "gh-benchmark-token"
+
+
+def _scenarios(data) -> dict:
+    """tool name -> function of the request index returning its arguments."""
+    paths = sorted(data.files)
+    repo = {"owner": "octocat", "repo": "hello-world"}
+    return {
+        "get_me": lambda i: {},
+        "list_repos": lambda i: {"limit": 50},
+        "get_repo_details": lambda i: dict(repo),
+        "list_issues": lambda i: {**repo, "limit": 100},
+        "list_pull_requests": lambda i: {**repo, "limit": 50},
+        "get_pull_request": lambda i: {**repo, "pull_number": i % len(data.pulls) + 1},
+        "list_commits": lambda i: {**repo, "limit": 100},
+        "get_commit": lambda i: {**repo, "ref": data.commits[i % len(data.commits)]["sha"]},
+        "list_branches": lambda i: {**repo, "limit": 100},
+        "get_file_contents": lambda i: {**repo, "path": paths[i % len(paths)]},
+        "get_file_lines": lambda i: {**repo, "path": paths[i % len(paths)], "start_line": 10, "end_line": 40},
+        "list_tree": lambda i: {**repo, "path": "src"},
+        "find_files": lambda i: {**repo, "pattern": "**/module_1*.py"},
+    }
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _percentile(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))]
+
+
+def _setup_environment(args):
+    """Configure the app through its environment before it is imported."""
+    os.environ.setdefault("MCP_SECRET", "benchmark-secret-benchmark-secret-0123")
+    os.environ["GITHUB_API_BASE_URL"] = args.upstream or IN_PROCESS_BASE_URL
+    # The fake only speaks REST
+    os.environ["GITHUB_GRAPHQL"] = "false"
+    os.environ["GITHUB_BLOB_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench_blobs_")
+    if args.redis_url:
+        os.environ["REDIS_URL"] = args.redis_url
+
+
+def _use_fakeredis():
+    import fakeredis
+    import main
+    import rate_limit
+    import streaming
+    import tokens
+    import webhooks
+
+    fake = fakeredis.FakeAsyncRedis(decode_responses=True)
+    # Modules bind the client at import time
+    for module in (tokens, main, rate_limit, streaming, webhooks):
+        module.redis_client = fake
+
+
+async def _run_tool(mcp, headers, tool: str, make_args, requests: int, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            body = {"jsonrpc": "2.0", "id": i, "method": "tools/call",
+                    "params": {"name": f"github.{tool_name}", "arguments": make_args(i)}}
+            start = time.perf_counter()
+            response = await mcp.post("/mcp", json=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            result = response.json().get("result") if response.status_code == 200 else None
+            if not isinstance(result, dict) or "error" in result:
+                errors += 1
+
+    tool_name = "get_file_contents" if tool == "get_file_lines" else tool
+    rss_before = _rss_mb()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "tool": tool,
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "p50_ms": _percentile(latencies, 0.50) * 1e3,
+        "p95_ms": _percentile(latencies, 0.95) * 1e3,
+        "p99_ms": _percentile(latencies, 0.99) * 1e3,
+        "rss_mb": _rss_mb(),
+        "rss_delta_mb": _rss_mb() - rss_before,
+    }
+
+
+async def run(args) -> list:
+    _setup_environment(args)
+    import httpx
+    import jwt
+
+    import fake_github
+    import github_api
+    import main
+    import tokens
+
+    if not args.redis_url:
+        _use_fakeredis()
+
+    data = fake_github._Data(args.items, args.files)
+    scenarios = _scenarios(data)
+    selected = args.tools.split(",") if args.tools else list(scenarios)
+    unknown = [t for t in selected if t not in scenarios]
+    if unknown:
+        raise SystemExit(f"Unknown tools: {', '.join(unknown)} (choose from {', '.join(scenarios)})")
+
+    results = []
+    async with main.lifespan(main.app):
+        if not args.upstream:
+            fake = fake_github.create_app(args.latency_ms / 1000, args.items, args.files, base_url=IN_PROCESS_BASE_URL)
+            options = github_api._client_options()
+            options.pop("http2")
+            github_api._async_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=fake), **options)
+
+        await tokens.save_token("bench", TOKEN)
+        mcp_jwt = jwt.encode({"uid": "bench", "mcp": "github", "exp": int(time.time()) + 3600},
+                             main.MCP_SECRET, algorithm="HS256")
+        headers = {"Authorization": f"Bearer {mcp_jwt}", "Accept-Encoding": "gzip"}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://mcp",
+                                     timeout=60) as mcp:
+            for tool in selected:
+                # Warm-up: first-call costs (caches, connection setup) are not what we measure
+                await _run_tool(mcp, headers, tool, scenarios[tool], min(args.concurrency, args.requests), args.concurrency)
+                results.append(await _run_tool(mcp, headers, tool, scenarios[tool], args.requests, args.concurrency))
+    return results
+
+
+def _report(results: list, args):
+    print(f"concurrency={args.concurrency} requests/tool={args.requests} upstream latency={args.latency_ms}ms "
+          f"upstream={'in-process' if not args.upstream else args.upstream}")
+    print(f"{'tool':20} {'req':>6} {'err':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rss MB':>8} {'Δrss':>6}")
+    for r in results:
+        print(f"{r['tool']:20} {r['requests']:6d} {r['errors']:5d} {r['throughput']:9.1f} {r['p50_ms']:8.2f} "
+              f"{r['p95_ms']:8.2f} {r['p99_ms']:8.2f} {r['rss_mb']:8.1f} {r['rss_delta_mb']:6.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per tool")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="added to every fake GitHub response")
+    parser.add_argument("--items", type=int, default=300, help="size of every fake listing")
+    parser.add_argument("--files", type=int, default=500, help="files in the fake repository")
+    parser.add_argument("--tools", help="comma-separated subset, e.g. list_issues,get_commit")
+    parser.add_argument("--upstream", help="base URL of a running fake_github.py instead of the in-process one")
+    parser.add_argument("--redis-url", help="use this Redis instead of fakeredis")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    _report(results, args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
@@ -0,0 +1,75 @@
+"""
+Micro-benchmark for /mcp response encoding and compression.
+
+    python benchmarks/bench_mcp_encoding.py [issues]
+
+Encodes a list_issues-sized tools/call response the way FastAPI did before
+(jsonable_encoder + JSONResponse) and through main._mcp_response, and reports
+encode time and bytes on the wire for identity, gzip and br (if installed).
+"""
+import os
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MCP_SECRET", "benchmark-secret-benchmark-secret-0123")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+import main  # noqa: E402
+from utils import responses  # noqa: E402
+
+
+class _Request:
+    def __init__(self, accept_encoding: str = None):
+        self.headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+
+
+def _payload(count: int) -> dict:
+    rng = random.Random(0)
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(500)]
+    issues = [
+        {
+            "id": 1000000 + i,
+            "number": i,
+            "title": " ".join(rng.choices(words, k=8)),
+            "state": "open",
+            "url": f"https://github.com/octo/repo/issues/{i}",
+            "created_at": "2024-01-01T00:00:00Z",
+            "updated_at": "2024-01-02T00:00:00Z",
+            "comments": rng.randint(0, 40),
+            "author": rng.choice(words),
+            "body": " ".join(rng.choices(words, k=400)),
+        }
+        for i in range(count)
+    ]
+    return {"jsonrpc": "2.0", "id": 1, "result": {"items": issues, "next_cursor": None}}
+
+
+def _time(fn, number: int = 20) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def run(count: int):
+    payload = _payload(count)
+
+    before = _time(lambda: JSONResponse(jsonable_encoder(payload)))
+    before_bytes = len(JSONResponse(jsonable_encoder(payload)).body)
+    print(f"issues             : {count}")
+    print(f"json encoder       : {'orjson' if responses.orjson else 'stdlib'}")
+    print(f"{'before (FastAPI)':19}: {before * 1e3:8.2f} ms  {before_bytes:>9} bytes")
+
+    codings = [None, "gzip"] + (["br"] if responses.brotli else [])
+    for coding in codings:
+        request = _Request(coding)
+        elapsed = _time(lambda: main._mcp_response(request, payload))
+        size = len(main._mcp_response(request, payload).body)
+        label = f"after ({coding or 'identity'})"
+        print(f"{label:19}: {elapsed * 1e3:8.2f} ms  {size:>9} bytes ({before_bytes / size:.1f}x smaller)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100)
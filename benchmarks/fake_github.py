@@ -0,0 +1,248 @@
+"""
+Local stand-in for the parts of api.github.com the tools use, for benchmarks.
+
+    python benchmarks/fake_github.py [--port 8765] [--latency-ms 50] [--items 300]
+
+Serves deterministic, realistically sized payloads with ETags (and 304s),
+Link-header pagination and X-RateLimit-* headers per token. Every repository
+has the same contents, so any owner/repo works. bench_load.py mounts it
+in-process by default; run it standalone to put a real socket in between.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import string
+import time
+
+from fastapi import FastAPI, Request, Response
+
+RATE_LIMIT = 5000
+SHA_MEDIA_TYPE = "application/vnd.github.sha"
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+
+
+def _sha(*parts) -> str:
+    return hashlib.sha1("/".join(str(p) for p in parts).encode()).hexdigest()
+
+
+class _Data:
+    """Deterministic fixture data, generated once."""
+
+    def __init__(self, items: int, files: int, seed: int = 0):
+        rng = random.Random(seed)
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))) for _ in range(800)]
+
+        def text(n):
+            return " ".join(rng.choices(words, k=n))
+
+        self.user = {
+            "login": "octocat", "id": 1, "name": "The Octocat", "html_url": "https://github.com/octocat",
+            "type": "User", "site_admin": False, "public_repos": items, "followers": 100,
+        }
+        owner = {"login": "octocat", "id": 1, "html_url": "https://github.com/octocat", "type": "User"}
+        self.repos = [
+            {
+                "id": 1000 + i, "name": f"repo-{i}", "full_name": f"octocat/repo-{i}", "private": i % 3 == 0,
+                "owner": owner, "html_url": f"https://github.com/octocat/repo-{i}", "description": text(12),
+                "fork": False, "created_at": "2020-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z",
+                "pushed_at": "2024-01-01T00:00:00Z", "language": rng.choice(["Python", "Go", "TypeScript"]),
+                "stargazers_count": rng.randint(0, 5000), "forks_count": rng.randint(0, 500),
+                "open_issues_count": rng.randint(0, 100), "default_branch": "main",
+                "topics": rng.sample(words, 3), "visibility": "public",
+            }
+            for i in range(items)
+        ]
+        self.issues = [
+            {
+                "id": 50000 + i, "number": i + 1, "title": text(8), "state": "open", "user": owner,
+                "html_url": f"https://github.com/octocat/repo/issues/{i + 1}", "body": text(rng.randint(50, 600)),
+                "labels": [{"name": w} for w in rng.sample(words, 2)], "comments": rng.randint(0, 30),
+                "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-02-01T00:00:00Z",
+                "author_association": "OWNER", "locked": False,
+            }
+            for i in range(items)
+        ]
+        self.pulls = [
+            {
+                "id": 90000 + i, "number": i + 1, "title": text(8), "state": "open", "user": owner,
+                "html_url": f"https://github.com/octocat/repo/pull/{i + 1}", "body": text(rng.randint(50, 400)),
+                "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-02-01T00:00:00Z", "merged_at": None,
+                "draft": False, "head": {"ref": f"feature-{i}", "sha": _sha("pr-head", i)},
+                "base": {"ref": "main", "sha": _sha("main", 0)},
+                "mergeable": True, "mergeable_state": "clean", "merged": False,
+                "additions": rng.randint(1, 500), "deletions": rng.randint(0, 300), "changed_files": rng.randint(1, 20),
+            }
+            for i in range(items)
+        ]
+        self.commits = [
+            {
+                "sha": _sha("commit", i), "html_url": f"https://github.com/octocat/repo/commit/{_sha('commit', i)}",
+                "commit": {
+                    "message": text(rng.randint(5, 40)),
+                    "author": {"name": "The Octocat", "email": "octocat@github.com", "date": "2024-01-01T00:00:00Z"},
+                    "committer": {"name": "GitHub", "email": "noreply@github.com", "date": "2024-01-01T00:00:00Z"},
+                    "tree": {"sha": _sha("tree", i)},
+                },
+                "author": owner, "committer": owner, "parents": [{"sha": _sha("commit", i + 1)}],
+            }
+            for i in range(items)
+        ]
+        self.branches = [
+            {"name": "main" if i == 0 else f"feature-{i}", "commit": {"sha": _sha("commit", i)}, "protected": i == 0}
+            for i in range(min(items, 200))
+        ]
+        self.head = self.commits[0]["sha"]
+
+        dirs = ["src", "src/core", "src/api", "tests", "docs", "scripts"]
+        self.files = {}
+        for i in range(files):
+            path = f"{rng.choice(dirs)}/module_{i}.py"
+            lines = [f"# {text(6)}"] + [f"def f_{i}_{n}(x):\n    return x * {n}  # {text(4)}" for n in range(rng.randint(20, 200))]
+            self.files[path] = ("\n".join(lines) + "\n").encode()
+        self.tree = []
+        for d in dirs:
+            self.tree.append({"path": d, "mode": "040000", "type": "tree", "sha": _sha("dir", d)})
+        for path, content in sorted(self.files.items()):
+            self.tree.append({"path": path, "mode": "100644", "type": "blob", "sha": self.blob_sha(content), "size": len(content)})
+
+    @staticmethod
+    def blob_sha(content: bytes) -> str:
+        return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def create_app(latency: float = 0.0, items: int = 300, files: int = 500, base_url: str = "https://api.github.com"):
+    """Build the fake API. `latency` (seconds) is added to every response."""
+    app = FastAPI()
+    data = _Data(items, files)
+    budgets = {}
+    base_url = base_url.rstrip("/")
+
+    def _rate_headers(request: Request, spend: bool) -> dict:
+        token = request.headers.get("Authorization", "")
+        now = int(time.time())
+        remaining, reset = budgets.get(token, (RATE_LIMIT, now + 3600))
+        if reset <= now:
+            remaining, reset = RATE_LIMIT, now + 3600
+        if spend:
+            remaining = max(remaining - 1, 0)
+        budgets[token] = (remaining, reset)
+        return {
+            "X-RateLimit-Limit": str(RATE_LIMIT),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(reset),
+            "X-RateLimit-Resource": "core",
+        }
+
+    async def _reply(request: Request, body, link: str = None, media_type: str = "application/json"):
+        if latency:
+            await asyncio.sleep(latency)
+        content = body if isinstance(body, bytes) else json.dumps(body).encode()
+        etag = '"%s"' % hashlib.md5(content).hexdigest()
+        # Conditional requests that match are free, as on GitHub
+        if request.headers.get("If-None-Match") == etag:
+            return Response(status_code=304, headers={"ETag": etag, **_rate_headers(request, False)})
+        headers = {"ETag": etag, **_rate_headers(request, True)}
+        if link:
+            headers["Link"] = link
+        return Response(content=content, media_type=media_type, headers=headers)
+
+    async def _not_found(request: Request):
+        if latency:
+            await asyncio.sleep(latency)
+        return Response(
+            content=b'{"message":"Not Found"}', status_code=404, media_type="application/json",
+            headers=_rate_headers(request, True),
+        )
+
+    async def _page(request: Request, items: list):
+        per_page = min(int(request.query_params.get("per_page", 30)), 100)
+        page = max(int(request.query_params.get("page", 1)), 1)
+        chunk = items[(page - 1) * per_page:page * per_page]
+        link = None
+        if page * per_page < len(items):
+            query = dict(request.query_params, page=str(page + 1), per_page=str(per_page))
+            url = f"{base_url}{request.url.path}?" + "&".join(f"{k}={v}" for k, v in query.items())
+            link = f'<{url}>; rel="next"'
+        return await _reply(request, chunk, link)
+
+    @app.get("/user")
+    async def user(request: Request):
+        return await _reply(request, data.user)
+
+    @app.get("/user/repos")
+    async def user_repos(request: Request):
+        return await _page(request, data.repos)
+
+    @app.get("/repos/{owner}/{repo}")
+    async def repo_details(request: Request, owner: str, repo: str):
+        return await _reply(request, {**data.repos[0], "name": repo, "full_name": f"{owner}/{repo}"})
+
+    @app.get("/repos/{owner}/{repo}/issues")
+    async def issues(request: Request, owner: str, repo: str):
+        return await _page(request, data.issues)
+
+    @app.get("/repos/{owner}/{repo}/pulls")
+    async def pulls(request: Request, owner: str, repo: str):
+        return await _page(request, data.pulls)
+
+    @app.get("/repos/{owner}/{repo}/pulls/{number}")
+    async def pull(request: Request, owner: str, repo: str, number: int):
+        if not 1 <= number <= len(data.pulls):
+            return await _not_found(request)
+        return await _reply(request, data.pulls[number - 1])
+
+    @app.get("/repos/{owner}/{repo}/commits")
+    async def commits(request: Request, owner: str, repo: str):
+        return await _page(request, data.commits)
+
+    @app.get("/repos/{owner}/{repo}/commits/{ref}")
+    async def commit(request: Request, owner: str, repo: str, ref: str):
+        sha = data.head if ref in ("HEAD", "main") else ref
+        if SHA_MEDIA_TYPE in request.headers.get("Accept", ""):
+            return await _reply(request, sha.encode(), media_type=SHA_MEDIA_TYPE)
+        found = next((c for c in data.commits if c["sha"] == sha), None)
+        if found is None:
+            return await _not_found(request)
+        return await _reply(request, found)
+
+    @app.get("/repos/{owner}/{repo}/branches")
+    async def branches(request: Request, owner: str, repo: str):
+        return await _page(request, data.branches)
+
+    @app.get("/repos/{owner}/{repo}/git/trees/{sha}")
+    async def tree(request: Request, owner: str, repo: str, sha: str):
+        return await _reply(request, {"sha": sha, "tree": data.tree, "truncated": False})
+
+    @app.get("/repos/{owner}/{repo}/contents/{path:path}")
+    async def contents(request: Request, owner: str, repo: str, path: str):
+        content = data.files.get(path)
+        if content is None:
+            return await _not_found(request)
+        if RAW_MEDIA_TYPE in request.headers.get("Accept", ""):
+            return await _reply(request, content, media_type=RAW_MEDIA_TYPE)
+        return await _reply(request, {
+            "type": "file", "name": path.rsplit("/", 1)[-1], "path": path, "sha": data.blob_sha(content),
+            "size": len(content), "encoding": "base64", "content": base64.encodebytes(content).decode(),
+            "html_url": f"https://github.com/{owner}/{repo}/blob/main/{path}",
+        })
+
+    app.state.data = data
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--files", type=int, default=500)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency_ms / 1000, args.items, args.files, base_url=f"http://127.0.0.1:{args.port}"),
+        host="127.0.0.1", port=args.port, log_level="warning",
+    )
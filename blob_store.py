@@ -0,0 +1,180 @@
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from config import BLOB_CACHE_DIR, BLOB_CACHE_MAX_BYTES
+import metrics
+
+# Content-addressed store of Git blobs on local disk, keyed by blob SHA.
+# A blob's content never changes, so entries are only evicted (LRU) to stay
+# under BLOB_CACHE_MAX_BYTES. Reads are memory-mapped, never copied whole.
+# Directories are created 0700 and files 0600 (mkstemp), as blobs may be private.
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # sha -> size, least recently used first
+_total = 0
+_loaded = False
+hits = 0
+misses = 0
+
+def enabled() -> bool:
+    return bool(BLOB_CACHE_DIR) and BLOB_CACHE_MAX_BYTES > 0
+
+def _path(sha: str) -> str:
+    return os.path.join(BLOB_CACHE_DIR, sha[:2], sha[2:])
+
+def _load():
+    """Rebuild the LRU index from disk on first use, oldest access first."""
+    global _loaded, _total
+    if _loaded:
+        return
+    found = []
+    if os.path.isdir(BLOB_CACHE_DIR):
+        for shard in os.listdir(BLOB_CACHE_DIR):
+            shard_dir = os.path.join(BLOB_CACHE_DIR, shard)
+            if len(shard) != 2 or not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                try:
+                    st = os.stat(os.path.join(shard_dir, name))
+                except OSError:
+                    continue
+                found.append((st.st_mtime, shard + name, st.st_size))
+    for _, sha, size in sorted(found):
+        _entries[sha] = size
+        _total += size
+    _loaded = True
+
+def _evict():
+    global _total
+    while _total > BLOB_CACHE_MAX_BYTES and _entries:
+        sha, size = _entries.popitem(last=False)
+        _total -= size
+        try:
+            os.remove(_path(sha))
+        except OSError:
+            pass
+
+def git_blob_sha(size: int):
+    """Start a Git blob hash: sha1(b"blob <size>\\0" + content)."""
+    return hashlib.sha1(f"blob {size}\0".encode())
+
+@contextmanager
+def open_blob(sha: str):
+    """
+    Yield a read-only memory map of a cached blob (b"" for an empty blob),
+    or None when it is not cached.
+    """
+    global hits, misses
+    if not enabled():
+        yield None
+        return
+    with _lock:
+        _load()
+        cached = sha in _entries
+        if cached:
+            _entries.move_to_end(sha)
+            hits += 1
+        else:
+            misses += 1
+    if not cached:
+        yield None
+        return
+    try:
+        f = open(_path(sha), "rb")
+    except OSError:
+        with _lock:
+            _discard(sha)
+        yield None
+        return
+    with f:
+        # Record the access so LRU order survives a restart
+        os.utime(f.fileno())
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+def _discard(sha: str):
+    global _total
+    size = _entries.pop(sha, None)
+    if size is not None:
+        _total -= size
+
+def _commit(tmp_path: str, sha: str, size: int):
+    global _total
+    os.makedirs(os.path.dirname(_path(sha)), mode=0o700, exist_ok=True)
+    os.replace(tmp_path, _path(sha))
+    with _lock:
+        _load()
+        _discard(sha)
+        _entries[sha] = size
+        _total += size
+        _evict()
+
+class BlobWriter:
+    """Spool streamed content to a temp file and add it to the store once complete."""
+
+    def __init__(self):
+        os.makedirs(BLOB_CACHE_DIR, mode=0o700, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=BLOB_CACHE_DIR, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+        self.size = 0
+
+    def write(self, chunk):
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def commit(self, expected_sha: str = None):
+        """
+        Hash what was written and store it under its blob SHA.
+        Returns the SHA, or None if it does not match `expected_sha` or is too large to keep.
+        """
+        self._file.close()
+        digest = git_blob_sha(self.size)
+        with open(self.tmp_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        sha = digest.hexdigest()
+        if (expected_sha and sha != expected_sha) or self.size > BLOB_CACHE_MAX_BYTES:
+            self.abort()
+            return None
+        _commit(self.tmp_path, sha, self.size)
+        return sha
+
+    def abort(self):
+        self._file.close()
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+def put(data: bytes, expected_sha: str = None):
+    """Store a blob that is already in memory; returns its SHA or None."""
+    if not enabled():
+        return None
+    digest = git_blob_sha(len(data))
+    digest.update(data)
+    sha = digest.hexdigest()
+    if (expected_sha and sha != expected_sha) or len(data) > BLOB_CACHE_MAX_BYTES:
+        return None
+    with _lock:
+        _load()
+        if sha in _entries:
+            return sha
+    os.makedirs(BLOB_CACHE_DIR, mode=0o700, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=BLOB_CACHE_DIR, suffix=".part")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    _commit(tmp_path, sha, len(data))
+    return sha
+
+def stats() -> dict:
+    return {"size": len(_entries), "bytes": _total, "hits": hits, "misses": misses}
+
+metrics.CACHES.register("blob_store", stats)
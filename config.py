@@ -8,12 +8,109 @@ CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 MCP_SECRET = os.getenv("MCP_SECRET")
 
-GITHUB_API_BASE_URL = "https://api.github.com"
+# In-process cache in front of Redis token lookups
+TOKEN_CACHE_TTL = float(os.getenv("GITHUB_TOKEN_CACHE_TTL", "300"))
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_TOKEN_CACHE_MAX_ENTRIES", "10000"))
+
+# Verified MCP JWTs, kept until their exp claim (capped by the max TTL)
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("MCP_JWT_CACHE_MAX_ENTRIES", "10000"))
+JWT_CACHE_MAX_TTL = float(os.getenv("MCP_JWT_CACHE_MAX_TTL", "3600"))
+
+# Max tools/call entries of one JSON-RPC batch that run at the same time
+MCP_BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", "8"))
+
+# SSE (Streamable HTTP) messages buffered per stream before a tool call waits for the client
+SSE_QUEUE_SIZE = int(os.getenv("MCP_SSE_QUEUE_SIZE", "16"))
+
+# /mcp responses larger than this are gzip/br compressed when the client accepts it
+MCP_COMPRESS_MIN_BYTES = int(os.getenv("MCP_COMPRESS_MIN_BYTES", "1024"))
+MCP_GZIP_LEVEL = int(os.getenv("MCP_GZIP_LEVEL", "1"))
+MCP_BROTLI_QUALITY = int(os.getenv("MCP_BROTLI_QUALITY", "4"))
+
+GITHUB_API_BASE_URL = os.getenv("GITHUB_API_BASE_URL", "https://api.github.com")
 MAX_LIMIT = 30
 
-def safe_limit(limit: int) -> int:
+# Link-header pagination for list tools
+PAGE_SIZE = 100
+MAX_ITEMS = int(os.getenv("GITHUB_MAX_ITEMS", "1000"))
+
+# Shared HTTP client pool for GitHub API calls
+HTTP_MAX_CONNECTIONS = int(os.getenv("GITHUB_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("GITHUB_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("GITHUB_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("GITHUB_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_TIMEOUT = float(os.getenv("GITHUB_HTTP_TIMEOUT", "10"))
+HTTP2_ENABLED = os.getenv("GITHUB_HTTP2", "false").lower() == "true"
+
+# Ranged / line-window reads of file contents
+FILE_WINDOW_MAX_BYTES = int(os.getenv("GITHUB_FILE_WINDOW_MAX_BYTES", "1000000"))
+FILE_WINDOW_DEFAULT_LINES = int(os.getenv("GITHUB_FILE_WINDOW_DEFAULT_LINES", "500"))
+
+# Multi-file commits through the Git Data API
+COMMIT_BLOB_CONCURRENCY = int(os.getenv("GITHUB_COMMIT_BLOB_CONCURRENCY", "8"))
+COMMIT_MAX_RETRIES = int(os.getenv("GITHUB_COMMIT_MAX_RETRIES", "3"))
+
+# Recursive tree index per commit SHA (never expires, bounded by size)
+TREE_INDEX_MAX_TREES = int(os.getenv("GITHUB_TREE_INDEX_MAX_TREES", "64"))
+TREE_INDEX_MAX_PATHS = int(os.getenv("GITHUB_TREE_INDEX_MAX_PATHS", "1000000"))
+
+# github.get_pull_request_bundle: parallel part fetches, per-part timeout and size budget
+PR_BUNDLE_CONCURRENCY = int(os.getenv("GITHUB_PR_BUNDLE_CONCURRENCY", "4"))
+PR_BUNDLE_PART_TIMEOUT = float(os.getenv("GITHUB_PR_BUNDLE_PART_TIMEOUT", "15"))
+PR_BUNDLE_MAX_BYTES = int(os.getenv("GITHUB_PR_BUNDLE_MAX_BYTES", "100000"))
+PR_BUNDLE_MAX_ITEMS = 100
+
+# github.get_diff: size budget for the hunks returned by one call
+DIFF_MAX_BYTES = int(os.getenv("GITHUB_DIFF_MAX_BYTES", "100000"))
+
+# Opt-in SQLite mirror of issues and pull requests: set GITHUB_MIRROR_DB to a file path.
+# It holds private repository data, so it is created readable by this user only.
+# Queries delta-sync first unless the same token synced within GITHUB_MIRROR_SYNC_INTERVAL seconds.
+MIRROR_DB_PATH = os.getenv("GITHUB_MIRROR_DB", "")
+MIRROR_SYNC_INTERVAL = float(os.getenv("GITHUB_MIRROR_SYNC_INTERVAL", "0"))
+
+# Opt-in content-addressed blob cache on local disk: set GITHUB_BLOB_CACHE_DIR to a directory.
+# Like the mirror, it is created readable by this user only.
+BLOB_CACHE_DIR = os.getenv("GITHUB_BLOB_CACHE_DIR", "")
+BLOB_CACHE_MAX_BYTES = int(os.getenv("GITHUB_BLOB_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+
+# Use GraphQL v4 (projected fields only) for list/get tools, falling back to REST.
+# github.list_issues always uses REST, whose listing includes pull requests.
+# Off by default: GraphQL POSTs bypass ETag revalidation, request coalescing and
+# webhook-backed fresh serving, and every poll is billed against the GraphQL budget.
+GRAPHQL_ENABLED = os.getenv("GITHUB_GRAPHQL", "false").lower() == "true"
+
+# Conditional-request (ETag / Last-Modified) cache for GET calls
+ETAG_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_ETAG_CACHE_MAX_ENTRIES", "2048"))
+ETAG_CACHE_MAX_BYTES = int(os.getenv("GITHUB_ETAG_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Seconds a cached repository response is served without revalidation (0 = always revalidate).
+# Only safe to raise when GitHub webhooks are delivered to /webhooks/github.
+ETAG_FRESH_TTL = float(os.getenv("GITHUB_ETAG_FRESH_TTL", "0"))
+GITHUB_WEBHOOK_SECRET = os.getenv("GITHUB_WEBHOOK_SECRET")
+
+# Cache for SHA-addressed responses (commits, trees, blobs, compares), which never change
+IMMUTABLE_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_IMMUTABLE_CACHE_MAX_ENTRIES", "4096"))
+IMMUTABLE_CACHE_MAX_BYTES = int(os.getenv("GITHUB_IMMUTABLE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Coalescing of identical in-flight GET requests; optionally across workers through Redis
+SINGLEFLIGHT_REDIS = os.getenv("GITHUB_SINGLEFLIGHT_REDIS", "false").lower() == "true"
+SINGLEFLIGHT_LOCK_TTL = float(os.getenv("GITHUB_SINGLEFLIGHT_LOCK_TTL", "10"))
+SINGLEFLIGHT_RESULT_TTL = float(os.getenv("GITHUB_SINGLEFLIGHT_RESULT_TTL", "2"))
+SINGLEFLIGHT_MAX_BYTES = int(os.getenv("GITHUB_SINGLEFLIGHT_MAX_BYTES", str(1024 * 1024)))
+
+# Rate-limit budget tracking and secondary-limit throttling
+RATE_LIMIT_MAX_WAIT = float(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", "30"))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("GITHUB_RATE_LIMIT_MAX_RETRIES", "2"))
+RATE_LIMIT_SYNC_INTERVAL = float(os.getenv("GITHUB_RATE_LIMIT_SYNC_INTERVAL", "5"))
+RATE_LIMIT_LOW_WATERMARK = int(os.getenv("GITHUB_RATE_LIMIT_LOW_WATERMARK", "50"))
+SECONDARY_LIMIT_INTERVAL = float(os.getenv("GITHUB_SECONDARY_LIMIT_INTERVAL", "1"))
+SECONDARY_LIMIT_COOLDOWN = float(os.getenv("GITHUB_SECONDARY_LIMIT_COOLDOWN", "60"))
+# Minimum spacing of one token's search requests (search is throttled apart from core calls)
+SEARCH_MIN_INTERVAL = float(os.getenv("GITHUB_SEARCH_MIN_INTERVAL", "1"))
+
+def safe_limit(limit: int, maximum: int = MAX_LIMIT) -> int:
     try:
         val = int(limit)
-        return min(val, MAX_LIMIT)
+        return max(1, min(val, maximum))
     except Exception:
         return 10
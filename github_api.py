@@ -1,5 +1,120 @@
-import requests
-from config import GITHUB_API_BASE_URL
+import json as jsonlib
+import re
+import time
+from contextlib import aclosing, asynccontextmanager
+import httpx
+from config import (
+    GITHUB_API_BASE_URL,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_TIMEOUT,
+    HTTP2_ENABLED,
+    ETAG_CACHE_MAX_ENTRIES,
+    ETAG_CACHE_MAX_BYTES,
+    ETAG_FRESH_TTL,
+    IMMUTABLE_CACHE_MAX_ENTRIES,
+    IMMUTABLE_CACHE_MAX_BYTES,
+    RATE_LIMIT_MAX_RETRIES,
+    PAGE_SIZE,
+)
+import metrics
+import rate_limit
+import singleflight
+import streaming
+from tokens import token_fingerprint
+from utils.cache import LRUCache
+from urllib.parse import parse_qsl
+from utils.pagination import parse_link_header, relative_endpoint, with_query, encode_cursor, decode_cursor
+
+_client = None
+_async_client = None
+
+# Validators and bodies of previous GET responses, keyed per token
+# Bounded by body size too: entries hold whole trees, listing pages and file contents
+_etag_cache = LRUCache(ETAG_CACHE_MAX_ENTRIES, max_weight=ETAG_CACHE_MAX_BYTES, weigh=lambda v: len(v["body"]))
+metrics.CACHES.register("github_etag", _etag_cache)
+
+# Counters per (owner, repo, area), bumped when a webhook reports a change there.
+# Within ETAG_FRESH_TTL a cached response is served without revalidation, but
+# only while the counter of its area is unchanged since it was fetched.
+_generations = {}
+# Fresh serving also needs this worker to be subscribed to invalidations from the others
+_invalidations_live = False
+
+_REPO_SCOPED = re.compile(r"^repos/([^/]+)/([^/?]+)(?:/([^/?]+))?")
+_AREAS = {
+    "issues": "issues",
+    "pulls": "pulls",
+    "commits": "code",
+    "branches": "code",
+    "tags": "code",
+    "git": "code",
+    "contents": "code",
+    "readme": "code",
+    "compare": "code",
+}
+
+# Bodies of responses addressed by a full commit/tree/blob SHA. They can never
+# change, so they are served without revalidation and only evicted for space.
+_immutable_cache = LRUCache(IMMUTABLE_CACHE_MAX_ENTRIES, max_weight=IMMUTABLE_CACHE_MAX_BYTES, weigh=lambda v: len(v[0]))
+metrics.CACHES.register("github_immutable", _immutable_cache)
+
+_SHA = r"[0-9a-f]{40}"
+_IMMUTABLE_PATHS = re.compile(
+    rf"^repos/[^/]+/[^/]+/(?:commits/{_SHA}|git/(?:commits|trees|blobs)/{_SHA}|compare/{_SHA}\.\.\.?{_SHA})$"
+)
+_CONTENTS_PATH = re.compile(r"^repos/[^/]+/[^/]+/contents(?:/|$)")
+_FULL_SHA = re.compile(rf"^{_SHA}$")
+
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _client_options() -> dict:
+    return {
+        "base_url": GITHUB_API_BASE_URL,
+        "http2": _http2_available(),
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    }
+
+def get_client() -> httpx.Client:
+    """
+    Return the process-wide synchronous GitHub API client, creating it on first use.
+    Connections are pooled and kept alive between tool calls.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.Client(**_client_options())
+    return _client
+
+def get_async_client() -> httpx.AsyncClient:
+    """Return the process-wide asynchronous GitHub API client, creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(**_client_options())
+    return _async_client
+
+async def close_client():
+    """Close the shared clients and release pooled connections."""
+    global _client, _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _client is not None:
+        _client.close()
+        _client = None
 
 def _headers(token: str):
     return {
@@ -8,33 +123,362 @@ def _headers(token: str):
         "X-GitHub-Api-Version": "2022-11-28"
     }
 
-def make_request(method: str, endpoint: str, token: str, params=None, json=None):
+def _cache_key(method: str, endpoint: str, token: str, params=None, accept: str = None):
+    if method.upper() != "GET":
+        return None
+    params_key = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return (token_fingerprint(token), "GET", endpoint.lstrip("/"), params_key, accept)
+
+def _immutable_key(method: str, endpoint: str, token: str, params=None, accept: str = None):
+    """
+    Cache key for a GET whose response can never change: commits, git objects
+    and compares named by full SHAs, and contents read at a full-SHA `ref`.
+    Returns None for anything addressed by a branch, tag or short SHA.
+    """
+    if method.upper() != "GET":
+        return None
+    path, _, query = endpoint.lstrip("/").partition("?")
+    query = dict(parse_qsl(query))
+    query.update({str(k): str(v) for k, v in (params or {}).items()})
+    immutable = _IMMUTABLE_PATHS.match(path) or (
+        _CONTENTS_PATH.match(path) and _FULL_SHA.match(query.get("ref", ""))
+    )
+    if not immutable:
+        return None
+    # Still per token: a cached object must not leak to a token without access
+    return (token_fingerprint(token), path, tuple(sorted(query.items())), accept)
+
+def _immutable_body(ikey, accept: str = None):
+    """Return (body, link) for a cached immutable response, or None."""
+    cached = _immutable_cache.get(ikey) if ikey else None
+    if cached is None:
+        return None
+    content, link = cached
+    if not _is_json(accept):
+        return content.decode(), link
+    return jsonlib.loads(content), link
+
+def _remember_immutable(ikey, response: httpx.Response, cached=None):
+    if not ikey:
+        return
+    if response.status_code == 200:
+        _immutable_cache.set(ikey, (response.content, response.headers.get("Link")))
+    elif response.status_code == 304 and cached:
+        _immutable_cache.set(ikey, (cached["body"], cached["link"]))
+
+def _is_json(accept: str = None) -> bool:
+    return accept is None or "json" in accept
+
+def _scope(endpoint: str):
+    """(owner, repo, area) of a repository endpoint webhooks can invalidate, or None."""
+    match = _REPO_SCOPED.match(endpoint.lstrip("/"))
+    if not match:
+        return None
+    owner, repo, sub = match.groups()
+    area = "repo" if sub is None else _AREAS.get(sub)
+    if area is None:
+        return None
+    return owner.lower(), repo.lower(), area
+
+def invalidate(owner: str, repo: str, areas):
+    """Stop serving cached responses of these areas of a repository without revalidating them."""
+    for area in areas:
+        scope = (owner.lower(), repo.lower(), area)
+        _generations[scope] = _generations.get(scope, 0) + 1
+
+def set_invalidations_live(live: bool):
+    global _invalidations_live
+    _invalidations_live = live
+
+def _generation(key):
+    scope = _scope(key[2]) if key else None
+    return None if scope is None else _generations.get(scope, 0)
+
+def _is_fresh(key, cached) -> bool:
+    if not cached or ETAG_FRESH_TTL <= 0 or not _invalidations_live or cached["generation"] is None:
+        return False
+    return (
+        time.monotonic() - cached["stored"] < ETAG_FRESH_TTL
+        and cached["generation"] == _generation(key)
+    )
+
+def _cached_body(cached, accept: str = None):
+    if not _is_json(accept):
+        return cached["body"].decode(), cached["link"]
+    return jsonlib.loads(cached["body"]), cached["link"]
+
+def _prepare(method: str, endpoint: str, token: str, params=None, accept: str = None):
+    """
+    Build request headers, adding If-None-Match / If-Modified-Since when a
+    previous response for the same token, endpoint and params is cached.
+    Returns (headers, cache_key, cached_entry, generation); the generation is
+    read before the request is sent, so a change during it is not missed.
+    """
+    headers = _headers(token)
+    if accept:
+        headers["Accept"] = accept
+    key = _cache_key(method, endpoint, token, params, accept)
+    cached = _etag_cache.get(key) if key else None
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+    return headers, key, cached, _generation(key)
+
+def _parse_response(response: httpx.Response, key=None, cached=None, accept: str = None, generation=None):
+    """
+    Return (body, link_header) for a response, raising on HTTP errors.
+    Bodies are parsed as JSON unless a non-JSON media type was requested.
+    """
+    # 304 Not Modified: serve the stored body, this does not count against the rate limit
+    if response.status_code == 304 and cached:
+        cached["stored"] = time.monotonic()
+        cached["generation"] = generation
+        return _cached_body(cached, accept)
+
+    response.raise_for_status()
+
+    # Handle endpoints that return 204 No Content
+    if response.status_code == 204:
+        return {"status": "success"}, None
+
+    body = response.json() if _is_json(accept) else response.text
+    link = response.headers.get("Link")
+    if key:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            _etag_cache.set(key, {
+                "etag": etag,
+                "last_modified": last_modified,
+                "body": response.content,
+                "link": link,
+                "stored": time.monotonic(),
+                "generation": generation,
+            })
+    return body, link
+
+def _observe(method: str, endpoint: str, start: float, response: httpx.Response = None):
+    """Record latency and status of one GitHub request ("error" when none was received)."""
+    template = metrics.endpoint_template(endpoint)
+    metrics.GITHUB_LATENCY.observe(time.perf_counter() - start, method, template)
+    metrics.GITHUB_RESPONSES.inc(method, template, response.status_code if response is not None else "error")
+
+def _error_result(e: Exception) -> dict:
+    error_msg = str(e)
+    if isinstance(e, httpx.HTTPStatusError):
+        try:
+            error_msg = e.response.json()
+        except Exception:
+            error_msg = e.response.text
+        if rate_limit.is_rate_limited(e.response):
+            return {
+                "error": "GitHub rate limit exceeded",
+                "details": error_msg,
+                "rate_limit": rate_limit.current(),
+            }
+        return {"error": "GitHub API failure", "details": error_msg, "status": e.response.status_code}
+    return {"error": "GitHub API failure", "details": error_msg}
+
+async def _request(method: str, endpoint: str, token: str, params=None, json=None, accept: str = None):
+    """Send a request through the cache and rate limiter, returning (body, link_header)."""
+    url = f"/{endpoint.lstrip('/')}"
+    # SHA-addressed objects never change: no request, no rate-limit accounting
+    ikey = _immutable_key(method, endpoint, token, params, accept)
+    hit = _immutable_body(ikey, accept)
+    if hit is not None:
+        metrics.GITHUB_CACHE_SERVED.inc("immutable")
+        return hit
+    headers, key, cached, generation = _prepare(method, endpoint, token, params, accept)
+    if _is_fresh(key, cached):
+        metrics.GITHUB_CACHE_SERVED.inc("fresh")
+        return _cached_body(cached, accept)
+
+    async def send():
+        try:
+            for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+                # Waits in the token's queue while a secondary rate limit is active
+                refused = await rate_limit.acquire(token, endpoint)
+                if refused:
+                    return refused, None
+                start = time.perf_counter()
+                try:
+                    response = await get_async_client().request(
+                        method=method,
+                        url=url,
+                        headers=headers,
+                        params=params,
+                        json=json,
+                    )
+                except httpx.HTTPError:
+                    _observe(method, endpoint, start)
+                    raise
+                _observe(method, endpoint, start, response)
+                if rate_limit.record(token, endpoint, response) is None:
+                    break
+            result = _parse_response(response, key, cached, accept, generation)
+            _remember_immutable(ikey, response, cached)
+            return result
+        except (httpx.HTTPError, ValueError) as e:
+            # ValueError covers a success status with a body that is not valid JSON
+            return _error_result(e), None
+
+    if key is None:
+        return await send()
+    # Identical GETs for the same token that are already in flight share one response
+    return await singleflight.do(key, send)
+
+async def make_request(method: str, endpoint: str, token: str, params=None, json=None, accept: str = None):
     """
     Generic request handler for GitHub API.
     Provides centralized error handling and response parsing.
+    Pass `accept` to request another media type; non-JSON bodies are returned as text.
     """
-    url = f"{GITHUB_API_BASE_URL}/{endpoint.lstrip('/')}"
+    body, _ = await _request(method, endpoint, token, params=params, json=json, accept=accept)
+    return body
+
+@asynccontextmanager
+async def stream_request(method: str, endpoint: str, token: str, params=None, accept: str = None):
+    """
+    Open a streaming request for large or non-JSON bodies (raw files, diffs).
+    Yields the open httpx.Response, or an error dict if the request failed;
+    the caller reads it with `aiter_bytes()` / `aiter_lines()`.
+    """
+    refused = await rate_limit.acquire(token, endpoint)
+    if refused:
+        yield refused
+        return
+
+    headers = _headers(token)
+    if accept:
+        headers["Accept"] = accept
+    client = get_async_client()
+    start = time.perf_counter()
     try:
-        response = requests.request(
-            method=method,
-            url=url,
-            headers=_headers(token),
-            params=params,
-            json=json,
-            timeout=10
-        )
-        response.raise_for_status()
-        
-        # Handle endpoints that return 204 No Content
-        if response.status_code == 204:
-            return {"status": "success"}
-            
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        error_msg = str(e)
-        if hasattr(e, 'response') and e.response is not None:
+        request = client.build_request(method, f"/{endpoint.lstrip('/')}", headers=headers, params=params)
+        response = await client.send(request, stream=True)
+    except httpx.HTTPError as e:
+        _observe(method, endpoint, start)
+        yield _error_result(e)
+        return
+    # Time to response headers; the body is streamed by the caller
+    _observe(method, endpoint, start, response)
+
+    try:
+        rate_limit.record(token, endpoint, response)
+        if response.is_error:
+            await response.aread()
             try:
-                error_msg = e.response.json()
-            except Exception:
-                error_msg = e.response.text
-        return {"error": "GitHub API failure", "details": error_msg}
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                yield _error_result(e)
+                return
+        yield response
+    finally:
+        await response.aclose()
+
+async def iter_pages(endpoint: str, token: str, params=None, accept: str = None):
+    """
+    Lazily walk a paginated listing by following `Link: rel="next"` headers.
+    Yields (items, page_endpoint, next_endpoint) per page, or a single
+    (error_dict, None, None) if a request fails.
+    """
+    page_endpoint = with_query(endpoint.lstrip("/"), params)
+    while page_endpoint:
+        body, link = await _request("GET", page_endpoint, token, accept=accept)
+        if isinstance(body, dict) and "error" in body:
+            yield body, None, None
+            return
+        # Search endpoints wrap their results in {"items": [...]}
+        items = body if isinstance(body, list) else body.get("items", [])
+        next_endpoint = relative_endpoint(parse_link_header(link).get("next"))
+        yield items, page_endpoint, next_endpoint
+        page_endpoint = next_endpoint
+
+async def paginate(endpoint: str, token: str, params=None, limit: int = PAGE_SIZE, cursor: str = None,
+                   stream_as=None, accept: str = None):
+    """
+    Collect up to `limit` items from a paginated listing.
+    Returns {"items": [...], "next_cursor": str | None}; pass next_cursor back
+    as `cursor` to resume exactly where this call stopped.
+    When the tool call streams items, each page is passed through `stream_as` and
+    sent as a progress notification instead, and the result only counts them
+    in "streamed"; otherwise progress only reports how many were collected.
+    """
+    stream = stream_as is not None and streaming.streams_items()
+    streamed = 0
+
+    def result(next_cursor):
+        page = {"items": items, "next_cursor": next_cursor}
+        if stream:
+            page["streamed"] = streamed
+        return page
+
+    offset = 0
+    listing = endpoint
+    if cursor:
+        decoded = decode_cursor(cursor, listing)
+        if decoded is None:
+            return {"error": "Invalid cursor", "details": "Cursor does not belong to this listing"}
+        endpoint, offset = decoded
+        params = None
+    else:
+        params = dict(params or {})
+        params.setdefault("per_page", min(PAGE_SIZE, limit))
+
+    items = []
+    async with aclosing(iter_pages(endpoint, token, params, accept=accept)) as pages:
+        async for page_items, page_endpoint, next_endpoint in pages:
+            if page_endpoint is None:
+                return page_items
+            taken = page_items[offset:offset + limit - len(items) - streamed]
+            consumed = offset + len(taken)
+            offset = 0
+            if stream:
+                streamed += len(taken)
+                await streaming.report(len(taken), total=limit, items=stream_as(taken))
+            else:
+                items.extend(taken)
+                await streaming.report(len(taken), total=limit)
+            if len(items) + streamed >= limit:
+                if consumed < len(page_items):
+                    return result(encode_cursor(listing, page_endpoint, consumed))
+                return result(encode_cursor(listing, next_endpoint) if next_endpoint else None)
+    return result(None)
+
+def make_request_sync(method: str, endpoint: str, token: str, params=None, json=None):
+    """
+    Blocking variant of make_request for callers outside an event loop.
+    Shares the pooling configuration and error format of the async path.
+    """
+    url = f"/{endpoint.lstrip('/')}"
+    ikey = _immutable_key(method, endpoint, token, params)
+    hit = _immutable_body(ikey)
+    if hit is not None:
+        metrics.GITHUB_CACHE_SERVED.inc("immutable")
+        return hit[0]
+    headers, key, cached, generation = _prepare(method, endpoint, token, params)
+    if _is_fresh(key, cached):
+        metrics.GITHUB_CACHE_SERVED.inc("fresh")
+        return _cached_body(cached)[0]
+    start = time.perf_counter()
+    try:
+        try:
+            response = get_client().request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json,
+            )
+        except httpx.HTTPError:
+            _observe(method, endpoint, start)
+            raise
+        _observe(method, endpoint, start, response)
+        rate_limit.record(token, endpoint, response)
+        body, _ = _parse_response(response, key, cached, generation=generation)
+        _remember_immutable(ikey, response, cached)
+        return body
+    except (httpx.HTTPError, ValueError) as e:
+        return _error_result(e)
@@ -0,0 +1,175 @@
+from functools import lru_cache
+
+import streaming
+from github_api import make_request
+from utils.pagination import encode_graphql_cursor, decode_graphql_cursor
+
+# Each serialized field maps to the GraphQL selection it needs and how to read it
+# back from a node, so a query only asks GitHub for what the caller will see.
+
+def _login(node):
+    return (node.get("author") or {}).get("login", "")
+
+def _state(node):
+    # REST only knows open/closed; a merged pull request is closed
+    return "open" if node.get("state") == "OPEN" else "closed"
+
+PULL_REQUEST_FIELDS = {
+    "id": ("databaseId", lambda n: n.get("databaseId")),
+    "number": ("number", lambda n: n.get("number")),
+    "title": ("title", lambda n: n.get("title")),
+    "state": ("state", _state),
+    "url": ("url", lambda n: n.get("url")),
+    "created_at": ("createdAt", lambda n: n.get("createdAt")),
+    "merged": ("merged", lambda n: n.get("merged", False)),
+    "author": ("author { login }", _login),
+    "mergeable_state": ("mergeStateStatus", lambda n: (n.get("mergeStateStatus") or "").lower() or None),
+    "head_sha": ("headRefOid", lambda n: n.get("headRefOid")),
+    "base_sha": ("baseRefOid", lambda n: n.get("baseRefOid")),
+    "additions": ("additions", lambda n: n.get("additions")),
+    "deletions": ("deletions", lambda n: n.get("deletions")),
+}
+
+REPO_FIELDS = {
+    "id": ("databaseId", lambda n: n.get("databaseId")),
+    "name": ("name", lambda n: n.get("name")),
+    "full_name": ("nameWithOwner", lambda n: n.get("nameWithOwner")),
+    "private": ("isPrivate", lambda n: n.get("isPrivate")),
+    "url": ("url", lambda n: n.get("url")),
+    "default_branch": ("defaultBranchRef { name }", lambda n: (n.get("defaultBranchRef") or {}).get("name")),
+    "language": ("primaryLanguage { name }", lambda n: (n.get("primaryLanguage") or {}).get("name")),
+    "stars": ("stargazerCount", lambda n: n.get("stargazerCount", 0)),
+    "forks": ("forkCount", lambda n: n.get("forkCount", 0)),
+    # REST open_issues_count includes open pull requests
+    "open_issues": (
+        "openIssues: issues(states: OPEN) { totalCount } openPulls: pullRequests(states: OPEN) { totalCount }",
+        lambda n: (n.get("openIssues") or {}).get("totalCount", 0) + (n.get("openPulls") or {}).get("totalCount", 0),
+    ),
+    "updated_at": ("updatedAt", lambda n: n.get("updatedAt")),
+}
+
+def _selected(spec: dict, fields) -> tuple:
+    """Field names to fetch, in serializer order; unknown names are ignored."""
+    if not fields:
+        return tuple(spec)
+    wanted = set(fields)
+    return tuple(name for name in spec if name in wanted)
+
+def _selection(spec: dict, names: tuple) -> str:
+    # A selection set can't be empty; __typename keeps the query valid when no known field was asked for
+    return " ".join(dict.fromkeys(spec[name][0] for name in names)) or "__typename"
+
+def _project(spec: dict, names: tuple, node: dict) -> dict:
+    return {name: spec[name][1](node) for name in names}
+
+@lru_cache(maxsize=128)
+def _list_query(kind: str, names: tuple) -> str:
+    if kind == "pull_requests":
+        selection = _selection(PULL_REQUEST_FIELDS, names)
+        return (
+            "query($owner: String!, $repo: String!, $first: Int!, $after: String, $states: [PullRequestState!]) {"
+            " repository(owner: $owner, name: $repo) {"
+            " pullRequests(first: $first, after: $after, states: $states, orderBy: {field: CREATED_AT, direction: DESC}) {"
+            f" nodes {{ {selection} }} pageInfo {{ hasNextPage endCursor }} }} }} }}"
+        )
+    selection = _selection(REPO_FIELDS, names)
+    return (
+        "query($first: Int!, $after: String) {"
+        " viewer {"
+        " repositories(first: $first, after: $after, ownerAffiliations: [OWNER, COLLABORATOR, ORGANIZATION_MEMBER],"
+        " orderBy: {field: NAME, direction: ASC}) {"
+        f" nodes {{ {selection} }} pageInfo {{ hasNextPage endCursor }} }} }} }}"
+    )
+
+async def make_graphql_request(query: str, variables: dict, token: str):
+    """POST a GraphQL v4 query, returning its `data` or an error dict."""
+    raw = await make_request("POST", "graphql", token, json={"query": query, "variables": variables})
+    if isinstance(raw, dict) and "error" in raw:
+        return raw
+    if not isinstance(raw, dict) or raw.get("errors") or raw.get("data") is None:
+        return {"error": "GitHub GraphQL failure", "details": raw.get("errors") if isinstance(raw, dict) else raw}
+    return raw["data"]
+
+async def _list(kind: str, listing: str, spec: dict, path: tuple, variables: dict, token: str,
+                limit: int, cursor: str = None, fields=None):
+    after = None
+    if cursor:
+        after = decode_graphql_cursor(cursor, listing)
+        if after is None:
+            return {"error": "Invalid cursor", "details": "Cursor does not belong to this listing"}
+
+    names = _selected(spec, fields)
+    query = _list_query(kind, names)
+    stream = streaming.streams_items()
+    items = []
+    streamed = 0
+    while len(items) + streamed < limit:
+        data = await make_graphql_request(
+            query, {**variables, "first": min(100, limit - len(items) - streamed), "after": after}, token
+        )
+        if "error" in data:
+            return data
+        connection = data
+        for key in path:
+            connection = (connection or {}).get(key)
+        if connection is None:
+            return {"error": "GitHub GraphQL failure", "details": "Not found"}
+        page = [_project(spec, names, node) for node in connection["nodes"] if node]
+        if stream:
+            # Streamed pages go straight to the client, see github_api.paginate
+            streamed += len(page)
+            await streaming.report(len(page), total=limit, items=page)
+        else:
+            items.extend(page)
+            await streaming.report(len(page), total=limit)
+        page_info = connection["pageInfo"]
+        after = page_info["endCursor"] if page_info["hasNextPage"] else None
+        if after is None:
+            break
+    result = {"items": items, "next_cursor": encode_graphql_cursor(listing, after) if after else None}
+    if stream:
+        result["streamed"] = streamed
+    return result
+
+async def list_pull_requests(owner: str, repo: str, state: str, token: str, limit: int, cursor=None, fields=None):
+    states = {"open": ["OPEN"], "closed": ["CLOSED", "MERGED"]}.get(state)
+    return await _list(
+        "pull_requests", f"repos/{owner}/{repo}/pulls?state={state}", PULL_REQUEST_FIELDS,
+        ("repository", "pullRequests"), {"owner": owner, "repo": repo, "states": states},
+        token, limit, cursor, fields,
+    )
+
+async def list_repos(token: str, limit: int, cursor=None, fields=None):
+    return await _list(
+        "repos", "user/repos", REPO_FIELDS, ("viewer", "repositories"), {},
+        token, limit, cursor, fields,
+    )
+
+async def get_pull_request(owner: str, repo: str, pull_number: int, token: str, fields=None):
+    names = _selected(PULL_REQUEST_FIELDS, fields)
+    query = (
+        "query($owner: String!, $repo: String!, $number: Int!) {"
+        " repository(owner: $owner, name: $repo) {"
+        f" pullRequest(number: $number) {{ {_selection(PULL_REQUEST_FIELDS, names)} }} }} }}"
+    )
+    data = await make_graphql_request(query, {"owner": owner, "repo": repo, "number": int(pull_number)}, token)
+    if "error" in data:
+        return data
+    node = (data.get("repository") or {}).get("pullRequest")
+    if node is None:
+        return {"error": "GitHub GraphQL failure", "details": "Not found"}
+    return _project(PULL_REQUEST_FIELDS, names, node)
+
+async def get_repo_details(owner: str, repo: str, token: str, fields=None):
+    names = _selected(REPO_FIELDS, fields)
+    query = (
+        "query($owner: String!, $repo: String!) {"
+        f" repository(owner: $owner, name: $repo) {{ {_selection(REPO_FIELDS, names)} }} }}"
+    )
+    data = await make_graphql_request(query, {"owner": owner, "repo": repo}, token)
+    if "error" in data:
+        return data
+    node = data.get("repository")
+    if node is None:
+        return {"error": "GitHub GraphQL failure", "details": "Not found"}
+    return _project(REPO_FIELDS, names, node)
@@ -0,0 +1,263 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import aclosing
+
+from config import MIRROR_DB_PATH, MIRROR_SYNC_INTERVAL
+from github_api import iter_pages
+from tokens import token_fingerprint
+from utils.cache import LRUCache
+import metrics
+import streaming
+
+# Opt-in local mirror of a repository's issues and pull requests in SQLite.
+# The issues endpoint lists both, so one `since=` delta request, ordered by
+# updated_at, brings a mirrored repository up to date; queries then filter
+# and sort locally. Deleted and transferred issues are not noticed.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS repos (
+    repo TEXT PRIMARY KEY,
+    synced_through TEXT
+);
+CREATE TABLE IF NOT EXISTS items (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    id INTEGER,
+    title TEXT,
+    state TEXT,
+    author TEXT COLLATE NOCASE,
+    created_at TEXT,
+    updated_at TEXT,
+    closed_at TEXT,
+    merged_at TEXT,
+    draft INTEGER,
+    comments INTEGER,
+    url TEXT,
+    body TEXT,
+    labels TEXT,
+    PRIMARY KEY (repo, number)
+);
+CREATE TABLE IF NOT EXISTS item_labels (
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    label TEXT NOT NULL COLLATE NOCASE,
+    PRIMARY KEY (repo, number, label)
+);
+CREATE INDEX IF NOT EXISTS items_state ON items (repo, kind, state, updated_at);
+CREATE INDEX IF NOT EXISTS items_author ON items (repo, kind, author, updated_at);
+CREATE INDEX IF NOT EXISTS items_updated ON items (repo, kind, updated_at);
+CREATE INDEX IF NOT EXISTS item_labels_label ON item_labels (repo, label, number);
+"""
+
+ITEM_COLUMNS = (
+    "repo", "number", "kind", "id", "title", "state", "author", "created_at", "updated_at",
+    "closed_at", "merged_at", "draft", "comments", "url", "body", "labels",
+)
+SORT_COLUMNS = {"updated": "updated_at", "created": "created_at", "comments": "comments", "number": "number"}
+
+_lock = threading.Lock()
+_conn = None
+
+# (token fingerprint, repo) -> time of that token's last successful sync.
+# Every token syncs at least once itself, which is what checks its access to the repo.
+_synced = LRUCache(10000)
+metrics.CACHES.register("issue_mirror_syncs", _synced)
+
+def enabled() -> bool:
+    return bool(MIRROR_DB_PATH)
+
+def _repo_key(owner: str, repo: str) -> str:
+    return f"{owner}/{repo}".lower()
+
+def _connection() -> sqlite3.Connection:
+    """Open the database on first use; callers hold _lock."""
+    global _conn
+    if _conn is None:
+        directory = os.path.dirname(MIRROR_DB_PATH)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        # Created private up front; SQLite gives its -wal and -shm files the same mode
+        os.close(os.open(MIRROR_DB_PATH, os.O_RDWR | os.O_CREAT, 0o600))
+        conn = sqlite3.connect(MIRROR_DB_PATH, check_same_thread=False, timeout=30)
+        # Several workers may share the file
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        _conn = conn
+    return _conn
+
+def close():
+    global _conn
+    with _lock:
+        if _conn is not None:
+            _conn.close()
+            _conn = None
+
+def _row(repo: str, item: dict) -> tuple:
+    pull = item.get("pull_request")
+    labels = [l["name"] if isinstance(l, dict) else l for l in item.get("labels") or []]
+    return (
+        repo,
+        item["number"],
+        "pull_request" if pull else "issue",
+        item.get("id"),
+        item.get("title"),
+        item.get("state"),
+        (item.get("user") or {}).get("login", ""),
+        item.get("created_at"),
+        item.get("updated_at"),
+        item.get("closed_at"),
+        (pull or {}).get("merged_at"),
+        int(bool(item.get("draft"))),
+        item.get("comments", 0),
+        item.get("html_url") or item.get("url"),
+        item.get("body") or "",
+        json.dumps(labels),
+    )
+
+def _synced_through(repo: str):
+    with _lock:
+        found = _connection().execute("SELECT synced_through FROM repos WHERE repo = ?", (repo,)).fetchone()
+    return found[0] if found else None
+
+def _store(repo: str, items: list):
+    """Upsert one page of issues and advance the repository's sync cursor, in one transaction."""
+    rows = [_row(repo, item) for item in items]
+    latest = max((row[8] for row in rows if row[8]), default=None)
+    with _lock:
+        conn = _connection()
+        with conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO items ({', '.join(ITEM_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(ITEM_COLUMNS))})",
+                rows,
+            )
+            conn.executemany("DELETE FROM item_labels WHERE repo = ? AND number = ?", [(repo, r[1]) for r in rows])
+            conn.executemany(
+                "INSERT OR IGNORE INTO item_labels (repo, number, label) VALUES (?, ?, ?)",
+                [(repo, r[1], label) for r in rows for label in json.loads(r[15])],
+            )
+            # The cursor only moves forward, whatever order concurrent syncs finish in
+            conn.execute(
+                "INSERT INTO repos (repo, synced_through) VALUES (?, ?) "
+                "ON CONFLICT (repo) DO UPDATE SET synced_through = "
+                "MAX(COALESCE(synced_through, ''), COALESCE(excluded.synced_through, ''))",
+                (repo, latest or ""),
+            )
+
+def _forget(repo: str):
+    with _lock:
+        conn = _connection()
+        with conn:
+            for table in ("items", "item_labels", "repos"):
+                conn.execute(f"DELETE FROM {table} WHERE repo = ?", (repo,))
+
+def is_mirrored(owner: str, repo: str) -> bool:
+    return enabled() and _synced_through(_repo_key(owner, repo)) is not None
+
+async def sync(owner: str, repo: str, token: str, full: bool = False) -> dict:
+    """
+    Bring the mirror of a repository up to date: everything on the first sync
+    (or with `full`), afterwards only what changed since the last one.
+    Returns {"synced": n, "synced_through": updated_at} or an error dict.
+    """
+    key = _repo_key(owner, repo)
+    if full:
+        await asyncio.to_thread(_forget, key)
+    since = await asyncio.to_thread(_synced_through, key)
+    # `since` is inclusive, so the newest item is fetched again; the upsert makes that harmless
+    params = {"state": "all", "sort": "updated", "direction": "asc", "per_page": 100}
+    if since:
+        params["since"] = since
+
+    synced = 0
+    async with aclosing(iter_pages(f"repos/{owner}/{repo}/issues", token, params)) as pages:
+        async for items, page_endpoint, _ in pages:
+            if page_endpoint is None:
+                return items
+            # Stored page by page, so an interrupted first sync resumes where it stopped
+            if items or not since:
+                await asyncio.to_thread(_store, key, items)
+            synced += len(items)
+            await streaming.report(len(items), message=f"Mirrored {synced} issues and pull requests")
+
+    _synced.set((token_fingerprint(token), key), time.monotonic())
+    return {"synced": synced, "synced_through": await asyncio.to_thread(_synced_through, key)}
+
+async def refresh(owner: str, repo: str, token: str):
+    """Delta-sync before a query, unless this token synced within MIRROR_SYNC_INTERVAL. Returns an error dict or None."""
+    last = _synced.get((token_fingerprint(token), _repo_key(owner, repo)))
+    if last is not None and time.monotonic() - last < MIRROR_SYNC_INTERVAL:
+        return None
+    result = await sync(owner, repo, token)
+    return result if "error" in result else None
+
+def _item(row: sqlite3.Row) -> dict:
+    item = {
+        "id": row["id"],
+        "number": row["number"],
+        "title": row["title"],
+        "state": row["state"],
+        "url": row["url"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+        "closed_at": row["closed_at"],
+        "comments": row["comments"],
+        "author": row["author"],
+        "labels": json.loads(row["labels"]),
+        "body": row["body"],
+    }
+    if row["kind"] == "pull_request":
+        item["draft"] = bool(row["draft"])
+        item["merged"] = row["merged_at"] is not None
+        item["merged_at"] = row["merged_at"]
+    return item
+
+def _query(repo: str, kind: str, state: str, labels, author, updated_since, sort: str, direction: str,
+           limit: int, offset: int) -> dict:
+    where = ["i.repo = ?", "i.kind = ?"]
+    params = [repo, kind]
+    if state == "merged":
+        where.append("i.merged_at IS NOT NULL")
+    elif state != "all":
+        where.append("i.state = ?")
+        params.append(state)
+    for label in labels or []:
+        where.append("EXISTS (SELECT 1 FROM item_labels l WHERE l.repo = i.repo AND l.number = i.number AND l.label = ?)")
+        params.append(label)
+    if author:
+        where.append("i.author = ?")
+        params.append(author)
+    if updated_since:
+        where.append("i.updated_at >= ?")
+        params.append(updated_since)
+    clause = " AND ".join(where)
+    order = f"i.{SORT_COLUMNS[sort]} {'ASC' if direction == 'asc' else 'DESC'}, i.number DESC"
+
+    with _lock:
+        conn = _connection()
+        total = conn.execute(f"SELECT COUNT(*) FROM items i WHERE {clause}", params).fetchone()[0]
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        rows = cursor.execute(
+            f"SELECT * FROM items i WHERE {clause} ORDER BY {order} LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+    return {
+        "items": [_item(row) for row in rows],
+        "total": total,
+        "next_offset": offset + len(rows) if offset + len(rows) < total else None,
+    }
+
+async def query(owner: str, repo: str, kind: str, state: str = "open", labels=None, author: str = None,
+                updated_since: str = None, sort: str = "updated", direction: str = "desc",
+                limit: int = 30, offset: int = 0) -> dict:
+    """Filter and sort the mirrored issues (`kind` "issue") or pull requests ("pull_request") of a repository."""
+    return await asyncio.to_thread(
+        _query, _repo_key(owner, repo), kind, state, labels, author, updated_since, sort, direction, limit, offset
+    )
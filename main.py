@@ -1,19 +1,61 @@
 # main.py
 import os
 import json
+import asyncio
 import secrets
-import requests
+import hashlib
+import time
 import jwt
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import CLIENT_ID, CLIENT_SECRET, MCP_SECRET
-from tokens import save_token, get_token, redis_client, delete_token
+from config import (
+    CLIENT_ID,
+    CLIENT_SECRET,
+    MCP_SECRET,
+    MCP_BATCH_CONCURRENCY,
+    JWT_CACHE_MAX_ENTRIES,
+    JWT_CACHE_MAX_TTL,
+    MCP_COMPRESS_MIN_BYTES,
+    GITHUB_WEBHOOK_SECRET,
+)
+from tokens import save_token, get_token, redis_client, delete_token, close_redis, listen_for_invalidations, token_fingerprint
+from github_api import close_client, get_async_client
+import rate_limit
+import metrics
+import streaming
+import webhooks
+import issue_mirror
 import tools
+from utils.cache import LRUCache
+from utils.responses import dumps, negotiate_encoding, compress
 
 THIS_MCP = "github"
 
+# Claims of tokens whose signature has already been verified, keyed by token digest
+_verified_jwts = LRUCache(JWT_CACHE_MAX_ENTRIES)
+metrics.CACHES.register("mcp_jwt", _verified_jwts)
+
+def _decode_mcp_jwt(token: str) -> dict:
+    digest = hashlib.sha256(token.encode()).digest()
+    decoded = _verified_jwts.get(digest)
+    if decoded is not None:
+        # Signature was verified earlier; expiry still has to be enforced
+        exp = decoded.get("exp")
+        if exp is not None and exp <= time.time():
+            _verified_jwts.pop(digest)
+            raise jwt.ExpiredSignatureError("Signature has expired")
+        return decoded
+
+    decoded = jwt.decode(token, MCP_SECRET, algorithms=["HS256"])
+    exp = decoded.get("exp")
+    ttl = JWT_CACHE_MAX_TTL if exp is None else min(exp - time.time(), JWT_CACHE_MAX_TTL)
+    if ttl > 0:
+        _verified_jwts.set(digest, decoded, ttl=ttl)
+    return decoded
+
 def verify_mcp_token(request: Request) -> dict:
     auth_header = request.headers.get("Authorization")
     if not auth_header or not auth_header.startswith("Bearer "):
@@ -22,7 +64,7 @@ def verify_mcp_token(request: Request) -> dict:
     token = auth_header.split(" ", 1)[1]
 
     try:
-        decoded = jwt.decode(token, MCP_SECRET, algorithms=["HS256"])
+        decoded = _decode_mcp_jwt(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
@@ -34,7 +76,21 @@ def verify_mcp_token(request: Request) -> dict:
 
     return decoded
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    invalidation_listener = asyncio.create_task(listen_for_invalidations())
+    cancellation_listener = asyncio.create_task(streaming.listen_for_cancellations())
+    webhook_listener = asyncio.create_task(webhooks.listen_for_invalidations())
+    yield
+    invalidation_listener.cancel()
+    cancellation_listener.cancel()
+    webhook_listener.cancel()
+    # Release pooled GitHub and Redis connections on shutdown
+    await close_client()
+    await close_redis()
+    issue_mirror.close()
+
+app = FastAPI(lifespan=lifespan)
 
 FRONTEND_URLS_ENV = os.environ.get("FRONTEND_URLS", "http://localhost:3000")
 FRONTEND_URLS = [url.strip() for url in FRONTEND_URLS_ENV.split(",") if url.strip()]
@@ -59,7 +115,7 @@ def _state_key(state: str) -> str:
 # GitHub OAuth Login (TEST MODE)
 # -------------------------------------------------
 @app.get("/auth/github/login")
-def github_login(request: Request, user_id: str = "default", redirect_origin: str = None):
+async def github_login(request: Request, user_id: str = "default", redirect_origin: str = None):
     # Validate redirect_origin strictly
     if not redirect_origin:
         raise HTTPException(status_code=400, detail="redirect_origin is required")
@@ -74,7 +130,7 @@ def github_login(request: Request, user_id: str = "default", redirect_origin: st
         "user_id": user_id,
         "redirect_origin": redirect_origin
     }
-    redis_client.setex(_state_key(state), 300, json.dumps(state_data))
+    await redis_client.setex(_state_key(state), 300, json.dumps(state_data))
 
     # Dynamically build the redirect URI based on the host serving the login request
     base_url = str(request.base_url).rstrip("/")
@@ -94,7 +150,7 @@ def github_login(request: Request, user_id: str = "default", redirect_origin: st
 # GitHub OAuth Callback
 # -------------------------------------------------
 @app.get("/auth/callback/github")
-def github_callback(request: Request):
+async def github_callback(request: Request):
     code = request.query_params.get("code")
     state = request.query_params.get("state")
 
@@ -104,7 +160,7 @@ def github_callback(request: Request):
     if not code or not state:
         return RedirectResponse(f"{redirect_origin}/integrations/callback?service=github&status=error")
 
-    state_data_str = redis_client.get(_state_key(state))
+    state_data_str = await redis_client.get(_state_key(state))
     if not state_data_str:
         return RedirectResponse(f"{redirect_origin}/integrations/callback?service=github&status=error")
 
@@ -119,7 +175,7 @@ def github_callback(request: Request):
         redirect_origin = FRONTEND_URLS[0]
 
     try:
-        token_res = requests.post(
+        token_res = (await get_async_client().post(
             "https://github.com/login/oauth/access_token",
             headers={"Accept": "application/json"},
             data={
@@ -127,16 +183,16 @@ def github_callback(request: Request):
                 "client_secret": CLIENT_SECRET,
                 "code": code,
             },
-        ).json()
+        )).json()
 
         access_token = token_res.get("access_token")
         if not access_token:
             return RedirectResponse(f"{redirect_origin}/integrations/callback?service=github&status=error")
 
-        save_token(user_id, access_token)
+        await save_token(user_id, access_token)
         
         # Cleanup state
-        redis_client.delete(_state_key(state))
+        await redis_client.delete(_state_key(state))
 
         return RedirectResponse(f"{redirect_origin}/integrations/callback?service=github&status=success")
     except Exception as e:
@@ -155,52 +211,63 @@ async def disconnect_github(request: Request):
     if not user_id:
         return JSONResponse(status_code=400, content={"error": "Missing user_id"})
 
-    delete_token(user_id)
+    await delete_token(user_id)
     return {"success": True, "service": "github"}
 
 
 # -------------------------------------------------
-# MCP Endpoint
+# Prometheus metrics (per worker process)
 # -------------------------------------------------
-@app.post("/mcp")
-async def mcp_handler(request: Request):
+@app.get("/metrics")
+async def metrics_handler():
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+# -------------------------------------------------
+# GitHub Webhooks (cache invalidation)
+# -------------------------------------------------
+@app.post("/webhooks/github")
+async def github_webhook(request: Request):
+    if not GITHUB_WEBHOOK_SECRET:
+        return JSONResponse(status_code=503, content={"error": "Webhook secret not configured"})
+
+    body = await request.body()
+    if not webhooks.verify_signature(body, request.headers.get("X-Hub-Signature-256")):
+        return JSONResponse(status_code=401, content={"error": "Invalid signature"})
+
     try:
-        body = await request.json()
-    except Exception:
-        return JSONResponse(
-            status_code=400,
-            content={"error": "Invalid JSON body"}
-        )
+        payload = json.loads(body)
+    except ValueError:
+        return JSONResponse(status_code=400, content={"error": "Invalid JSON body"})
+    if not isinstance(payload, dict):
+        return JSONResponse(status_code=400, content={"error": "Invalid JSON body"})
 
-    method = body.get("method")
-    id_ = body.get("id")
-    params = body.get("params", {})
+    return await webhooks.handle_event(request.headers.get("X-GitHub-Event", ""), payload)
 
-    # ---------------- tools/list (no auth required) ----------------
-    if method == "tools/list":
-        return {
-            "jsonrpc": "2.0",
-            "id": id_,
-            "result": {
-                "tools": tools.get_all_tool_schemas()
-            }
-        }
 
+# -------------------------------------------------
+# MCP Endpoint
+# -------------------------------------------------
+async def _resolve_github_token(request: Request):
+    """
+    Verify the MCP JWT and look up the user's GitHub token.
+    Returns (token, None) on success or (None, error_response).
+    """
     # JWT VERIFICATION — extract user_id and provider from signed token
     try:
         decoded = verify_mcp_token(request)
     except HTTPException as e:
-        return JSONResponse(status_code=e.status_code, content={"error": e.detail})
+        return None, JSONResponse(status_code=e.status_code, content={"error": e.detail})
 
     user_id = decoded.get("uid")
     if not user_id:
-        return JSONResponse(status_code=401, content={"error": "JWT missing 'uid' claim"})
+        return None, JSONResponse(status_code=401, content={"error": "JWT missing 'uid' claim"})
 
-    token = get_token(user_id)
+    token = await get_token(user_id)
     if not token:
         base_url = str(request.base_url).rstrip("/")
         auth_url = f"{base_url}/auth/github/login?user_id={user_id}"
-        return JSONResponse(
+        return None, JSONResponse(
             status_code=401,
             content={
                 "error": f"GitHub not connected for user_id={user_id}",
@@ -208,6 +275,178 @@ async def mcp_handler(request: Request):
                 "message": f"Please visit {auth_url} to connect your GitHub account."
             }
         )
+    return token, None
+
+def _tools_list_response(id_):
+    return {
+        "jsonrpc": "2.0",
+        "id": id_,
+        "result": {
+            "tools": tools.get_all_tool_schemas()
+        }
+    }
+
+async def _tool_call_response(id_, tool_name: str, args: dict, token: str):
+    result = await tools.call_tool(tool_name, args, token)
+
+    # Results are always objects, so their shape never depends on whether a
+    # budget is attached (cached responses carry none)
+    if not isinstance(result, dict):
+        result = {"items": result} if isinstance(result, list) else {"value": result}
+
+    # Let agents back off before they run out of budget. MCP carries this in
+    # the result's _meta; JSON-RPC responses allow no other top-level members.
+    budget = rate_limit.current()
+    if budget:
+        result = {**result, "_meta": {"rate_limit": budget}}
+    return {
+        "jsonrpc": "2.0",
+        "id": id_,
+        "result": result
+    }
+
+def _mcp_response(request: Request, content, headers: dict = None) -> Response:
+    """
+    Encode a JSON-RPC payload (or pre-serialized bytes) once, compressing it
+    with gzip/br when the client accepts that and the body is large enough.
+    """
+    body = content if isinstance(content, bytes) else dumps(content)
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    if len(body) >= MCP_COMPRESS_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding"))
+        if encoding:
+            body = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def _rpc_error(id_, code: int, message: str):
+    return {"jsonrpc": "2.0", "id": id_, "error": {"code": code, "message": message}}
+
+def _request_meta(params) -> dict:
+    meta = params.get("_meta") if isinstance(params, dict) else None
+    return meta if isinstance(meta, dict) else {}
+
+def _progress_token(params):
+    return _request_meta(params).get("progressToken")
+
+def _stream_items(params) -> bool:
+    """Pages of list tools only go into progress notifications when the client opts in."""
+    return _request_meta(params).get("streamItems") is True
+
+def _sse_response(events) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+async def _batch_entry_response(entry, token: str, semaphore: asyncio.Semaphore):
+    if not isinstance(entry, dict):
+        return _rpc_error(None, -32600, "Invalid Request")
+
+    method = entry.get("method")
+    id_ = entry.get("id")
+    params = entry.get("params")
+    if params is None:
+        params = {}
+    if not isinstance(params, dict):
+        response = _rpc_error(id_, -32602, "Invalid params")
+        return response if "id" in entry else None
+
+    if method == "tools/list":
+        response = _tools_list_response(id_)
+    elif method == "notifications/cancelled":
+        await streaming.cancel(token_fingerprint(token), params.get("requestId"))
+        response = None
+    elif method == "tools/call":
+        tool_name = params.get("name")
+        if not tool_name:
+            response = _rpc_error(id_, -32602, "Tool name is required in arguments")
+        else:
+            async with semaphore:
+                try:
+                    response = await _tool_call_response(id_, tool_name, params.get("arguments", {}), token)
+                except Exception as e:
+                    response = _rpc_error(id_, -32603, f"Tool execution failed: {str(e)}")
+    else:
+        response = _rpc_error(id_, -32601, "Invalid MCP method")
+
+    # Notifications (no id) get no response
+    return response if "id" in entry else None
+
+async def _batch_handler(request: Request, batch: list):
+    if not batch:
+        # JSON-RPC answers an empty batch with a single error, not an array
+        return _mcp_response(request, _rpc_error(None, -32600, "Invalid Request"))
+
+    # Authenticate and resolve the GitHub token once for the whole batch
+    token = None
+    if any(not isinstance(e, dict) or e.get("method") != "tools/list" for e in batch):
+        token, error = await _resolve_github_token(request)
+        if error:
+            return error
+
+    semaphore = asyncio.Semaphore(MCP_BATCH_CONCURRENCY)
+    if streaming.accepts_sse(request) and any(
+        isinstance(e, dict) and e.get("method") == "tools/call" and "id" in e for e in batch
+    ):
+        # Each response is sent as soon as its call finishes, progress in between
+        return _sse_response(streaming.stream_calls(token_fingerprint(token), [
+            (
+                entry.get("id") if isinstance(entry, dict) and entry.get("method") == "tools/call" else None,
+                _progress_token(entry.get("params")) if isinstance(entry, dict) else None,
+                _stream_items(entry.get("params")) if isinstance(entry, dict) else False,
+                lambda entry=entry: _batch_entry_response(entry, token, semaphore),
+            )
+            for entry in batch
+        ]))
+    responses = await asyncio.gather(
+        *(_batch_entry_response(entry, token, semaphore) for entry in batch)
+    )
+    responses = [r for r in responses if r is not None]
+    if not responses:
+        return Response(status_code=202)
+    return _mcp_response(request, responses)
+
+
+@app.post("/mcp")
+async def mcp_handler(request: Request):
+    try:
+        body = await request.json()
+    except Exception:
+        return JSONResponse(
+            status_code=400,
+            content={"error": "Invalid JSON body"}
+        )
+
+    # ---------------- JSON-RPC batch ----------------
+    if isinstance(body, list):
+        return await _batch_handler(request, body)
+    if not isinstance(body, dict):
+        return JSONResponse(status_code=400, content={"error": "Invalid JSON-RPC request"})
+
+    method = body.get("method")
+    id_ = body.get("id")
+    params = body.get("params", {})
+
+    # ---------------- tools/list (no auth required) ----------------
+    if method == "tools/list":
+        # Splice the request id into the pre-serialized tool list
+        payload = b"".join((
+            b'{"jsonrpc":"2.0","id":',
+            dumps(id_),
+            b',"result":{"tools":',
+            tools.TOOLS_LIST_JSON,
+            b'}}',
+        ))
+        # The ETag tells clients whether the tools changed; a JSON-RPC call always gets its response
+        return _mcp_response(request, payload, headers={"ETag": tools.TOOLS_LIST_ETAG})
+
+    token, error = await _resolve_github_token(request)
+    if error:
+        return error
+
+    # ---------------- notifications/cancelled ----------------
+    if method == "notifications/cancelled":
+        await streaming.cancel(token_fingerprint(token), params.get("requestId"))
+        return Response(status_code=202)
 
     # ---------------- tools/call ----------------
     if method == "tools/call":
@@ -220,13 +459,19 @@ async def mcp_handler(request: Request):
                 content={"error": "Tool name is required in arguments"}
             )
 
-        result = tools.call_tool(tool_name, args, token)
-
-        return {
-            "jsonrpc": "2.0",
-            "id": id_,
-            "result": result
-        }
+        owner = token_fingerprint(token)
+        if streaming.accepts_sse(request):
+            async def run():
+                try:
+                    return await _tool_call_response(id_, tool_name, args, token)
+                except Exception as e:
+                    return _rpc_error(id_, -32603, f"Tool execution failed: {str(e)}")
+            return _sse_response(streaming.stream_calls(owner, [(id_, _progress_token(params), _stream_items(params), run)]))
+
+        response = await streaming.run_cancellable(owner, id_, _tool_call_response(id_, tool_name, args, token))
+        if response is None:
+            return _mcp_response(request, _rpc_error(id_, -32800, "Request cancelled"))
+        return _mcp_response(request, response)
 
     return JSONResponse(
         status_code=400,
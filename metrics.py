@@ -0,0 +1,191 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Minimal Prometheus text-format registry for /metrics. Metrics are per
+# worker process; labels are restricted to low-cardinality values (tool
+# names, endpoint templates, status codes, cache and resource names).
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics = []
+_lock = threading.Lock()
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        _metrics.append(self)
+
+    def inc(self, *labels, amount: float = 1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with _lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield self.name, _labels(self.labelnames, labels), value
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, *labels, value: float):
+        with _lock:
+            self._values[labels] = value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+        _metrics.append(self)
+
+    def observe(self, value: float, *labels):
+        i = bisect_left(self.buckets, value)
+        with _lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def samples(self):
+        with _lock:
+            items = [(labels, list(state)) for labels, state in self._values.items()]
+        for labels, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                yield f"{self.name}_bucket", _labels(self.labelnames, labels, f'le="{_number(bound)}"'), cumulative
+            yield f"{self.name}_bucket", _labels(self.labelnames, labels, 'le="+Inf"'), state[-1]
+            yield f"{self.name}_sum", _labels(self.labelnames, labels), state[-2]
+            yield f"{self.name}_count", _labels(self.labelnames, labels), state[-1]
+
+class _CacheStats:
+    """Hits, misses and hit ratio of every registered cache, read when scraped."""
+
+    kind = None
+
+    def __init__(self):
+        self._caches = {}
+        _metrics.append(self)
+
+    def register(self, name: str, stats):
+        """`stats` is an LRUCache or a function returning {"size", "hits", "misses"}."""
+        self._caches[name] = stats.stats if hasattr(stats, "stats") else stats
+
+    def render(self) -> list:
+        lines = []
+        families = (
+            ("mcp_cache_hits_total", "counter", "Cache lookups that were served from the cache"),
+            ("mcp_cache_misses_total", "counter", "Cache lookups that missed"),
+            ("mcp_cache_hit_ratio", "gauge", "Hits / (hits + misses) since start"),
+            ("mcp_cache_entries", "gauge", "Entries currently held"),
+        )
+        stats = {name: fn() for name, fn in sorted(self._caches.items())}
+        for metric, kind, help_text in families:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} {kind}")
+            for name, s in stats.items():
+                lookups = s["hits"] + s["misses"]
+                value = {
+                    "mcp_cache_hits_total": s["hits"],
+                    "mcp_cache_misses_total": s["misses"],
+                    "mcp_cache_hit_ratio": s["hits"] / lookups if lookups else 0.0,
+                    "mcp_cache_entries": s["size"],
+                }[metric]
+                lines.append(f'{metric}{{cache="{name}"}} {_number(value)}')
+        return lines
+
+CACHES = _CacheStats()
+
+TOOL_CALLS = Counter("mcp_tool_calls_total", "Tool calls by tool and outcome", ("tool", "outcome"))
+TOOL_LATENCY = Histogram("mcp_tool_call_duration_seconds", "Tool call latency", ("tool",))
+GITHUB_RESPONSES = Counter(
+    "github_responses_total", "GitHub API responses by endpoint template and status", ("method", "endpoint", "status")
+)
+GITHUB_LATENCY = Histogram(
+    "github_request_duration_seconds", "GitHub API request latency by endpoint template", ("method", "endpoint")
+)
+GITHUB_CACHE_SERVED = Counter(
+    "github_cache_served_total", "GitHub calls answered locally without a request", ("cache",)
+)
+GITHUB_COALESCED = Counter(
+    "github_coalesced_total", "GitHub calls that shared the response of an identical in-flight call", ("scope",)
+)
+RATE_LIMIT_REMAINING = Gauge(
+    "github_rate_limit_remaining", "Remaining budget reported by the latest response, per rate-limit resource", ("resource",)
+)
+REDIS_LATENCY = Histogram(
+    "redis_operation_duration_seconds", "Redis operation latency", ("operation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0),
+)
+
+# Path segments that name a specific object become placeholders
+_TEMPLATE_RULES = (
+    (re.compile(r"^repos/[^/]+/[^/]+"), "repos/{owner}/{repo}"),
+    (re.compile(r"^users/[^/]+"), "users/{username}"),
+    (re.compile(r"^orgs/[^/]+"), "orgs/{org}"),
+    (re.compile(r"/contents/.*$"), "/contents/{path}"),
+    (re.compile(r"/compare/.*$"), "/compare/{basehead}"),
+    # Refs and branch names may contain slashes, so these run to the end of the path
+    (re.compile(r"/git/(refs?)/.+$"), r"/git/\1/{ref}"),
+    (re.compile(r"/(branches|tags|trees|blobs|statuses)/.+$"), r"/\1/{ref}"),
+    (re.compile(r"/commits/.+?(?=/(?:check-runs|check-suites|status|statuses|comments|pulls|branches-where-head)$|$)"),
+     "/commits/{ref}"),
+    (re.compile(r"/\d+(?=/|$)"), "/{number}"),
+)
+
+def endpoint_template(endpoint: str) -> str:
+    """e.g. "repos/octo/hello/issues/42?page=2" -> "repos/{owner}/{repo}/issues/{number}"."""
+    template = endpoint.lstrip("/").split("?", 1)[0]
+    for pattern, replacement in _TEMPLATE_RULES:
+        template = pattern.sub(replacement, template)
+    return template
+
+def render() -> str:
+    lines = []
+    for metric in _metrics:
+        if metric.kind is None:
+            lines.extend(metric.render())
+            continue
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{labels} {_number(value)}")
+    return "\n".join(lines) + "\n"
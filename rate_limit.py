@@ -0,0 +1,239 @@
+import asyncio
+import time
+from contextvars import ContextVar
+
+import redis.asyncio as redis
+
+from config import (
+    RATE_LIMIT_MAX_WAIT,
+    RATE_LIMIT_SYNC_INTERVAL,
+    SECONDARY_LIMIT_INTERVAL,
+    SECONDARY_LIMIT_COOLDOWN,
+    SEARCH_MIN_INTERVAL,
+)
+import metrics
+from tokens import redis_client, token_fingerprint
+from utils.cache import LRUCache
+
+RATE_LIMIT_PREFIX = "github_ratelimit"
+DEFAULT_SECONDARY_RETRY = 60
+
+# Per-worker view of the shared budgets; Redis holds the cross-worker copy
+_budgets = LRUCache(10000)
+_throttles = LRUCache(10000)
+_queues = LRUCache(10000)
+_search_pacers = LRUCache(10000)
+_background = set()
+
+# Budget seen by the most recent GitHub response in the current tool call
+_current = ContextVar("github_rate_limit", default=None)
+
+def _budget_key(token_id: str, resource: str) -> str:
+    return f"{RATE_LIMIT_PREFIX}:{token_id}:{resource}"
+
+def _throttle_key(token_id: str, group: str) -> str:
+    return f"{RATE_LIMIT_PREFIX}:{token_id}:{group}:secondary"
+
+def resource_for(endpoint: str) -> str:
+    """Map an endpoint to the GitHub rate-limit resource it is billed against."""
+    endpoint = endpoint.lstrip("/")
+    if endpoint.startswith("search/code"):
+        return "code_search"
+    if endpoint.startswith("search/"):
+        return "search"
+    if endpoint.startswith("graphql"):
+        return "graphql"
+    return "core"
+
+def throttle_group(resource: str) -> str:
+    """Search has its own secondary limits, so it is throttled apart from every other call."""
+    return "search" if resource in ("search", "code_search") else "core"
+
+def _snapshot(resource: str, state: dict) -> dict:
+    return {
+        "resource": resource,
+        "limit": state["limit"],
+        "remaining": state["remaining"],
+        "reset": state["reset"],
+    }
+
+def current():
+    """Return the budget reported by the last GitHub response in this context, if any."""
+    return _current.get()
+
+def _spawn(coro):
+    """Run a Redis write in the background so it never delays the tool call."""
+    try:
+        task = asyncio.get_running_loop().create_task(coro)
+    except RuntimeError:
+        # No running loop (sync shim): the local view is still updated
+        coro.close()
+        return
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+async def _write_budget(token_id: str, resource: str, state: dict):
+    try:
+        key = _budget_key(token_id, resource)
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hset(key, mapping={k: state[k] for k in ("limit", "remaining", "reset")})
+            pipe.expireat(key, int(state["reset"]) + 1)
+            await pipe.execute()
+    except (redis.RedisError, OSError):
+        pass
+
+async def _write_throttle(token_id: str, group: str, throttle: dict):
+    try:
+        await redis_client.set(
+            _throttle_key(token_id, group),
+            f"{throttle['until']}:{throttle['relax_at']}",
+            exat=int(throttle["relax_at"]) + 1,
+        )
+    except (redis.RedisError, OSError):
+        pass
+
+async def _sync_from_redis(token_id: str, resource: str):
+    """Refresh the local view from Redis at most once per sync interval."""
+    state = _budgets.get((token_id, resource))
+    if state and time.monotonic() - state["synced"] < RATE_LIMIT_SYNC_INTERVAL:
+        return
+    group = throttle_group(resource)
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(_budget_key(token_id, resource))
+            pipe.get(_throttle_key(token_id, group))
+            shared, throttle_raw = await pipe.execute()
+    except (redis.RedisError, OSError):
+        return
+
+    if shared:
+        _budgets.set((token_id, resource), {
+            "limit": int(shared["limit"]),
+            "remaining": int(shared["remaining"]),
+            "reset": int(shared["reset"]),
+            "synced": time.monotonic(),
+        })
+    elif state:
+        state["synced"] = time.monotonic()
+
+    if throttle_raw and _throttles.get((token_id, group)) is None:
+        until, relax_at = (float(v) for v in throttle_raw.split(":"))
+        _throttles.set((token_id, group), {"until": until, "relax_at": relax_at, "next_slot": until})
+
+def _exceeded(resource: str, state: dict, details: str) -> dict:
+    return {
+        "error": "GitHub rate limit exceeded",
+        "details": details,
+        "rate_limit": _snapshot(resource, state),
+    }
+
+async def _take_slot(token_id: str, resource: str, slot: dict, interval: float, reason: str):
+    """Wait in the token's queue for the group until `slot` allows the next request, then book the one after."""
+    group = throttle_group(resource)
+    queue = _queues.get((token_id, group))
+    if queue is None:
+        queue = asyncio.Lock()
+        _queues.set((token_id, group), queue)
+    async with queue:
+        now = time.time()
+        start = max(slot["until"], slot["next_slot"], now)
+        if start - now > RATE_LIMIT_MAX_WAIT:
+            state = _budgets.get((token_id, resource)) or {"limit": None, "remaining": None, "reset": int(start)}
+            return _exceeded(resource, state, f"{reason}, retry after {int(start)}")
+        if start > now:
+            await asyncio.sleep(start - now)
+        slot["next_slot"] = time.time() + interval
+    return None
+
+async def acquire(token: str, endpoint: str):
+    """
+    Wait until a request for this token may be sent.
+    Returns an error result instead when the wait would exceed RATE_LIMIT_MAX_WAIT.
+    """
+    token_id = token_fingerprint(token)
+    resource = resource_for(endpoint)
+    group = throttle_group(resource)
+    await _sync_from_redis(token_id, resource)
+
+    # After a secondary limit, requests for the token queue up and are spaced out;
+    # search and core calls are queued apart, so one never stalls the other
+    throttle = _throttles.get((token_id, group))
+    if throttle and throttle["relax_at"] > time.time():
+        refused = await _take_slot(token_id, resource, throttle, SECONDARY_LIMIT_INTERVAL, "Secondary rate limit active")
+        if refused:
+            return refused
+    elif group == "search" and SEARCH_MIN_INTERVAL > 0:
+        # Search is always paced, as bursts of it trip secondary limits quickly
+        pacer = _search_pacers.get(token_id)
+        if pacer is None:
+            pacer = {"until": 0, "next_slot": 0}
+            _search_pacers.set(token_id, pacer)
+        refused = await _take_slot(token_id, resource, pacer, SEARCH_MIN_INTERVAL, "Search requests queued")
+        if refused:
+            return refused
+
+    state = _budgets.get((token_id, resource))
+    if state and state["remaining"] <= 0:
+        delay = state["reset"] - time.time()
+        if delay > RATE_LIMIT_MAX_WAIT:
+            return _exceeded(resource, state, f"Budget for '{resource}' exhausted until {state['reset']}")
+        if delay > 0:
+            await asyncio.sleep(delay)
+    return None
+
+def _secondary_delay(response):
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            return DEFAULT_SECONDARY_RETRY
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        return None
+    if "secondary rate limit" in response.text.lower():
+        return DEFAULT_SECONDARY_RETRY
+    return None
+
+def record(token: str, endpoint: str, response):
+    """
+    Record the budget headers of a response.
+    Returns the number of seconds to wait before retrying when a secondary
+    rate limit was hit, otherwise None.
+    """
+    token_id = token_fingerprint(token)
+    headers = response.headers
+    resource = headers.get("X-RateLimit-Resource") or resource_for(endpoint)
+
+    if "X-RateLimit-Remaining" in headers:
+        try:
+            state = {
+                "limit": int(headers.get("X-RateLimit-Limit", 0)),
+                "remaining": int(headers["X-RateLimit-Remaining"]),
+                "reset": int(headers.get("X-RateLimit-Reset", 0)),
+                "synced": time.monotonic(),
+            }
+        except ValueError:
+            state = None
+        if state:
+            _budgets.set((token_id, resource), state)
+            _current.set(_snapshot(resource, state))
+            metrics.RATE_LIMIT_REMAINING.set(resource, value=state["remaining"])
+            _spawn(_write_budget(token_id, resource, state))
+
+    if response.status_code not in (403, 429):
+        return None
+    delay = _secondary_delay(response)
+    if delay is not None:
+        until = time.time() + delay
+        throttle = {"until": until, "relax_at": until + SECONDARY_LIMIT_COOLDOWN, "next_slot": until}
+        group = throttle_group(resource)
+        _throttles.set((token_id, group), throttle)
+        _spawn(_write_throttle(token_id, group, throttle))
+    return delay
+
+def is_rate_limited(response) -> bool:
+    if response.status_code not in (403, 429):
+        return False
+    if response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers:
+        return True
+    return "rate limit" in response.text.lower()
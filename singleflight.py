@@ -0,0 +1,110 @@
+import asyncio
+import copy
+import hashlib
+import json
+import time
+
+import redis.asyncio as redis
+
+from config import (
+    SINGLEFLIGHT_REDIS,
+    SINGLEFLIGHT_LOCK_TTL,
+    SINGLEFLIGHT_RESULT_TTL,
+    SINGLEFLIGHT_MAX_BYTES,
+)
+from tokens import redis_client
+import metrics
+
+# Coalescing of identical in-flight GET requests. Keys come from
+# github_api._cache_key, so they already include the token's fingerprint and
+# a response is never shared between tokens.
+
+SINGLEFLIGHT_PREFIX = "github_singleflight"
+POLL_INTERVAL = 0.02
+
+class _Call:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self):
+        # Resolved with the leader's (body, link), or None if it failed
+        self.future = asyncio.get_running_loop().create_future()
+        self.waiters = 0
+
+_calls = {}
+
+async def do(key, send):
+    """
+    Return `await send()`, unless an identical call is already in flight on
+    this worker (or, with GITHUB_SINGLEFLIGHT_REDIS, on another worker), in
+    which case its (body, link) result is shared instead.
+    """
+    call = _calls.get(key)
+    if call is not None:
+        call.waiters += 1
+        result = await asyncio.shield(call.future)
+        if result is None:
+            # The leader was cancelled or crashed; make the call ourselves
+            return await send()
+        metrics.GITHUB_COALESCED.inc("local")
+        body, link = result
+        # Every caller owns its body, so no one sees another's mutations
+        return copy.deepcopy(body), link
+
+    call = _calls[key] = _Call()
+    try:
+        result = await (_shared(key, send) if SINGLEFLIGHT_REDIS else send())
+        # Snapshot before the leader's caller can modify it
+        call.future.set_result(copy.deepcopy(result) if call.waiters else result)
+        return result
+    finally:
+        if not call.future.done():
+            call.future.set_result(None)
+        _calls.pop(key, None)
+
+def _redis_keys(key) -> tuple:
+    digest = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+    return f"{SINGLEFLIGHT_PREFIX}:{digest}:lock", f"{SINGLEFLIGHT_PREFIX}:{digest}:result"
+
+async def _shared(key, send):
+    """Coalesce across workers: one worker takes a short lock, the others wait for its result slot."""
+    lock_key, result_key = _redis_keys(key)
+    try:
+        leader = await redis_client.set(lock_key, "1", nx=True, px=int(SINGLEFLIGHT_LOCK_TTL * 1000))
+    except (redis.RedisError, OSError):
+        return await send()
+
+    if leader:
+        try:
+            result = await send()
+            try:
+                payload = json.dumps(result)
+                # Too large to hand over: waiting workers make their own call once the lock is gone
+                if len(payload) <= SINGLEFLIGHT_MAX_BYTES:
+                    await redis_client.set(result_key, payload, px=int(SINGLEFLIGHT_RESULT_TTL * 1000))
+            except (TypeError, ValueError, redis.RedisError, OSError):
+                pass
+            return result
+        finally:
+            # Later requests must not wait on a call that is already over
+            try:
+                await redis_client.delete(lock_key)
+            except (redis.RedisError, OSError):
+                pass
+
+    deadline = time.monotonic() + SINGLEFLIGHT_LOCK_TTL
+    try:
+        while time.monotonic() < deadline:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(result_key)
+                pipe.exists(lock_key)
+                payload, locked = await pipe.execute()
+            if payload is not None:
+                metrics.GITHUB_COALESCED.inc("redis")
+                body, link = json.loads(payload)
+                return body, link
+            if not locked:
+                break
+            await asyncio.sleep(POLL_INTERVAL)
+    except (redis.RedisError, OSError, ValueError):
+        pass
+    return await send()
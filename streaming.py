@@ -0,0 +1,169 @@
+import asyncio
+import json
+from contextvars import ContextVar
+
+import redis.asyncio as redis
+
+from config import SSE_QUEUE_SIZE
+from tokens import redis_client
+from utils.responses import dumps
+
+# MCP Streamable HTTP: a tools/call sent with `Accept: text/event-stream` is
+# answered with an SSE stream. Progress notifications are sent while the tool
+# runs, the response comes last. List tools also send the items of each page
+# in them, leaving them out of the response, but only when the request opts in
+# with `_meta.streamItems`; plain MCP clients only read the response.
+
+# Workers publish {"owner", "request_id"} here when a client cancels a request
+CANCEL_CHANNEL = "mcp_cancel"
+
+# (owner, request id) -> task of every in-flight tools/call on this worker
+_in_flight = {}
+
+class _Channel:
+    __slots__ = ("queue", "progress_token", "stream_items", "progress", "total")
+
+    def __init__(self, queue: asyncio.Queue, progress_token, stream_items: bool = False, total=None):
+        self.queue = queue
+        self.progress_token = progress_token
+        self.stream_items = stream_items
+        self.progress = 0
+        self.total = total
+
+# Set inside the task running a streamed tool call
+_channel = ContextVar("mcp_stream", default=None)
+
+def accepts_sse(request) -> bool:
+    return "text/event-stream" in request.headers.get("Accept", "")
+
+def streams_items() -> bool:
+    """True when the current tool call streams to a client that asked for progress and for the items in it."""
+    channel = _channel.get()
+    return channel is not None and channel.progress_token is not None and channel.stream_items
+
+async def report(advance: int = 1, total: int = None, message: str = None, items: list = None):
+    """
+    Send a notifications/progress for the current tool call, if it is streamed.
+    `items` carries a page of results that will not be repeated in the response.
+    Waits while the client is behind, so a slow reader bounds server memory.
+    """
+    channel = _channel.get()
+    if channel is None or channel.progress_token is None:
+        return
+    channel.progress += advance
+    if total is not None:
+        channel.total = total
+    params = {"progressToken": channel.progress_token, "progress": channel.progress}
+    if channel.total is not None:
+        params["total"] = channel.total
+    if message:
+        params["message"] = message
+    if items is not None:
+        params["items"] = items
+    await channel.queue.put({"jsonrpc": "2.0", "method": "notifications/progress", "params": params})
+
+def _event(message: dict) -> bytes:
+    return b"event: message\ndata: " + dumps(message) + b"\n\n"
+
+def _request_key(owner: str, request_id):
+    # JSON-RPC ids may be strings or numbers; 1 and "1" are different requests
+    return owner, json.dumps(request_id)
+
+async def stream_calls(owner: str, calls: list):
+    """
+    Run tool calls concurrently and yield their SSE events as they are produced.
+    `calls` holds (request_id, progress_token, stream_items, run) where `run()` returns the
+    JSON-RPC response (or None for a notification). A cancelled call sends no
+    response; when the client disconnects, every call still running is cancelled.
+    """
+    queue = asyncio.Queue(maxsize=SSE_QUEUE_SIZE)
+
+    async def worker(progress_token, stream_items, run):
+        _channel.set(_Channel(queue, progress_token, stream_items))
+        response = await run()
+        if response is not None:
+            await queue.put(response)
+
+    tasks = []
+    keys = []
+    for request_id, progress_token, stream_items, run in calls:
+        task = asyncio.create_task(worker(progress_token, stream_items, run))
+        tasks.append(task)
+        if request_id is not None:
+            key = _request_key(owner, request_id)
+            _in_flight[key] = task
+            keys.append(key)
+
+    finished = asyncio.gather(*tasks, return_exceptions=True)
+    getter = None
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            await asyncio.wait({getter, finished}, return_when=asyncio.FIRST_COMPLETED)
+            if getter.done():
+                yield _event(getter.result())
+                continue
+            break
+        while not queue.empty():
+            yield _event(queue.get_nowait())
+    finally:
+        if getter is not None:
+            getter.cancel()
+        for task in tasks:
+            task.cancel()
+        for key in keys:
+            _in_flight.pop(key, None)
+
+async def run_cancellable(owner: str, request_id, coro):
+    """
+    Await a non-streamed tool call so notifications/cancelled can stop it too.
+    Returns None if it was cancelled.
+    """
+    if request_id is None:
+        return await coro
+    key = _request_key(owner, request_id)
+    task = asyncio.ensure_future(coro)
+    _in_flight[key] = task
+    try:
+        await asyncio.wait({task})
+    finally:
+        # No-op when done; otherwise the client went away and the call is stopped
+        task.cancel()
+        _in_flight.pop(key, None)
+    return None if task.cancelled() else task.result()
+
+def _cancel_local(owner: str, request_id) -> bool:
+    task = _in_flight.get(_request_key(owner, request_id))
+    if task is None:
+        return False
+    task.cancel()
+    return True
+
+async def cancel(owner: str, request_id):
+    """Cancel an in-flight request of this owner, on whichever worker runs it."""
+    if _cancel_local(owner, request_id):
+        return
+    try:
+        await redis_client.publish(CANCEL_CHANNEL, json.dumps({"owner": owner, "request_id": request_id}))
+    except (redis.RedisError, OSError):
+        pass
+
+async def listen_for_cancellations():
+    """Cancel requests on this worker when another worker received their notifications/cancelled."""
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(CANCEL_CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                    _cancel_local(data["owner"], data["request_id"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        except (redis.RedisError, OSError):
+            pass
+        finally:
+            await pubsub.aclose()
+        await asyncio.sleep(1)
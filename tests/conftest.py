@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+import pytest
+
+# Configuration is read at import time, so it is set before any app module is imported
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("MCP_SECRET", "test-secret-test-secret-test-secret-0123")
+os.environ["GITHUB_BLOB_CACHE_DIR"] = tempfile.mkdtemp(prefix="test_blobs_")
+os.environ["GITHUB_MIRROR_DB"] = os.path.join(tempfile.mkdtemp(prefix="test_mirror_"), "mirror.sqlite3")
+
+import github_api
+
+
+class FakeGitHub:
+    """Routes (method, path) to handlers returning httpx.Response, recording every request."""
+
+    def __init__(self):
+        self.routes = {}
+        self.calls = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request)
+        handler = self.routes.get((request.method, request.url.path))
+        if handler is None:
+            return httpx.Response(404, json={"message": "Not Found"})
+        return handler(request)
+
+    def calls_by(self, token: str) -> list:
+        return [c for c in self.calls if c.headers.get("Authorization") == f"Bearer {token}"]
+
+
+@pytest.fixture
+def github(monkeypatch):
+    fakeredis = pytest.importorskip("fakeredis")
+    import main
+    import rate_limit
+    import streaming
+    import tokens
+    import webhooks
+
+    fake_redis = fakeredis.FakeAsyncRedis(decode_responses=True)
+    # Modules bind the client at import time
+    for module in (tokens, rate_limit, main, streaming, webhooks):
+        monkeypatch.setattr(module, "redis_client", fake_redis)
+
+    fake = FakeGitHub()
+    options = github_api._client_options()
+    options.pop("http2")
+    monkeypatch.setattr(github_api, "_async_client", httpx.AsyncClient(transport=httpx.MockTransport(fake.handle), **options))
+    return fake
+
+
+@pytest.fixture
+def mcp(github):
+    """A client of the app, authenticated as user u1 whose GitHub token is stored."""
+    import jwt
+    from fastapi.testclient import TestClient
+    import main
+    import tokens
+
+    mcp_jwt = jwt.encode({"uid": "u1", "mcp": "github", "exp": int(time.time()) + 3600}, main.MCP_SECRET, algorithm="HS256")
+    with TestClient(main.app, headers={"Authorization": f"Bearer {mcp_jwt}"}) as client:
+        client.portal.call(tokens.save_token, "u1", "gh-token")
+        yield client
@@ -0,0 +1,55 @@
+import httpx
+
+
+def _rpc(id_, method, params=None):
+    entry = {"jsonrpc": "2.0", "method": method}
+    if id_ is not None:
+        entry["id"] = id_
+    if params is not None:
+        entry["params"] = params
+    return entry
+
+
+def _me(github):
+    github.routes[("GET", "/user")] = lambda r: httpx.Response(200, json={"id": 1, "login": "octo"})
+
+
+def test_malformed_entries_get_their_own_errors(github, mcp):
+    _me(github)
+    response = mcp.post("/mcp", json=[
+        _rpc(1, "tools/call", {"name": "github.get_me", "arguments": {}}),
+        _rpc(2, "tools/call", ["oops"]),
+        "oops",
+        _rpc(4, "tools/unknown"),
+        _rpc(5, "tools/call", {"arguments": {}}),
+        _rpc(6, "tools/list"),
+    ])
+    assert response.status_code == 200
+    by_id = {r["id"]: r for r in response.json()}
+    assert by_id[1]["result"]["login"] == "octo"
+    assert by_id[2]["error"]["code"] == -32602
+    assert by_id[None]["error"]["code"] == -32600
+    assert by_id[4]["error"]["code"] == -32601
+    assert by_id[5]["error"]["code"] == -32602
+    assert by_id[6]["result"]["tools"]
+
+
+def test_notifications_get_no_response(github, mcp):
+    _me(github)
+    notifications = [
+        _rpc(None, "tools/call", {"name": "github.get_me", "arguments": {}}),
+        _rpc(None, "tools/call", ["oops"]),
+        _rpc(None, "tools/unknown"),
+    ]
+    response = mcp.post("/mcp", json=notifications)
+    assert response.status_code == 202
+    assert response.content == b""
+
+    response = mcp.post("/mcp", json=notifications + [_rpc(7, "tools/list")])
+    assert [r["id"] for r in response.json()] == [7]
+
+
+def test_empty_batch_is_a_single_invalid_request(github, mcp):
+    response = mcp.post("/mcp", json=[])
+    assert response.status_code == 200
+    assert response.json() == {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}}
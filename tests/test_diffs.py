@@ -0,0 +1,36 @@
+import asyncio
+
+import httpx
+
+from tools import diffs
+
+SHA = "d" * 40
+DIFF = """diff --git a/secret.py b/secret.py
+index 111..222 100644
+--- a/secret.py
++++ b/secret.py
+@@ -1,1 +1,2 @@
+ x
++y
+"""
+
+
+def test_cached_summary_is_not_served_to_another_token(github):
+    def commit_diff(request):
+        if request.headers["Authorization"] != "Bearer victim-token":
+            return httpx.Response(404, json={"message": "Not Found"})
+        return httpx.Response(200, text=DIFF)
+
+    github.routes[("GET", f"/repos/victim/private/commits/{SHA}")] = commit_diff
+    args = {"owner": "victim", "repo": "private", "ref": SHA, "summary_only": True}
+
+    first = asyncio.run(diffs.get_diff(args, "victim-token"))
+    assert first["files"][0]["path"] == "secret.py"
+    # Served from the cache for the same token
+    before = len(github.calls)
+    assert asyncio.run(diffs.get_diff(args, "victim-token")) == first
+    assert len(github.calls) == before
+
+    stolen = asyncio.run(diffs.get_diff(args, "attacker-token"))
+    assert "error" in stolen
+    assert github.calls_by("attacker-token")
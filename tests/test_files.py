@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+
+import blob_store
+from tools import files
+
+HEAD = "c" * 40
+CONTENT = b"top secret\n"
+
+
+def _blob_sha(content: bytes) -> str:
+    digest = blob_store.git_blob_sha(len(content))
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def _serve_private_repo(github, owner: str, repo: str, allowed_token: str):
+    """A private repository only `allowed_token` can read; everyone else gets 404."""
+    def guarded(handler):
+        def route(request):
+            if request.headers["Authorization"] != f"Bearer {allowed_token}":
+                return httpx.Response(404, json={"message": "Not Found"})
+            return handler(request)
+        return route
+
+    github.routes[("GET", f"/repos/{owner}/{repo}/commits/HEAD")] = guarded(lambda r: httpx.Response(200, text=HEAD))
+    github.routes[("GET", f"/repos/{owner}/{repo}/contents/secret.txt")] = guarded(lambda r: httpx.Response(200, content=CONTENT))
+    github.routes[("GET", f"/repos/{owner}/{repo}/git/blobs/{_blob_sha(CONTENT)}")] = guarded(
+        lambda r: httpx.Response(200, content=CONTENT)
+    )
+
+
+def test_cached_blob_is_not_served_to_a_token_without_access(github):
+    _serve_private_repo(github, "victim", "private", allowed_token="victim-token")
+    args = {"owner": "victim", "repo": "private", "path": "secret.txt", "start_line": 1}
+
+    # The victim's read puts the blob in the shared store
+    result = asyncio.run(files.get_file_contents(args, "victim-token"))
+    assert result["content"] == "top secret\n"
+    with blob_store.open_blob(_blob_sha(CONTENT)) as mm:
+        assert mm is not None
+
+    stolen = asyncio.run(files.get_file_contents({**args, "sha": _blob_sha(CONTENT)}, "attacker-token"))
+    assert "error" in stolen
+    assert github.calls_by("attacker-token"), "the attacker's read must go to GitHub"
+
+
+def test_cached_blob_is_served_locally_to_a_token_with_access(github):
+    _serve_private_repo(github, "octo", "shared", allowed_token="reader-token")
+    args = {"owner": "octo", "repo": "shared", "path": "secret.txt", "start_line": 1}
+    asyncio.run(files.get_file_contents(args, "reader-token"))
+
+    before = len(github.calls)
+    result = asyncio.run(files.get_file_contents({**args, "sha": _blob_sha(CONTENT)}, "reader-token"))
+    assert result["content"] == "top secret\n"
+    assert len(github.calls) == before
+
+
+def _serve_moving_branch(github, owner: str, repo: str, ref_updates: list):
+    """A branch whose head moves on every read; ref updates answer with `ref_updates` in turn."""
+    heads = iter(f"{i:040x}" for i in range(1, 100))
+    commits = iter(f"{i:040x}" for i in range(100, 200))
+    base = f"/repos/{owner}/{repo}/git"
+    github.routes[("POST", f"{base}/blobs")] = lambda r: httpx.Response(201, json={"sha": "b" * 40})
+    github.routes[("GET", f"{base}/ref/heads/main")] = lambda r: httpx.Response(200, json={"object": {"sha": next(heads)}})
+    for i in range(1, 100):
+        github.routes[("GET", f"{base}/commits/{i:040x}")] = lambda r: httpx.Response(200, json={"tree": {"sha": "t" * 40}})
+    github.routes[("POST", f"{base}/trees")] = lambda r: httpx.Response(201, json={"sha": "e" * 40})
+    github.routes[("POST", f"{base}/commits")] = lambda r: httpx.Response(201, json={"sha": next(commits)})
+    github.routes[("PATCH", f"{base}/refs/heads/main")] = lambda r: ref_updates.pop(0)
+
+
+def _commit(owner: str, repo: str) -> dict:
+    args = {"owner": owner, "repo": repo, "branch": "main", "message": "m", "changes": [{"path": "a.txt", "content": "a"}]}
+    return asyncio.run(files.commit_files(args, "tok-commit"))
+
+
+def test_commit_is_rebuilt_on_the_new_head_when_the_branch_moved(github):
+    moved = httpx.Response(422, json={"message": "Update is not a fast forward"})
+    _serve_moving_branch(github, "o", "moving", [moved, httpx.Response(200, json={"object": {}})])
+
+    result = _commit("o", "moving")
+
+    assert result["attempts"] == 2
+    assert result["commit_sha"] == f"{101:040x}"
+    blob_uploads = [c for c in github.calls if c.method == "POST" and c.url.path.endswith("/git/blobs")]
+    assert len(blob_uploads) == 1
+
+
+def test_commit_gives_up_when_the_branch_keeps_moving(github):
+    attempts = files.COMMIT_MAX_RETRIES + 1
+    _serve_moving_branch(github, "o", "busy", [
+        httpx.Response(422, json={"message": "Update is not a fast forward"}) for _ in range(attempts)
+    ])
+
+    result = _commit("o", "busy")
+
+    assert result == {"error": f"Branch 'main' kept moving; gave up after {attempts} attempts"}
+    assert len([c for c in github.calls if c.method == "PATCH"]) == attempts
@@ -0,0 +1,17 @@
+import asyncio
+
+import httpx
+
+import github_api
+from config import ETAG_CACHE_MAX_BYTES
+
+
+def test_etag_cache_is_weighed_by_body_size(github):
+    body = b'{"content": "' + b"x" * 5000 + b'"}'
+    github.routes[("GET", "/repos/o/big/contents/file")] = lambda r: httpx.Response(200, content=body, headers={"ETag": '"e"'})
+
+    before = github_api._etag_cache.weight
+    asyncio.run(github_api.make_request("GET", "repos/o/big/contents/file", "tok"))
+
+    assert github_api._etag_cache.max_weight == ETAG_CACHE_MAX_BYTES
+    assert github_api._etag_cache.weight - before == len(body)
@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+
+from tools import issues
+
+
+def test_list_issues_revalidates_with_etags_by_default(github):
+    def listing(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json=[{"number": 1, "title": "t", "user": {"login": "a"}}], headers={"ETag": '"v1"'})
+
+    github.routes[("GET", "/repos/o/polled/issues")] = listing
+    args = {"owner": "o", "repo": "polled"}
+    first = asyncio.run(issues.list_issues(args, "tok"))
+    second = asyncio.run(issues.list_issues(args, "tok"))
+
+    assert second == first
+    assert [c.method for c in github.calls] == ["GET", "GET"]
+    assert github.calls[1].headers.get("If-None-Match") == '"v1"'
+
+
+def test_list_issues_includes_pull_requests_like_rest(github):
+    github.routes[("GET", "/repos/o/mixed/issues")] = lambda r: httpx.Response(200, json=[
+        {"number": 2, "title": "a pull request", "user": {"login": "a"}, "pull_request": {"url": "u"}},
+        {"number": 1, "title": "an issue", "user": {"login": "a"}},
+    ])
+
+    page = asyncio.run(issues.list_issues({"owner": "o", "repo": "mixed"}, "tok"))
+
+    assert [item["number"] for item in page["items"]] == [2, 1]
+    assert [c.url.path for c in github.calls] == ["/repos/o/mixed/issues"]
@@ -0,0 +1,62 @@
+import time
+
+import httpx
+
+RATE_LIMIT_HEADERS = {
+    "X-RateLimit-Limit": "5000",
+    "X-RateLimit-Remaining": "4321",
+    "X-RateLimit-Reset": str(int(time.time()) + 3600),
+    "X-RateLimit-Resource": "core",
+}
+SHA = "a" * 40
+
+
+def _call(client, name: str, arguments: dict) -> dict:
+    response = client.post(
+        "/mcp",
+        json={"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": name, "arguments": arguments}},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_rate_limit_budget_is_carried_in_the_result_meta(github, mcp):
+    github.routes[("GET", "/user")] = lambda r: httpx.Response(200, json={"id": 1, "login": "octo"}, headers=RATE_LIMIT_HEADERS)
+    github.routes[("GET", "/repos/o/r/contents/docs")] = lambda r: httpx.Response(
+        200, json=[{"name": "a.md", "path": "docs/a.md", "sha": "s", "size": 1}], headers=RATE_LIMIT_HEADERS
+    )
+
+    response = _call(mcp, "github.get_me", {})
+    assert set(response) == {"jsonrpc", "id", "result"}
+    assert response["result"]["login"] == "octo"
+    assert response["result"]["_meta"]["rate_limit"]["remaining"] == 4321
+
+    listing = _call(mcp, "github.get_file_contents", {"owner": "o", "repo": "r", "path": "docs"})["result"]
+    assert listing["items"][0]["path"] == "docs/a.md"
+    assert listing["_meta"]["rate_limit"]["resource"] == "core"
+
+
+def test_list_results_keep_their_shape_without_a_budget(github, mcp):
+    github.routes[("GET", "/repos/o/r/contents/docs")] = lambda r: httpx.Response(
+        200, json=[{"name": "a.md", "path": "docs/a.md", "sha": "s", "size": 1}], headers=RATE_LIMIT_HEADERS
+    )
+    args = {"owner": "o", "repo": "r", "path": "docs", "ref": SHA}
+
+    fetched = _call(mcp, "github.get_file_contents", args)["result"]
+    # Served from the immutable cache: no GitHub response, so no budget
+    cached = _call(mcp, "github.get_file_contents", args)["result"]
+
+    assert len(github.calls) == 1
+    assert "_meta" in fetched and "_meta" not in cached
+    assert cached["items"] == fetched["items"]
+
+
+def test_tools_list_always_answers_with_a_json_rpc_result(mcp):
+    first = mcp.post("/mcp", json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+    etag = first.headers["ETag"]
+
+    again = mcp.post("/mcp", json={"jsonrpc": "2.0", "id": 2, "method": "tools/list"}, headers={"If-None-Match": etag})
+    assert again.status_code == 200
+    assert again.headers["ETag"] == etag
+    assert again.json()["id"] == 2
+    assert again.json()["result"] == first.json()["result"]
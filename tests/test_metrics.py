@@ -0,0 +1,26 @@
+import pytest
+
+from metrics import endpoint_template
+
+
+@pytest.mark.parametrize("endpoint, template", [
+    ("user", "user"),
+    ("repos/octo/hello", "repos/{owner}/{repo}"),
+    ("repos/octo/hello/issues?page=2&per_page=100", "repos/{owner}/{repo}/issues"),
+    ("repos/octo/hello/issues/42/comments", "repos/{owner}/{repo}/issues/{number}/comments"),
+    ("repos/octo/hello/pulls/7/merge", "repos/{owner}/{repo}/pulls/{number}/merge"),
+    ("repos/octo/hello/contents/src/secret/plan.md", "repos/{owner}/{repo}/contents/{path}"),
+    ("repos/octo/hello/compare/main...feature/x", "repos/{owner}/{repo}/compare/{basehead}"),
+    ("repos/octo/hello/git/ref/heads/feature/secret-branch", "repos/{owner}/{repo}/git/ref/{ref}"),
+    ("repos/octo/hello/git/refs/heads/feature/secret-branch", "repos/{owner}/{repo}/git/refs/{ref}"),
+    ("repos/octo/hello/git/refs", "repos/{owner}/{repo}/git/refs"),
+    ("repos/octo/hello/git/trees/" + "a" * 40, "repos/{owner}/{repo}/git/trees/{ref}"),
+    ("repos/octo/hello/git/commits/" + "b" * 40, "repos/{owner}/{repo}/git/commits/{ref}"),
+    ("repos/octo/hello/commits/release/2024/q1", "repos/{owner}/{repo}/commits/{ref}"),
+    ("repos/octo/hello/commits/feature/x/check-runs", "repos/{owner}/{repo}/commits/{ref}/check-runs"),
+    ("repos/octo/hello/commits", "repos/{owner}/{repo}/commits"),
+    ("repos/octo/hello/branches/feature/secret", "repos/{owner}/{repo}/branches/{ref}"),
+    ("users/someone/repos", "users/{username}/repos"),
+])
+def test_endpoint_template(endpoint, template):
+    assert endpoint_template(endpoint) == template
@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+
+from config import GITHUB_API_BASE_URL
+from tools import issues
+from utils.pagination import decode_cursor, encode_cursor, parse_link_header, relative_endpoint
+
+BASE = GITHUB_API_BASE_URL.rstrip("/")
+
+
+def test_parse_link_header():
+    links = parse_link_header(f'<{BASE}/x?page=2>; rel="next", <{BASE}/x?page=9>; rel="last"')
+    assert links == {"next": f"{BASE}/x?page=2", "last": f"{BASE}/x?page=9"}
+    assert parse_link_header(None) == {}
+
+
+def test_relative_endpoint_rejects_other_hosts():
+    assert relative_endpoint(f"{BASE}/repositories/1/issues?page=2") == "repositories/1/issues?page=2"
+    assert relative_endpoint("https://evil.example/repositories/1/issues?page=2") is None
+
+
+def test_cursor_is_rebased_on_the_listing_endpoint():
+    cursor = encode_cursor("repos/o/r/issues", "repositories/42/issues?per_page=100&page=2", 7)
+    assert decode_cursor(cursor, "repos/o/r/issues") == ("repos/o/r/issues?per_page=100&page=2", 7)
+    assert decode_cursor(cursor, "repos/o/other/issues") is None
+    assert decode_cursor("not-a-cursor", "repos/o/r/issues") is None
+
+
+def test_list_issues_resumes_through_a_repositories_id_link(github):
+    all_issues = [{"number": n, "title": f"t{n}", "user": {"login": "a"}} for n in range(1, 251)]
+
+    def page(request):
+        number = int(request.url.params.get("page", 1))
+        per_page = int(request.url.params["per_page"])
+        headers = {}
+        if number * per_page < len(all_issues):
+            # GitHub addresses later pages by repository id, not owner/name
+            headers["Link"] = f'<{BASE}/repositories/42/issues?per_page={per_page}&page={number + 1}>; rel="next"'
+        return httpx.Response(200, json=all_issues[(number - 1) * per_page:number * per_page], headers=headers)
+
+    github.routes[("GET", "/repos/o/paged/issues")] = page
+    github.routes[("GET", "/repositories/42/issues")] = page
+
+    first = asyncio.run(issues.list_issues({"owner": "o", "repo": "paged", "limit": 150}, "tok"))
+    assert [i["number"] for i in first["items"]] == list(range(1, 151))
+    assert first["next_cursor"]
+
+    rest = asyncio.run(issues.list_issues({"owner": "o", "repo": "paged", "limit": 150, "cursor": first["next_cursor"]}, "tok"))
+    assert [i["number"] for i in rest["items"]] == list(range(151, 251))
+    assert rest["next_cursor"] is None
@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+import httpx
+
+import github_api
+import rate_limit
+
+
+def _budget(remaining: int, reset: float, resource: str = "core") -> dict:
+    return {
+        "X-RateLimit-Limit": "5000",
+        "X-RateLimit-Remaining": str(remaining),
+        "X-RateLimit-Reset": str(int(reset)),
+        "X-RateLimit-Resource": resource,
+    }
+
+
+def test_record_exposes_the_budget_and_acquire_waits_for_it(github):
+    async def run():
+        response = httpx.Response(200, headers=_budget(10, time.time() + 3600))
+        assert rate_limit.record("tok-budget", "repos/o/r", response) is None
+        assert rate_limit.current()["remaining"] == 10
+        assert await rate_limit.acquire("tok-budget", "repos/o/r") is None
+
+        # An exhausted budget that resets beyond the maximum wait is refused right away
+        rate_limit.record("tok-budget", "repos/o/r", httpx.Response(200, headers=_budget(0, time.time() + 3600)))
+        refused = await rate_limit.acquire("tok-budget", "repos/o/r")
+        assert refused["error"] == "GitHub rate limit exceeded"
+        assert refused["rate_limit"]["remaining"] == 0
+        # Other resources have budgets of their own
+        assert await rate_limit.acquire("tok-budget", "graphql") is None
+
+    asyncio.run(run())
+
+
+def test_secondary_limit_is_retried_after_retry_after(github):
+    responses = [
+        httpx.Response(403, json={"message": "You have exceeded a secondary rate limit"}, headers={"Retry-After": "0"}),
+        httpx.Response(200, json={"login": "octo"}),
+    ]
+    github.routes[("GET", "/user")] = lambda r: responses.pop(0)
+
+    assert asyncio.run(github_api.make_request("GET", "user", "tok-secondary")) == {"login": "octo"}
+    assert len(github.calls) == 2
+
+
+def test_long_secondary_limit_is_refused_and_spares_search(github):
+    github.routes[("GET", "/user")] = lambda r: httpx.Response(
+        403, json={"message": "You have exceeded a secondary rate limit"}, headers={"Retry-After": "600"}
+    )
+
+    async def run():
+        result = await github_api.make_request("GET", "user", "tok-throttled")
+        assert result["error"] == "GitHub rate limit exceeded"
+        assert "Secondary rate limit active" in result["details"]
+        # Search calls queue apart from core calls
+        assert await rate_limit.acquire("tok-throttled", "search/issues") is None
+
+    asyncio.run(run())
+    assert len(github.calls) == 1
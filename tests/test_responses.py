@@ -0,0 +1,42 @@
+import pytest
+
+from utils import responses
+
+TOOLS_LIST = {"jsonrpc": "2.0", "id": 1, "method": "tools/list"}
+
+
+def _post(mcp, body, accept_encoding: str):
+    return mcp.post("/mcp", json=body, headers={"Accept-Encoding": accept_encoding})
+
+
+def test_gzip_is_used_when_accepted(mcp):
+    response = _post(mcp, TOOLS_LIST, "gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.json()["result"]["tools"]
+
+
+def test_brotli_is_preferred_when_available(mcp):
+    pytest.importorskip("brotli")
+    response = _post(mcp, TOOLS_LIST, "gzip, br")
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.json()["result"]["tools"]
+
+
+def test_small_bodies_are_sent_uncompressed(mcp):
+    response = _post(mcp, [], "gzip, br")
+    assert "Content-Encoding" not in response.headers
+    assert response.json()["error"]["code"] == -32600
+
+
+@pytest.mark.parametrize("header, brotli_installed, expected", [
+    ("gzip, br", True, "br"),
+    ("gzip, br", False, "gzip"),
+    ("br;q=0.5, gzip", True, "gzip"),
+    ("*", False, "gzip"),
+    ("gzip;q=0, identity", True, None),
+    ("", True, None),
+])
+def test_negotiate_encoding(monkeypatch, header, brotli_installed, expected):
+    monkeypatch.setattr(responses, "brotli", object() if brotli_installed else None)
+    assert responses.negotiate_encoding(header) == expected
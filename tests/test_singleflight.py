@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+import pytest
+
+import github_api
+import singleflight
+
+
+async def _together(*calls):
+    return await asyncio.gather(*calls, return_exceptions=True)
+
+
+def test_concurrent_identical_gets_make_one_call(github):
+    github.routes[("GET", "/repos/o/r")] = lambda r: httpx.Response(200, json={"name": "r", "topics": []})
+
+    results = asyncio.run(_together(*(github_api.make_request("GET", "repos/o/r", "tok-shared") for _ in range(5))))
+
+    assert len(github.calls) == 1
+    assert all(result == {"name": "r", "topics": []} for result in results)
+    # Every caller gets its own copy
+    results[0]["topics"].append("x")
+    assert results[1]["topics"] == []
+
+
+def test_error_responses_reach_every_waiter(github):
+    github.routes[("GET", "/repos/o/broken")] = lambda r: httpx.Response(500, json={"message": "boom"})
+
+    results = asyncio.run(_together(*(github_api.make_request("GET", "repos/o/broken", "tok-error") for _ in range(3))))
+
+    assert len(github.calls) == 1
+    assert all(result["error"] == results[0]["error"] for result in results)
+
+
+def test_gets_of_different_tokens_are_never_shared(github):
+    github.routes[("GET", "/user")] = lambda r: httpx.Response(200, json={"auth": r.headers["Authorization"]})
+
+    mine, theirs = asyncio.run(_together(
+        github_api.make_request("GET", "user", "tok-mine"),
+        github_api.make_request("GET", "user", "tok-theirs"),
+    ))
+
+    assert len(github.calls) == 2
+    assert mine == {"auth": "Bearer tok-mine"}
+    assert theirs == {"auth": "Bearer tok-theirs"}
+
+
+def test_failed_leader_leaves_waiters_to_call_themselves():
+    async def run():
+        calls = []
+
+        async def send():
+            calls.append(1)
+            await asyncio.sleep(0)
+            raise RuntimeError("upstream failure")
+
+        results = await _together(*(singleflight.do("failing-key", send) for _ in range(3)))
+        return calls, results
+
+    calls, results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(calls) == 3
+    assert "failing-key" not in singleflight._calls
+
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    async def run():
+        started = asyncio.Event()
+        outcomes = ["leader", "waiter"]
+
+        async def send():
+            outcome = outcomes.pop(0)
+            if outcome == "leader":
+                started.set()
+                await asyncio.Event().wait()
+            return {"by": outcome}, None
+
+        leader = asyncio.create_task(singleflight.do("cancelled-key", send))
+        await started.wait()
+        waiter = asyncio.create_task(singleflight.do("cancelled-key", send))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await waiter
+
+    assert asyncio.run(run()) == ({"by": "waiter"}, None)
@@ -0,0 +1,33 @@
+import os
+import stat
+
+import blob_store
+import issue_mirror
+
+
+def _mode(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_blob_cache_is_private(tmp_path, monkeypatch):
+    directory = tmp_path / "blobs"
+    monkeypatch.setattr(blob_store, "BLOB_CACHE_DIR", str(directory))
+
+    sha = blob_store.put(b"private content of test_blob_cache_is_private")
+
+    assert _mode(directory) == 0o700
+    assert _mode(os.path.dirname(blob_store._path(sha))) == 0o700
+    assert _mode(blob_store._path(sha)) == 0o600
+
+
+def test_mirror_database_is_private(tmp_path, monkeypatch):
+    path = tmp_path / "mirror" / "mirror.sqlite3"
+    monkeypatch.setattr(issue_mirror, "MIRROR_DB_PATH", str(path))
+    issue_mirror.close()
+    try:
+        with issue_mirror._lock:
+            issue_mirror._connection()
+        assert _mode(path.parent) == 0o700
+        assert _mode(path) == 0o600
+    finally:
+        issue_mirror.close()
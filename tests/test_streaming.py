@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+import httpx
+
+import streaming
+
+BRANCHES = [{"name": f"b{i}", "commit": {"sha": "s"}} for i in range(3)]
+
+
+def _events(response) -> list:
+    return [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+
+
+def _list_branches(mcp, meta: dict):
+    return mcp.post(
+        "/mcp",
+        json={
+            "jsonrpc": "2.0", "id": 1, "method": "tools/call",
+            "params": {"name": "github.list_branches", "arguments": {"owner": "o", "repo": "r", "limit": 3}, "_meta": meta},
+        },
+        headers={"Accept": "application/json, text/event-stream"},
+    )
+
+
+def test_progress_only_counts_items_unless_the_client_opts_in(github, mcp):
+    github.routes[("GET", "/repos/o/r/branches")] = lambda r: httpx.Response(200, json=BRANCHES)
+
+    response = _list_branches(mcp, {"progressToken": "p"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    *progress, final = _events(response)
+    assert [p["params"]["progress"] for p in progress] == [3]
+    assert "items" not in progress[0]["params"]
+    assert [b["name"] for b in final["result"]["items"]] == ["b0", "b1", "b2"]
+    assert "streamed" not in final["result"]
+
+
+def test_items_are_streamed_on_request(github, mcp):
+    github.routes[("GET", "/repos/o/r/branches")] = lambda r: httpx.Response(200, json=BRANCHES)
+
+    *progress, final = _events(_list_branches(mcp, {"progressToken": "p", "streamItems": True}))
+    assert [b["name"] for b in progress[0]["params"]["items"]] == ["b0", "b1", "b2"]
+    assert final["result"]["items"] == []
+    assert final["result"]["streamed"] == 3
+
+
+def _message(event: bytes) -> dict:
+    return json.loads(event.decode().split("data: ", 1)[1])
+
+
+async def _blocked(started: asyncio.Event):
+    started.set()
+    await asyncio.Event().wait()
+
+
+def test_cancelled_streamed_call_sends_no_response(github):
+    async def run():
+        started = asyncio.Event()
+
+        async def quick():
+            return {"jsonrpc": "2.0", "id": 2, "result": {}}
+
+        events = streaming.stream_calls("owner", [(1, None, False, lambda: _blocked(started)), (2, None, False, quick)])
+        received = [_message(await events.__anext__())]
+        await started.wait()
+        await streaming.cancel("owner", 1)
+        received += [_message(e) async for e in events]
+        return received
+
+    assert [r["id"] for r in asyncio.run(run())] == [2]
+
+
+def test_cancelled_call_returns_none(github):
+    async def run():
+        started = asyncio.Event()
+        call = asyncio.create_task(streaming.run_cancellable("owner", "req", _blocked(started)))
+        await started.wait()
+        await streaming.cancel("owner", "req")
+        return await call
+
+    assert asyncio.run(run()) is None
@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+import tools
+from utils.validation import ValidationError, compile_validator
+
+SCHEMA = {"type": "object", "properties": {"n": {"type": "integer"}}, "required": ["n"]}
+
+
+@pytest.mark.parametrize("value, expected", [(5, 5), ("5", 5), (" -12 ", -12), (3.0, 3)])
+def test_integers_are_coerced(value, expected):
+    assert compile_validator(SCHEMA)({"n": value}) == {"n": expected}
+
+
+@pytest.mark.parametrize("value", ["--5", "²", "5a", "", "-", True, 2.5])
+def test_non_integers_are_rejected(value):
+    with pytest.raises(ValidationError):
+        compile_validator(SCHEMA)({"n": value})
+
+
+def test_call_tool_reports_bad_integers_as_invalid_arguments():
+    result = asyncio.run(tools.call_tool("github.get_pull_request", {"owner": "o", "repo": "r", "pull_number": "²"}, "tok"))
+    assert result["error"].startswith("Invalid arguments")
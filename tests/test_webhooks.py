@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+import github_api
+import webhooks
+
+
+@pytest.mark.parametrize("event, endpoint", [
+    ("check_run", "repos/o/r/commits/main/check-runs"),
+    ("check_suite", "repos/o/r/commits/main/check-suites"),
+    ("status", "repos/o/r/commits/main/status"),
+    ("issue_comment", "repos/o/r/issues/1/comments"),
+    ("issue_comment", "repos/o/r/pulls/1"),
+    ("pull_request_review", "repos/o/r/pulls/1/reviews"),
+    ("pull_request_review_comment", "repos/o/r/pulls/1/comments"),
+    ("pull_request_review_thread", "repos/o/r/pulls/1/comments"),
+])
+def test_events_invalidate_the_sub_resources_they_change(github, event, endpoint):
+    scope = github_api._scope(endpoint)
+    before = github_api._generations.get(scope, 0)
+
+    result = asyncio.run(webhooks.handle_event(event, {"repository": {"full_name": "O/R"}}))
+
+    assert scope[2] in result["invalidated"]
+    assert github_api._generations[scope] == before + 1
+
+
+def test_every_event_area_is_a_cache_area():
+    areas = set(github_api._AREAS.values()) | {"repo"}
+    for event, event_areas in webhooks.EVENT_AREAS.items():
+        assert set(event_areas) <= areas, event
@@ -1,18 +1,88 @@
-import redis
-from config import REDIS_URL
+import asyncio
+import hashlib
+import redis.asyncio as redis
+from config import REDIS_URL, TOKEN_CACHE_TTL, TOKEN_CACHE_MAX_ENTRIES
+from utils.cache import LRUCache
+import metrics
 
 # Connect to Redis with string decoding enabled
 redis_client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
 
-def save_token(user_id: str, access_token: str):
+# Workers publish user ids here whenever a token is saved or deleted
+TOKEN_INVALIDATION_CHANNEL = "github_token_invalidate"
+
+_token_cache = LRUCache(TOKEN_CACHE_MAX_ENTRIES, ttl=TOKEN_CACHE_TTL)
+metrics.CACHES.register("github_token", _token_cache)
+# The cache is only trusted while this worker is subscribed to invalidations
+_subscribed = False
+# Bumped on every invalidation so a lookup racing with one is not cached
+_generation = 0
+
+def _invalidate(user_id: str):
+    global _generation
+    _generation += 1
+    _token_cache.pop(user_id)
+
+async def _publish_invalidation(user_id: str):
+    _invalidate(user_id)
+    with metrics.REDIS_LATENCY.time("publish"):
+        await redis_client.publish(TOKEN_INVALIDATION_CHANNEL, user_id)
+
+async def save_token(user_id: str, access_token: str):
     """Save GitHub access token for a user in Redis."""
-    redis_client.set(f"github_token:{user_id}", access_token)
+    with metrics.REDIS_LATENCY.time("set"):
+        await redis_client.set(f"github_token:{user_id}", access_token)
+    await _publish_invalidation(user_id)
 
-def get_token(user_id: str) -> str:
-    """Retrieve GitHub access token for a user from Redis."""
-    token = redis_client.get(f"github_token:{user_id}")
+async def get_token(user_id: str) -> str:
+    """Retrieve GitHub access token for a user, from the local cache when possible."""
+    if _subscribed:
+        token = _token_cache.get(user_id)
+        if token is not None:
+            return token
+    generation = _generation
+    with metrics.REDIS_LATENCY.time("get"):
+        token = await redis_client.get(f"github_token:{user_id}")
+    if token and _subscribed and generation == _generation:
+        _token_cache.set(user_id, token)
     return token
 
-def delete_token(user_id: str):
+async def delete_token(user_id: str):
     """Delete GitHub access token for a user from Redis."""
-    redis_client.delete(f"github_token:{user_id}")
+    with metrics.REDIS_LATENCY.time("delete"):
+        await redis_client.delete(f"github_token:{user_id}")
+    await _publish_invalidation(user_id)
+
+async def listen_for_invalidations():
+    """
+    Evict cached tokens as soon as any worker saves or deletes one.
+    Runs for the lifetime of the app; while disconnected the cache is bypassed.
+    """
+    global _subscribed
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(TOKEN_INVALIDATION_CHANNEL)
+            _subscribed = True
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    _invalidate(message["data"])
+        except (redis.RedisError, OSError):
+            pass
+        finally:
+            # Invalidations may have been missed, so start from an empty cache
+            _subscribed = False
+            _token_cache.clear()
+            await pubsub.aclose()
+        await asyncio.sleep(1)
+
+def token_cache_stats() -> dict:
+    return _token_cache.stats()
+
+async def close_redis():
+    """Close the Redis connection pool."""
+    await redis_client.aclose()
+
+def token_fingerprint(access_token: str) -> str:
+    """Stable, non-reversible identifier for a token, safe to use in cache keys."""
+    return hashlib.sha256(access_token.encode()).hexdigest()[:16]
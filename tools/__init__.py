@@ -1,21 +1,57 @@
-import traceback
-from . import profile, repos, issues, pull_requests, commits, files
+import hashlib
+import json
+import time
+import metrics
+from . import profile, repos, issues, pull_requests, commits, files, trees, diffs, mirror, search
+from utils.validation import compile_validator, ValidationError
 
-MODULES = [profile, repos, issues, pull_requests, commits, files]
+MODULES = [profile, repos, issues, pull_requests, commits, files, trees, diffs, mirror, search]
 
-def get_all_tool_schemas():
-    tools_schemas = []
+def _build_registry():
+    """Map every tool name to its handler and a validator compiled from its input_schema."""
+    registry = {}
+    schemas = []
     for m in MODULES:
-        if hasattr(m, 'SCHEMAS'):
-            tools_schemas.extend(m.SCHEMAS)
-    return tools_schemas
+        schemas_by_name = {s["name"]: s for s in getattr(m, 'SCHEMAS', [])}
+        for name, handler in getattr(m, 'HANDLERS', {}).items():
+            schema = schemas_by_name.get(name)
+            validator = compile_validator(schema["input_schema"]) if schema else None
+            registry[name] = (handler, validator)
+        schemas.extend(getattr(m, 'SCHEMAS', []))
+    return registry, schemas
 
-def call_tool(tool_name: str, args: dict, token: str):
-    for m in MODULES:
-        if hasattr(m, 'HANDLERS') and tool_name in m.HANDLERS:
-            try:
-                return m.HANDLERS[tool_name](args, token)
-            except Exception as e:
-                # Can capture traceback.format_exc() here if testing mode enabled
-                return {"error": f"Tool execution failed: {str(e)}"}
-    return {"error": "Unknown tool"}
+REGISTRY, TOOL_SCHEMAS = _build_registry()
+
+# tools/list never changes at runtime, so its payload is serialized once
+TOOLS_LIST_JSON = json.dumps(TOOL_SCHEMAS, separators=(",", ":")).encode()
+TOOLS_LIST_ETAG = f'"{hashlib.sha256(TOOLS_LIST_JSON).hexdigest()[:16]}"'
+
+def get_all_tool_schemas():
+    return TOOL_SCHEMAS
+
+async def call_tool(tool_name: str, args: dict, token: str):
+    entry = REGISTRY.get(tool_name)
+    if entry is None:
+        # Arbitrary names would make the metric labels unbounded
+        metrics.TOOL_CALLS.inc("unknown", "unknown_tool")
+        return {"error": "Unknown tool"}
+    handler, validator = entry
+    if validator is not None:
+        try:
+            args = validator(args if args is not None else {})
+        except ValidationError as e:
+            metrics.TOOL_CALLS.inc(tool_name, "invalid_arguments")
+            return {"error": f"Invalid arguments: {e}"}
+    start = time.perf_counter()
+    outcome = "exception"
+    try:
+        result = await handler(args, token)
+        outcome = "error" if isinstance(result, dict) and "error" in result else "ok"
+        return result
+    except Exception as e:
+        # Can capture traceback.format_exc() here if testing mode enabled
+        return {"error": f"Tool execution failed: {str(e)}"}
+    finally:
+        # A call cancelled by the client is counted as "exception" too
+        metrics.TOOL_LATENCY.observe(time.perf_counter() - start, tool_name)
+        metrics.TOOL_CALLS.inc(tool_name, outcome)
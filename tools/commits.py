@@ -1,6 +1,6 @@
-from config import safe_limit
-from github_api import make_request
-from utils.serializers import serialize_commit, safe_list
+from config import safe_limit, MAX_ITEMS
+from github_api import make_request, paginate
+from utils.serializers import serialize_commit, serialize_page, page_serializer
 
 SCHEMAS = [
     {
@@ -14,7 +14,11 @@ SCHEMAS = [
                 "limit": {
                     "type": "integer",
                     "default": 10,
-                    "description": "Max commits (max 30)"
+                    "description": f"Max commits (max {MAX_ITEMS})"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Opaque next_cursor from a previous call, to resume the listing"
                 }
             },
             "required": ["owner", "repo"]
@@ -35,20 +39,21 @@ SCHEMAS = [
     }
 ]
 
-def list_commits(args: dict, token: str):
+async def list_commits(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
-    limit = safe_limit(args.get("limit", 10))
-    raw = make_request("GET", f"repos/{owner}/{repo}/commits", token, params={"per_page": limit})
-    if isinstance(raw, dict) and "error" in raw:
-        return raw
-    return safe_list(raw, serialize_commit)
+    limit = safe_limit(args.get("limit", 10), MAX_ITEMS)
+    page = await paginate(
+        f"repos/{owner}/{repo}/commits", token, limit=limit, cursor=args.get("cursor"),
+        stream_as=page_serializer(serialize_commit)
+    )
+    return serialize_page(page, serialize_commit)
 
-def get_commit(args: dict, token: str):
+async def get_commit(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
     ref = args["ref"]
-    raw = make_request("GET", f"repos/{owner}/{repo}/commits/{ref}", token)
+    raw = await make_request("GET", f"repos/{owner}/{repo}/commits/{ref}", token)
     if isinstance(raw, dict) and "error" in raw:
         return raw
     return serialize_commit(raw)
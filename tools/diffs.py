@@ -0,0 +1,103 @@
+import re
+import httpx
+import metrics
+from config import DIFF_MAX_BYTES
+from github_api import stream_request
+from tokens import token_fingerprint
+from utils.cache import LRUCache
+from utils.diff_window import DiffWindow
+
+DIFF_MEDIA_TYPE = "application/vnd.github.diff"
+_FULL_SHA = re.compile(r"^[0-9a-f]{40}$")
+
+# (token fingerprint, owner, repo, target) -> file summary of diffs between full SHAs,
+# which never change. Keyed by token like github_api's immutable cache, so a
+# summary is only served to a token that fetched it from GitHub itself.
+_summaries = LRUCache(1024)
+metrics.CACHES.register("diff_summaries", _summaries)
+
+SCHEMAS = [
+    {
+        "name": "github.get_diff",
+        "description": "Get the diff of a pull request, a commit or a comparison, indexed by file and hunk",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "pull_number": {"type": "integer", "description": "Pull request number"},
+                "ref": {"type": "string", "description": "Commit SHA, branch or tag (diff against its parent)"},
+                "base": {"type": "string", "description": "Base of a comparison (with head)"},
+                "head": {"type": "string", "description": "Head of a comparison (with base)"},
+                "paths": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only return hunks of these files"
+                },
+                "hunk_start": {"type": "integer", "minimum": 1, "description": "First hunk to return in each file, 1-based"},
+                "hunk_end": {"type": "integer", "minimum": 1, "description": "Last hunk to return in each file, inclusive"},
+                "summary_only": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "Only return the changed files with their +/- counts"
+                },
+                "max_bytes": {"type": "integer", "minimum": 1, "description": f"Size budget for returned hunks (max {DIFF_MAX_BYTES})"}
+            },
+            "required": ["owner", "repo"]
+        }
+    }
+]
+
+def _target(args: dict):
+    """Endpoint of the requested diff and whether it is addressed by SHAs only, or None if ambiguous."""
+    owner = args["owner"]
+    repo = args["repo"]
+    given = [k for k in ("pull_number", "ref") if k in args]
+    if "base" in args or "head" in args:
+        given.append("compare")
+    if len(given) != 1 or (given == ["compare"] and not ("base" in args and "head" in args)):
+        return None, False
+    if "pull_number" in args:
+        return f"repos/{owner}/{repo}/pulls/{args['pull_number']}", False
+    if "ref" in args:
+        return f"repos/{owner}/{repo}/commits/{args['ref']}", bool(_FULL_SHA.match(args["ref"]))
+    immutable = bool(_FULL_SHA.match(args["base"]) and _FULL_SHA.match(args["head"]))
+    return f"repos/{owner}/{repo}/compare/{args['base']}...{args['head']}", immutable
+
+async def get_diff(args: dict, token: str):
+    endpoint, immutable = _target(args)
+    if endpoint is None:
+        return {"error": "Invalid arguments: pass pull_number, ref, or base and head"}
+    summary_only = args.get("summary_only", False)
+    cache_key = (token_fingerprint(token), args["owner"].lower(), args["repo"].lower(), endpoint.split("/", 3)[3])
+    if summary_only and immutable:
+        files = _summaries.get(cache_key)
+        if files is not None:
+            return {"files": files, "truncated": False}
+
+    window = DiffWindow(
+        paths=args.get("paths"),
+        hunk_start=args.get("hunk_start"),
+        hunk_end=args.get("hunk_end"),
+        max_bytes=min(args.get("max_bytes", DIFF_MAX_BYTES), DIFF_MAX_BYTES),
+        keep_hunks=not summary_only,
+    )
+    # Parsed line by line as it arrives; only the selected hunks are held
+    async with stream_request("GET", endpoint, token, accept=DIFF_MEDIA_TYPE) as response:
+        if isinstance(response, dict):
+            return response
+        try:
+            async for line in response.aiter_lines():
+                window.feed(line)
+        except httpx.HTTPError as e:
+            return {"error": "GitHub API failure", "details": str(e)}
+
+    if immutable:
+        _summaries.set(cache_key, window.summary())
+    if summary_only:
+        return {"files": window.summary(), "truncated": False}
+    return window.result()
+
+HANDLERS = {
+    "github.get_diff": get_diff
+}
@@ -1,6 +1,34 @@
-from github_api import make_request
+import asyncio
+import base64
+import binascii
+import codecs
+import httpx
+import blob_store
+from config import (
+    FILE_WINDOW_MAX_BYTES,
+    FILE_WINDOW_DEFAULT_LINES,
+    COMMIT_BLOB_CONCURRENCY,
+    COMMIT_MAX_RETRIES,
+)
+from github_api import make_request, stream_request
+from tokens import token_fingerprint
+import tree_index
+from utils.cache import LRUCache
+from utils.content_window import ContentWindow
 from utils.serializers import serialize_file, safe_list
 
+RAW_MEDIA_TYPE = "application/vnd.github.raw"
+WINDOW_ARGS = ("offset", "limit", "start_line", "end_line", "sha")
+MMAP_CHUNK = 1 << 16
+
+# (owner, repo, commit sha, path) -> blob sha of files fetched before
+_blob_shas = LRUCache(50000)
+# Repositories with blobs in the local store, so unrelated reads skip ref resolution
+_repos_with_blobs = LRUCache(1000)
+# (token fingerprint, owner, repo, blob sha) of blobs a token has read from GitHub.
+# The blob store is shared by all tokens, so it is only read for blobs the token can see.
+_readable_blobs = LRUCache(50000)
+
 SCHEMAS = [
     {
         "name": "github.get_file_contents",
@@ -11,7 +39,12 @@ SCHEMAS = [
                 "owner": {"type": "string"},
                 "repo": {"type": "string"},
                 "path": {"type": "string", "description": "File path in the repository"},
-                "ref": {"type": "string", "description": "The name of the commit/branch/tag."}
+                "ref": {"type": "string", "description": "The name of the commit/branch/tag."},
+                "offset": {"type": "integer", "minimum": 0, "description": "Byte offset to start reading from (streams the raw file)"},
+                "limit": {"type": "integer", "minimum": 1, "description": f"Number of bytes to return (max {FILE_WINDOW_MAX_BYTES})"},
+                "start_line": {"type": "integer", "minimum": 1, "description": "First line to return, 1-based (streams the raw file)"},
+                "end_line": {"type": "integer", "minimum": 1, "description": f"Last line to return, inclusive (default start_line + {FILE_WINDOW_DEFAULT_LINES - 1})"},
+                "sha": {"type": "string", "description": "Blob SHA; reads through the Git blob API, which supports files up to 100 MB"}
             },
             "required": ["owner", "repo", "path"]
         }
@@ -32,23 +65,226 @@ SCHEMAS = [
             },
             "required": ["owner", "repo", "path", "message", "content"]
         }
+    },
+    {
+        "name": "github.commit_files",
+        "description": "Add, modify and delete several files in a single commit on a branch",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "branch": {"type": "string", "description": "Branch to commit to; it is fast-forwarded to the new commit."},
+                "message": {"type": "string", "description": "The commit message."},
+                "changes": {
+                    "type": "array",
+                    "description": "File changes to apply",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "path": {"type": "string"},
+                            "action": {"type": "string", "enum": ["add", "modify", "delete"], "default": "modify"},
+                            "content": {"type": "string", "description": "New file content (required unless deleting)"},
+                            "encoding": {"type": "string", "enum": ["utf-8", "base64"], "default": "utf-8"},
+                            "mode": {"type": "string", "enum": ["100644", "100755"], "default": "100644"}
+                        },
+                        "required": ["path"]
+                    }
+                }
+            },
+            "required": ["owner", "repo", "branch", "message", "changes"]
+        }
     }
 ]
 
-def get_file_contents(args: dict, token: str):
+def _repo_key(owner: str, repo: str):
+    return (owner.lower(), repo.lower())
+
+async def _locate_blob(owner: str, repo: str, path: str, ref: str, token: str):
+    """
+    Find the commit and blob SHA of a file without downloading it.
+    Returns (commit_sha, blob_sha); either may be None when unknown.
+    """
+    commit = await tree_index.resolve_ref(owner, repo, ref, token)
+    if isinstance(commit, dict):
+        return None, None
+    index = tree_index.cached_index(owner, repo, commit)
+    blob_sha = index.blob_sha(path) if index is not None else None
+    if blob_sha is None:
+        blob_sha = _blob_shas.get((*_repo_key(owner, repo), commit, path.strip("/")))
+    return commit, blob_sha
+
+def _remember_blob(owner: str, repo: str, commit: str, path: str, blob_sha: str, token: str):
+    _repos_with_blobs.set(_repo_key(owner, repo), True)
+    _readable_blobs.set((token_fingerprint(token), *_repo_key(owner, repo), blob_sha), True)
+    if commit:
+        _blob_shas.set((*_repo_key(owner, repo), commit, path.strip("/")), blob_sha)
+
+def _window_result(path: str, window: ContentWindow) -> dict:
+    return {
+        "name": path.rsplit("/", 1)[-1],
+        "path": path,
+        "size": window.size,
+        "line_count": window.line_count,
+        **window.result()
+    }
+
+async def _read_window(args: dict, token: str):
+    """
+    Stream the raw file and return only the requested byte range or line window,
+    together with the file's total size and line count.
+    Blobs already in the local store are read through a memory map instead.
+    """
+    owner = args["owner"]
+    repo = args["repo"]
+    path = args["path"]
+    start_line = args.get("start_line")
+    end_line = args.get("end_line")
+    if start_line is not None and end_line is None:
+        end_line = start_line + FILE_WINDOW_DEFAULT_LINES - 1
+    window = ContentWindow(
+        offset=args.get("offset"),
+        limit=args.get("limit"),
+        start_line=start_line,
+        end_line=end_line,
+        max_bytes=FILE_WINDOW_MAX_BYTES,
+    )
+
+    commit, blob_sha = None, args.get("sha")
+    readable = False
+    if blob_store.enabled() and not blob_sha:
+        commit, blob_sha = await _locate_blob(owner, repo, path, args.get("ref"), token)
+        # Located through a ref resolved with this token, so access is checked
+        readable = blob_sha is not None
+    elif blob_store.enabled():
+        # A caller-supplied SHA proves nothing: serve it locally only if this
+        # token read it before, or it is what the token's own ref resolution finds
+        readable = _readable_blobs.get((token_fingerprint(token), *_repo_key(owner, repo), blob_sha)) is not None
+        if not readable:
+            readable = (await _locate_blob(owner, repo, path, args.get("ref"), token))[1] == blob_sha
+    if readable:
+        with blob_store.open_blob(blob_sha) as mm:
+            if mm is not None:
+                for i in range(0, len(mm), MMAP_CHUNK):
+                    window.feed(mm[i:i + MMAP_CHUNK])
+                return _window_result(path, window)
+
+    params = {}
+    if blob_sha:
+        endpoint = f"repos/{owner}/{repo}/git/blobs/{blob_sha}"
+    else:
+        endpoint = f"repos/{owner}/{repo}/contents/{path}"
+        if commit or "ref" in args:
+            params["ref"] = commit or args["ref"]
+
+    writer = blob_store.BlobWriter() if blob_store.enabled() else None
+    try:
+        async with stream_request("GET", endpoint, token, params=params, accept=RAW_MEDIA_TYPE) as response:
+            if isinstance(response, dict):
+                return response
+            try:
+                async for chunk in response.aiter_bytes():
+                    window.feed(chunk)
+                    if writer:
+                        writer.write(chunk)
+            except httpx.HTTPError as e:
+                return {"error": "GitHub API failure", "details": str(e)}
+        if writer:
+            stored_sha = await asyncio.to_thread(writer.commit, blob_sha)
+            writer = None
+            if stored_sha:
+                _remember_blob(owner, repo, commit, path, stored_sha, token)
+    finally:
+        if writer:
+            writer.abort()
+
+    return _window_result(path, window)
+
+def _serialize_cached_blob(path: str, blob_sha: str, mm) -> dict:
+    """serialize_file output for a blob served from the local store, reading only its head."""
+    # serialize_file keeps 5000 characters; 4 bytes per character always covers that
+    head = bytes(mm[:20004])
+    content = None
+    if b"\0" not in head[:8000]:
+        try:
+            decoder = codecs.getincrementaldecoder("utf-8")()
+            content = decoder.decode(head, final=len(mm) <= len(head))
+        except UnicodeDecodeError:
+            pass
+    if content is None:
+        # Same as the contents API: binary files stay base64
+        return serialize_file({
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "sha": blob_sha,
+            "size": len(mm),
+            "content": base64.b64encode(bytes(mm[:3753])).decode(),
+            "encoding": "base64"
+        })
+    return serialize_file({
+        "name": path.rsplit("/", 1)[-1],
+        "path": path,
+        "sha": blob_sha,
+        "size": len(mm),
+        "content": content,
+        "encoding": "utf-8"
+    })
+
+async def _indexed_directory(owner: str, repo: str, path: str, ref: str, token: str):
+    """Directory listing from an already cached tree index, or None to use the contents API."""
+    if not tree_index.has_index(owner, repo):
+        return None
+    sha = await tree_index.resolve_ref(owner, repo, ref, token)
+    if isinstance(sha, dict):
+        return None
+    index = tree_index.cached_index(owner, repo, sha)
+    if index is None or index.truncated or not index.is_dir(path):
+        return None
+    return [
+        {"name": e["name"], "path": e["path"], "sha": e["sha"], "size": e.get("size", 0), "content": "", "encoding": None}
+        for e in map(index.entry, index.children(path))
+    ]
+
+async def get_file_contents(args: dict, token: str):
+    if any(k in args for k in WINDOW_ARGS):
+        return await _read_window(args, token)
     owner = args["owner"]
     repo = args["repo"]
     path = args["path"]
+    listing = await _indexed_directory(owner, repo, path, args.get("ref"), token)
+    if listing is not None:
+        return listing
+
     params = {}
     if "ref" in args:
         params["ref"] = args["ref"]
-    raw = make_request("GET", f"repos/{owner}/{repo}/contents/{path}", token, params=params)
+    commit = None
+    if blob_store.enabled() and _repos_with_blobs.get(_repo_key(owner, repo)):
+        commit, blob_sha = await _locate_blob(owner, repo, path, args.get("ref"), token)
+        if blob_sha:
+            with blob_store.open_blob(blob_sha) as mm:
+                if mm is not None:
+                    return _serialize_cached_blob(path, blob_sha, mm)
+        if commit:
+            params["ref"] = commit
+
+    raw = await make_request("GET", f"repos/{owner}/{repo}/contents/{path}", token, params=params)
     if isinstance(raw, dict) and "error" in raw:
-        return raw        
+        return raw
+
+    # Keep the decoded file in the blob store for later reads
+    if blob_store.enabled() and isinstance(raw, dict) and raw.get("encoding") == "base64" and raw.get("content"):
+        try:
+            data = base64.b64decode(raw["content"])
+        except binascii.Error:
+            data = None
+        if data is not None and blob_store.put(data, raw.get("sha")):
+            _remember_blob(owner, repo, commit, path, raw["sha"], token)
+
     # GitHub often returns file contents as objects if it's a file, but lists if it's a directory
     return safe_list(raw, serialize_file)
 
-def create_or_update_file(args: dict, token: str):
+async def create_or_update_file(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
     path = args["path"]
@@ -61,7 +297,7 @@ def create_or_update_file(args: dict, token: str):
     if "branch" in args:
         json_data["branch"] = args["branch"]
         
-    raw = make_request("PUT", f"repos/{owner}/{repo}/contents/{path}", token, json=json_data)
+    raw = await make_request("PUT", f"repos/{owner}/{repo}/contents/{path}", token, json=json_data)
     if isinstance(raw, dict) and "error" in raw:
         return raw
     # We serialize the created file content representation here (or return empty if none)
@@ -69,7 +305,88 @@ def create_or_update_file(args: dict, token: str):
         return serialize_file(raw["content"])
     return {"status": "success"}
 
+async def commit_files(args: dict, token: str):
+    owner = args["owner"]
+    repo = args["repo"]
+    branch = args["branch"]
+    changes = args["changes"]
+    if not changes:
+        return {"error": "No changes to commit"}
+    for change in changes:
+        if change.get("action", "modify") != "delete" and "content" not in change:
+            return {"error": f"Missing content for '{change['path']}'"}
+
+    # Blobs don't depend on the branch head, so they are uploaded once, concurrently
+    semaphore = asyncio.Semaphore(COMMIT_BLOB_CONCURRENCY)
+
+    async def upload(change):
+        async with semaphore:
+            return await make_request("POST", f"repos/{owner}/{repo}/git/blobs", token, json={
+                "content": change["content"],
+                "encoding": change.get("encoding", "utf-8")
+            })
+
+    writes = [c for c in changes if c.get("action", "modify") != "delete"]
+    blobs = await asyncio.gather(*(upload(c) for c in writes))
+    for blob in blobs:
+        if "error" in blob:
+            return blob
+
+    tree = [
+        {"path": c["path"], "mode": c.get("mode", "100644"), "type": "blob", "sha": blob["sha"]}
+        for c, blob in zip(writes, blobs)
+    ]
+    tree += [
+        {"path": c["path"], "mode": c.get("mode", "100644"), "type": "blob", "sha": None}
+        for c in changes if c.get("action", "modify") == "delete"
+    ]
+
+    # Build the commit on the current head; if the branch moves before the ref
+    # update, rebuild on the new head (optimistic concurrency)
+    for attempt in range(1, COMMIT_MAX_RETRIES + 2):
+        ref = await make_request("GET", f"repos/{owner}/{repo}/git/ref/heads/{branch}", token)
+        if "error" in ref:
+            return ref
+        head_sha = ref["object"]["sha"]
+        head = await make_request("GET", f"repos/{owner}/{repo}/git/commits/{head_sha}", token)
+        if "error" in head:
+            return head
+
+        new_tree = await make_request("POST", f"repos/{owner}/{repo}/git/trees", token, json={
+            "base_tree": head["tree"]["sha"],
+            "tree": tree
+        })
+        if "error" in new_tree:
+            return new_tree
+        commit = await make_request("POST", f"repos/{owner}/{repo}/git/commits", token, json={
+            "message": args["message"],
+            "tree": new_tree["sha"],
+            "parents": [head_sha]
+        })
+        if "error" in commit:
+            return commit
+
+        updated = await make_request("PATCH", f"repos/{owner}/{repo}/git/refs/heads/{branch}", token, json={
+            "sha": commit["sha"],
+            "force": False
+        })
+        if "error" not in updated:
+            return {
+                "commit_sha": commit["sha"],
+                "tree_sha": new_tree["sha"],
+                "branch": branch,
+                "files_changed": len(changes),
+                "url": commit.get("html_url"),
+                "attempts": attempt
+            }
+        # 422: not a fast-forward, someone pushed in between
+        if updated.get("status") != 422:
+            return updated
+
+    return {"error": f"Branch '{branch}' kept moving; gave up after {COMMIT_MAX_RETRIES + 1} attempts"}
+
 HANDLERS = {
     "github.get_file_contents": get_file_contents,
-    "github.create_or_update_file": create_or_update_file
+    "github.create_or_update_file": create_or_update_file,
+    "github.commit_files": commit_files
 }
@@ -1,6 +1,6 @@
-from config import safe_limit
-from github_api import make_request
-from utils.serializers import serialize_issue, safe_list
+from config import safe_limit, MAX_ITEMS
+from github_api import make_request, paginate
+from utils.serializers import serialize_issue, serialize_page, page_serializer
 
 SCHEMAS = [
     {
@@ -14,7 +14,16 @@ SCHEMAS = [
                 "limit": {
                     "type": "integer",
                     "default": 10,
-                    "description": "Max issues (max 30)"
+                    "description": f"Max issues (max {MAX_ITEMS})"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Opaque next_cursor from a previous call, to resume the listing"
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only return these fields of each item (e.g. [\"number\", \"title\"])"
                 }
             },
             "required": ["owner", "repo"]
@@ -63,37 +72,42 @@ SCHEMAS = [
     }
 ]
 
-def list_issues(args: dict, token: str):
+async def list_issues(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
-    limit = safe_limit(args.get("limit", 10))
-    raw = make_request("GET", f"repos/{owner}/{repo}/issues", token, params={"per_page": limit})
-    if isinstance(raw, dict) and "error" in raw:
-        return raw
-    return safe_list(raw, serialize_issue)
+    limit = safe_limit(args.get("limit", 10), MAX_ITEMS)
+    cursor = args.get("cursor")
+    fields = args.get("fields")
+    # REST only: like the issues endpoint, the listing includes pull requests,
+    # which GraphQL's issues connection leaves out
+    page = await paginate(
+        f"repos/{owner}/{repo}/issues", token, limit=limit, cursor=cursor,
+        stream_as=page_serializer(serialize_issue, fields)
+    )
+    return serialize_page(page, serialize_issue, fields)
 
-def create_issue(args: dict, token: str):
+async def create_issue(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
     title = args["title"]
     body = args.get("body", "")
-    raw = make_request("POST", f"repos/{owner}/{repo}/issues", token, json={"title": title, "body": body})
+    raw = await make_request("POST", f"repos/{owner}/{repo}/issues", token, json={"title": title, "body": body})
     if isinstance(raw, dict) and "error" in raw:
         return raw
     return serialize_issue(raw)
 
-def comment_on_issue(args: dict, token: str):
+async def comment_on_issue(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
     issue_number = args["issue_number"]
     body = args["body"]
-    return make_request("POST", f"repos/{owner}/{repo}/issues/{issue_number}/comments", token, json={"body": body})
+    return await make_request("POST", f"repos/{owner}/{repo}/issues/{issue_number}/comments", token, json={"body": body})
 
-def close_issue(args: dict, token: str):
+async def close_issue(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
     issue_number = args["issue_number"]
-    raw = make_request("PATCH", f"repos/{owner}/{repo}/issues/{issue_number}", token, json={"state": "closed"})
+    raw = await make_request("PATCH", f"repos/{owner}/{repo}/issues/{issue_number}", token, json={"state": "closed"})
     if isinstance(raw, dict) and "error" in raw:
         return raw
     return serialize_issue(raw)
@@ -0,0 +1,102 @@
+from config import safe_limit, MAX_ITEMS
+import issue_mirror
+from utils.serializers import project
+
+def _query_schema(name: str, noun: str, states: list) -> dict:
+    return {
+        "name": name,
+        "description": f"Filter and sort the {noun} of a mirrored repository locally (see github.sync_mirror)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "state": {"type": "string", "enum": states, "default": "open"},
+                "labels": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only items carrying all of these labels"
+                },
+                "author": {"type": "string", "description": "Login of the author"},
+                "updated_since": {"type": "string", "description": "ISO 8601 timestamp; only items updated at or after it"},
+                "sort": {"type": "string", "enum": list(issue_mirror.SORT_COLUMNS), "default": "updated"},
+                "direction": {"type": "string", "enum": ["asc", "desc"], "default": "desc"},
+                "limit": {
+                    "type": "integer",
+                    "default": 30,
+                    "description": f"Max items (max {MAX_ITEMS})"
+                },
+                "offset": {"type": "integer", "minimum": 0, "default": 0, "description": "next_offset from a previous call"},
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only return these fields of each item (e.g. [\"number\", \"title\"])"
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    }
+
+SCHEMAS = [
+    {
+        "name": "github.sync_mirror",
+        "description": "Mirror a repository's issues and pull requests locally, or bring the mirror up to date",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "full": {
+                    "type": "boolean",
+                    "default": False,
+                    "description": "Drop the mirror and fetch everything again (picks up deleted or transferred issues)"
+                }
+            },
+            "required": ["owner", "repo"]
+        }
+    },
+    _query_schema("github.query_issues", "issues", ["open", "closed", "all"]),
+    _query_schema("github.query_pull_requests", "pull requests", ["open", "closed", "merged", "all"]),
+]
+
+async def sync_mirror(args: dict, token: str):
+    if not issue_mirror.enabled():
+        return {"error": "Local mirror is disabled", "details": "Set GITHUB_MIRROR_DB to a file path"}
+    return await issue_mirror.sync(args["owner"], args["repo"], token, full=args.get("full", False))
+
+async def _query(args: dict, token: str, kind: str):
+    owner = args["owner"]
+    repo = args["repo"]
+    if not issue_mirror.is_mirrored(owner, repo):
+        return {"error": "Repository is not mirrored", "details": "Call github.sync_mirror first"}
+    # One small `since` request keeps the mirror current
+    failed = await issue_mirror.refresh(owner, repo, token)
+    if failed:
+        return failed
+    page = await issue_mirror.query(
+        owner, repo, kind,
+        state=args.get("state", "open"),
+        labels=args.get("labels"),
+        author=args.get("author"),
+        updated_since=args.get("updated_since"),
+        sort=args.get("sort", "updated"),
+        direction=args.get("direction", "desc"),
+        limit=safe_limit(args.get("limit", 30), MAX_ITEMS),
+        offset=args.get("offset", 0),
+    )
+    fields = args.get("fields")
+    if fields:
+        page["items"] = [project(item, fields) for item in page["items"]]
+    return page
+
+async def query_issues(args: dict, token: str):
+    return await _query(args, token, "issue")
+
+async def query_pull_requests(args: dict, token: str):
+    return await _query(args, token, "pull_request")
+
+HANDLERS = {
+    "github.sync_mirror": sync_mirror,
+    "github.query_issues": query_issues,
+    "github.query_pull_requests": query_pull_requests
+}
@@ -12,8 +12,8 @@ SCHEMAS = [
     }
 ]
 
-def get_me(args: dict, token: str):
-    raw = make_request("GET", "user", token)
+async def get_me(args: dict, token: str):
+    raw = await make_request("GET", "user", token)
     if isinstance(raw, dict) and "error" in raw:
         return raw        
     return serialize_user(raw)
@@ -1,6 +1,32 @@
-from config import safe_limit
-from github_api import make_request
-from utils.serializers import serialize_pull_request, safe_list
+import asyncio
+
+from config import (
+    safe_limit,
+    MAX_ITEMS,
+    GRAPHQL_ENABLED,
+    PR_BUNDLE_CONCURRENCY,
+    PR_BUNDLE_PART_TIMEOUT,
+    PR_BUNDLE_MAX_BYTES,
+    PR_BUNDLE_MAX_ITEMS,
+)
+from github_api import make_request, paginate
+import github_graphql
+from utils.pagination import cursor_backend
+from utils.responses import dumps
+from utils.serializers import (
+    serialize_pull_request,
+    serialize_pull_request_file,
+    serialize_review,
+    serialize_review_comment,
+    serialize_check_run,
+    serialize_commit,
+    serialize_page,
+    page_serializer,
+    project,
+    safe_list,
+)
+
+BUNDLE_PARTS = ["files", "reviews", "review_comments", "checks", "commits"]
 
 SCHEMAS = [
     {
@@ -20,7 +46,16 @@ SCHEMAS = [
                 "limit": {
                     "type": "integer",
                     "default": 10,
-                    "description": "Max pull requests (max 30)"
+                    "description": f"Max pull requests (max {MAX_ITEMS})"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Opaque next_cursor from a previous call, to resume the listing"
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only return these fields of each item (e.g. [\"number\", \"title\"])"
                 }
             },
             "required": ["owner", "repo"]
@@ -34,7 +69,40 @@ SCHEMAS = [
             "properties": {
                 "owner": {"type": "string"},
                 "repo": {"type": "string"},
-                "pull_number": {"type": "integer"}
+                "pull_number": {"type": "integer"},
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only return these fields of each item (e.g. [\"number\", \"title\"])"
+                }
+            },
+            "required": ["owner", "repo", "pull_number"]
+        }
+    },
+    {
+        "name": "github.get_pull_request_bundle",
+        "description": "Get everything needed to review a pull request in one call: details, changed files with patches, reviews, review comments, check runs and commits",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "pull_number": {"type": "integer"},
+                "parts": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": BUNDLE_PARTS},
+                    "description": "Only fetch these parts (default: all)"
+                },
+                "limit": {
+                    "type": "integer",
+                    "default": PR_BUNDLE_MAX_ITEMS,
+                    "description": f"Max items per part (max {PR_BUNDLE_MAX_ITEMS})"
+                },
+                "max_bytes": {
+                    "type": "integer",
+                    "default": PR_BUNDLE_MAX_BYTES,
+                    "description": "Size budget of the result; patches, then the largest parts, are cut to fit"
+                }
             },
             "required": ["owner", "repo", "pull_number"]
         }
@@ -87,34 +155,148 @@ SCHEMAS = [
     }
 ]
 
-def list_pull_requests(args: dict, token: str):
+async def list_pull_requests(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
-    limit = safe_limit(args.get("limit", 10))
+    limit = safe_limit(args.get("limit", 10), MAX_ITEMS)
     state = args.get("state", "open")
-    raw = make_request(
-        "GET", 
-        f"repos/{owner}/{repo}/pulls", 
-        token, 
-        params={"per_page": limit, "state": state}
+    cursor = args.get("cursor")
+    fields = args.get("fields")
+    if GRAPHQL_ENABLED and cursor_backend(cursor) != "rest":
+        page = await github_graphql.list_pull_requests(owner, repo, state, token, limit, cursor, fields)
+        # Fall back to REST unless the caller is resuming a GraphQL listing
+        if "error" not in page or cursor:
+            return page
+    page = await paginate(
+        f"repos/{owner}/{repo}/pulls",
+        token,
+        params={"state": state},
+        limit=limit,
+        cursor=cursor,
+        stream_as=page_serializer(serialize_pull_request, fields)
     )
-    if isinstance(raw, dict) and "error" in raw:
-        return raw
-    return safe_list(raw, serialize_pull_request)
+    return serialize_page(page, serialize_pull_request, fields)
 
-def get_pull_request(args: dict, token: str):
+async def get_pull_request(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
     pull_number = args["pull_number"]
-    raw = make_request("GET", f"repos/{owner}/{repo}/pulls/{pull_number}", token)
+    fields = args.get("fields")
+    if GRAPHQL_ENABLED:
+        pr = await github_graphql.get_pull_request(owner, repo, pull_number, token, fields)
+        if "error" not in pr:
+            return pr
+    raw = await make_request("GET", f"repos/{owner}/{repo}/pulls/{pull_number}", token)
     if isinstance(raw, dict) and "error" in raw:
         return raw
-    return serialize_pull_request(raw)
+    return project(serialize_pull_request(raw), fields)
+
+async def _bundle_list(endpoint: str, token: str, serializer, limit: int):
+    page = await paginate(endpoint, token, limit=limit)
+    if "error" in page:
+        return page
+    return {"items": safe_list(page["items"], serializer), "more": page["next_cursor"] is not None}
+
+def _fit_budget(bundle: dict, truncated: list, max_bytes: int):
+    """Shrink a bundle until its JSON fits in max_bytes, recording what was cut in `truncated`."""
+    if len(dumps(bundle)) <= max_bytes:
+        return
+    # Patches are most of a typical bundle and can be fetched per file later; largest go first
+    patched = sorted((f for f in bundle.get("files") or [] if f.get("patch")), key=lambda f: -len(f["patch"]))
+    for f in patched:
+        f["patch"] = None
+        if "patches" not in truncated:
+            truncated.append("patches")
+        if len(dumps(bundle)) <= max_bytes:
+            return
+    while len(dumps(bundle)) > max_bytes:
+        parts = [name for name in BUNDLE_PARTS if bundle.get(name)]
+        if not parts:
+            break
+        largest = max(parts, key=lambda name: len(dumps(bundle[name])))
+        bundle[largest] = bundle[largest][:len(bundle[largest]) // 2]
+        if largest not in truncated:
+            truncated.append(largest)
+
+async def get_pull_request_bundle(args: dict, token: str):
+    owner = args["owner"]
+    repo = args["repo"]
+    pull_number = args["pull_number"]
+    wanted = args.get("parts") or BUNDLE_PARTS
+    limit = safe_limit(args.get("limit", PR_BUNDLE_MAX_ITEMS), PR_BUNDLE_MAX_ITEMS)
+    max_bytes = args.get("max_bytes", PR_BUNDLE_MAX_BYTES)
+    base = f"repos/{owner}/{repo}/pulls/{pull_number}"
+    semaphore = asyncio.Semaphore(PR_BUNDLE_CONCURRENCY)
+
+    async def fetch(name: str, make_coro):
+        # The timeout only starts once the part holds a fan-out slot
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(make_coro(), PR_BUNDLE_PART_TIMEOUT)
+            except asyncio.TimeoutError:
+                return {"error": "Timed out", "details": f"{name} took longer than {PR_BUNDLE_PART_TIMEOUT}s"}
+
+    async def checks():
+        # Check runs belong to the head commit, so they need the pull request first
+        pr = await pr_task
+        if isinstance(pr, dict) and "error" in pr:
+            return {"error": "Skipped", "details": "Pull request could not be fetched"}
+        head = (pr.get("head") or {}).get("sha")
+
+        async def runs():
+            raw = await make_request("GET", f"repos/{owner}/{repo}/commits/{head}/check-runs", token,
+                                     params={"per_page": limit})
+            if isinstance(raw, dict) and "error" in raw:
+                return raw
+            items = safe_list(raw.get("check_runs", []), serialize_check_run)
+            return {"items": items, "more": raw.get("total_count", 0) > len(items)}
+        return await fetch("checks", runs)
+
+    pr_task = asyncio.create_task(fetch("pull_request", lambda: make_request("GET", base, token)))
+    makers = {
+        "files": lambda: _bundle_list(f"{base}/files", token, serialize_pull_request_file, limit),
+        "reviews": lambda: _bundle_list(f"{base}/reviews", token, serialize_review, limit),
+        "review_comments": lambda: _bundle_list(f"{base}/comments", token, serialize_review_comment, limit),
+        "commits": lambda: _bundle_list(f"{base}/commits", token, serialize_commit, limit),
+    }
+    names = [name for name in BUNDLE_PARTS if name in wanted]
+    results = await asyncio.gather(
+        pr_task,
+        *(checks() if name == "checks" else fetch(name, makers[name]) for name in names),
+    )
+
+    raw_pr, parts = results[0], dict(zip(names, results[1:]))
+    if isinstance(raw_pr, dict) and "error" in raw_pr and all("error" in part for part in parts.values()):
+        return raw_pr
+
+    bundle = {"pull_request": None}
+    truncated = []
+    errors = {}
+    if isinstance(raw_pr, dict) and "error" in raw_pr:
+        errors["pull_request"] = raw_pr
+    else:
+        bundle["pull_request"] = {**serialize_pull_request(raw_pr), "body": (raw_pr.get("body") or "")[:4000]}
+    for name, part in parts.items():
+        if "error" in part:
+            # Partial result: the other parts are still returned
+            errors[name] = part
+            bundle[name] = None
+            continue
+        bundle[name] = part["items"]
+        if part["more"]:
+            truncated.append(name)
+
+    _fit_budget(bundle, truncated, max_bytes)
+    if truncated:
+        bundle["truncated"] = truncated
+    if errors:
+        bundle["errors"] = errors
+    return bundle
 
-def create_pull_request(args: dict, token: str):
+async def create_pull_request(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
-    raw = make_request(
+    raw = await make_request(
         "POST", 
         f"repos/{owner}/{repo}/pulls", 
         token, 
@@ -129,19 +311,19 @@ def create_pull_request(args: dict, token: str):
         return raw
     return serialize_pull_request(raw)
 
-def comment_on_pull_request(args: dict, token: str):
+async def comment_on_pull_request(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
     pull_number = args["pull_number"]
     body = args["body"]
-    return make_request(
+    return await make_request(
         "POST", 
         f"repos/{owner}/{repo}/issues/{pull_number}/comments", 
         token, 
         json={"body": body}
     )
 
-def merge_pull_request(args: dict, token: str):
+async def merge_pull_request(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
     pull_number = args["pull_number"]
@@ -153,7 +335,7 @@ def merge_pull_request(args: dict, token: str):
     if "merge_method" in args:
         json_data["merge_method"] = args["merge_method"]
         
-    return make_request(
+    return await make_request(
         "PUT", 
         f"repos/{owner}/{repo}/pulls/{pull_number}/merge", 
         token, 
@@ -163,6 +345,7 @@ def merge_pull_request(args: dict, token: str):
 HANDLERS = {
     "github.list_pull_requests": list_pull_requests,
     "github.get_pull_request": get_pull_request,
+    "github.get_pull_request_bundle": get_pull_request_bundle,
     "github.create_pull_request": create_pull_request,
     "github.comment_on_pull_request": comment_on_pull_request,
     "github.merge_pull_request": merge_pull_request
@@ -1,6 +1,8 @@
-from config import safe_limit
-from github_api import make_request
-from utils.serializers import serialize_repo, safe_list
+from config import safe_limit, MAX_ITEMS, GRAPHQL_ENABLED
+from github_api import make_request, paginate
+import github_graphql
+from utils.pagination import cursor_backend
+from utils.serializers import serialize_repo, serialize_page, page_serializer, project
 
 SCHEMAS = [
     {
@@ -12,7 +14,16 @@ SCHEMAS = [
                 "limit": {
                     "type": "integer",
                     "default": 10,
-                    "description": "Max repositories (max 30)"
+                    "description": f"Max repositories (max {MAX_ITEMS})"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Opaque next_cursor from a previous call, to resume the listing"
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only return these fields of each item (e.g. [\"number\", \"title\"])"
                 }
             }
         }
@@ -24,7 +35,12 @@ SCHEMAS = [
             "type": "object",
             "properties": {
                 "owner": {"type": "string", "description": "Repository owner"},
-                "repo": {"type": "string", "description": "Repository name"}
+                "repo": {"type": "string", "description": "Repository name"},
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only return these fields of each item (e.g. [\"number\", \"title\"])"
+                }
             },
             "required": ["owner", "repo"]
         }
@@ -36,33 +52,56 @@ SCHEMAS = [
             "type": "object",
             "properties": {
                 "owner": {"type": "string", "description": "Repository owner"},
-                "repo": {"type": "string", "description": "Repository name"}
+                "repo": {"type": "string", "description": "Repository name"},
+                "limit": {
+                    "type": "integer",
+                    "default": 30,
+                    "description": f"Max branches (max {MAX_ITEMS})"
+                },
+                "cursor": {
+                    "type": "string",
+                    "description": "Opaque next_cursor from a previous call, to resume the listing"
+                }
             },
             "required": ["owner", "repo"]
         }
     }
 ]
 
-def list_repos(args: dict, token: str):
-    limit = safe_limit(args.get("limit", 10))
-    raw = make_request("GET", "user/repos", token, params={"per_page": limit})
-    # If error JSON is returned, raw will usually have 'error', which is not a list.
-    if isinstance(raw, dict) and "error" in raw:
-        return raw
-    return safe_list(raw, serialize_repo)
+async def list_repos(args: dict, token: str):
+    limit = safe_limit(args.get("limit", 10), MAX_ITEMS)
+    cursor = args.get("cursor")
+    fields = args.get("fields")
+    if GRAPHQL_ENABLED and cursor_backend(cursor) != "rest":
+        page = await github_graphql.list_repos(token, limit, cursor, fields)
+        # Fall back to REST unless the caller is resuming a GraphQL listing
+        if "error" not in page or cursor:
+            return page
+    page = await paginate("user/repos", token, limit=limit, cursor=cursor, stream_as=page_serializer(serialize_repo, fields))
+    return serialize_page(page, serialize_repo, fields)
 
-def get_repo_details(args: dict, token: str):
+async def get_repo_details(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
-    raw = make_request("GET", f"repos/{owner}/{repo}", token)
+    fields = args.get("fields")
+    if GRAPHQL_ENABLED:
+        details = await github_graphql.get_repo_details(owner, repo, token, fields)
+        if "error" not in details:
+            return details
+    raw = await make_request("GET", f"repos/{owner}/{repo}", token)
     if isinstance(raw, dict) and "error" in raw:
         return raw
-    return serialize_repo(raw)
+    return project(serialize_repo(raw), fields)
 
-def list_branches(args: dict, token: str):
+async def list_branches(args: dict, token: str):
     owner = args["owner"]
     repo = args["repo"]
-    return make_request("GET", f"repos/{owner}/{repo}/branches", token)
+    limit = safe_limit(args.get("limit", 30), MAX_ITEMS)
+    page = await paginate(
+        f"repos/{owner}/{repo}/branches", token, limit=limit, cursor=args.get("cursor"),
+        stream_as=page_serializer()
+    )
+    return serialize_page(page)
 
 HANDLERS = {
     "github.list_repos": list_repos,
@@ -0,0 +1,189 @@
+import re
+from config import safe_limit, MAX_ITEMS
+from github_api import paginate
+from utils.serializers import (
+    serialize_search_issue,
+    serialize_search_code,
+    serialize_search_commit,
+    serialize_page,
+    page_serializer,
+)
+
+# Search results carry `text_matches` highlights with this media type
+TEXT_MATCH_MEDIA_TYPE = "application/vnd.github.text-match+json"
+# GitHub never returns more than the first 1000 results of a search
+SEARCH_MAX_RESULTS = 1000
+_NEEDS_QUOTES = re.compile(r'[\s:"()]')
+_ISSUE_KIND = re.compile(r"\b(?:is|type):(?:issue|pr|pull-request)\b")
+
+_SCOPE_PROPERTIES = {
+    "query": {"type": "string", "description": "Free text, may include raw GitHub search qualifiers"},
+    "owner": {"type": "string", "description": "User or organization to search in"},
+    "repo": {"type": "string", "description": "Repository to search in (with owner)"},
+}
+
+_PAGING_PROPERTIES = {
+    "limit": {
+        "type": "integer",
+        "default": 30,
+        "description": f"Max results (max {min(MAX_ITEMS, SEARCH_MAX_RESULTS)})"
+    },
+    "cursor": {
+        "type": "string",
+        "description": "Opaque next_cursor from a previous call, to resume the search"
+    },
+    "fields": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Only return these fields of each result (e.g. [\"number\", \"title\"])"
+    }
+}
+
+SCHEMAS = [
+    {
+        "name": "github.search_issues",
+        "description": "Search issues and pull requests with GitHub's search API; filtering happens at GitHub",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                **_SCOPE_PROPERTIES,
+                "type": {"type": "string", "enum": ["issue", "pr"], "default": "issue", "description": "Search issues or pull requests"},
+                "state": {"type": "string", "enum": ["open", "closed"]},
+                "merged": {"type": "boolean", "description": "Only merged (true) or unmerged (false) pull requests; implies type pr"},
+                "labels": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Results must carry all of these labels"
+                },
+                "author": {"type": "string"},
+                "assignee": {"type": "string"},
+                "mentions": {"type": "string"},
+                "created": {"type": "string", "description": "Date or range, e.g. \">=2024-01-01\" or \"2024-01-01..2024-02-01\""},
+                "updated": {"type": "string", "description": "Date or range, as for created"},
+                "in": {"type": "string", "enum": ["title", "body", "comments", "title,body"], "description": "Where the free text must match"},
+                "sort": {"type": "string", "enum": ["comments", "reactions", "interactions", "created", "updated"]},
+                "order": {"type": "string", "enum": ["asc", "desc"], "default": "desc"},
+                **_PAGING_PROPERTIES
+            }
+        }
+    },
+    {
+        "name": "github.search_code",
+        "description": "Search code with GitHub's search API (default branches only)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                **_SCOPE_PROPERTIES,
+                "path": {"type": "string", "description": "Directory the file must be in"},
+                "filename": {"type": "string"},
+                "extension": {"type": "string", "description": "File extension without the dot"},
+                "language": {"type": "string"},
+                **_PAGING_PROPERTIES
+            },
+            "required": ["query"]
+        }
+    },
+    {
+        "name": "github.search_commits",
+        "description": "Search commits with GitHub's search API (default branches only)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                **_SCOPE_PROPERTIES,
+                "author": {"type": "string", "description": "Login of the commit author"},
+                "committer": {"type": "string", "description": "Login of the committer"},
+                "author_date": {"type": "string", "description": "Date or range, e.g. \">=2024-01-01\""},
+                "committer_date": {"type": "string", "description": "Date or range"},
+                "merge": {"type": "boolean", "description": "Only merge commits (true) or non-merge commits (false)"},
+                "sort": {"type": "string", "enum": ["author-date", "committer-date"]},
+                "order": {"type": "string", "enum": ["asc", "desc"], "default": "desc"},
+                **_PAGING_PROPERTIES
+            }
+        }
+    }
+]
+
+def _qualifier(name: str, value) -> str:
+    value = str(value)
+    if _NEEDS_QUOTES.search(value):
+        value = '"%s"' % value.replace('"', "")
+    return f"{name}:{value}"
+
+def build_query(args: dict, qualifiers: dict) -> str:
+    """
+    Build a search `q` from the free text and the structured arguments.
+    `qualifiers` maps argument names to GitHub qualifier names; list values
+    repeat the qualifier, so every value must match.
+    """
+    parts = [args["query"]] if args.get("query") else []
+    if args.get("repo") and args.get("owner"):
+        parts.append(_qualifier("repo", f"{args['owner']}/{args['repo']}"))
+    elif args.get("owner"):
+        parts.append(_qualifier("user", args["owner"]))
+    for arg, name in qualifiers.items():
+        value = args.get(arg)
+        if value is None or value == "":
+            continue
+        for v in value if isinstance(value, list) else [value]:
+            parts.append(_qualifier(name, v))
+    return " ".join(parts)
+
+async def _search(kind: str, args: dict, token: str, query: str, serializer):
+    if not query:
+        return {"error": "Invalid arguments: pass query or at least one qualifier"}
+    params = {"q": query}
+    if args.get("sort"):
+        params["sort"] = args["sort"]
+        params["order"] = args.get("order", "desc")
+    limit = safe_limit(args.get("limit", 30), min(MAX_ITEMS, SEARCH_MAX_RESULTS))
+    fields = args.get("fields")
+    page = await paginate(
+        f"search/{kind}", token, params=params, limit=limit, cursor=args.get("cursor"),
+        stream_as=page_serializer(serializer, fields), accept=TEXT_MATCH_MEDIA_TYPE
+    )
+    return serialize_page(page, serializer, fields)
+
+async def search_issues(args: dict, token: str):
+    query = build_query(args, {
+        "state": "state",
+        "labels": "label",
+        "author": "author",
+        "assignee": "assignee",
+        "mentions": "mentions",
+        "created": "created",
+        "updated": "updated",
+        "in": "in",
+    })
+    # GitHub rejects issue searches that name neither issues nor pull requests
+    kind = "pr" if "merged" in args else args.get("type", "issue")
+    if not _ISSUE_KIND.search(args.get("query") or ""):
+        query = f"{query} is:{kind}".strip()
+    if "merged" in args:
+        query += " is:merged" if args["merged"] else " is:unmerged"
+    return await _search("issues", args, token, query, serialize_search_issue)
+
+async def search_code(args: dict, token: str):
+    query = build_query(args, {
+        "path": "path",
+        "filename": "filename",
+        "extension": "extension",
+        "language": "language",
+    })
+    return await _search("code", args, token, query, serialize_search_code)
+
+async def search_commits(args: dict, token: str):
+    query = build_query(args, {
+        "author": "author",
+        "committer": "committer",
+        "author_date": "author-date",
+        "committer_date": "committer-date",
+    })
+    if "merge" in args:
+        query = f"{query} merge:{'true' if args['merge'] else 'false'}".strip()
+    return await _search("commits", args, token, query, serialize_search_commit)
+
+HANDLERS = {
+    "github.search_issues": search_issues,
+    "github.search_code": search_code,
+    "github.search_commits": search_commits
+}
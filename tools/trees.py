@@ -0,0 +1,77 @@
+from itertools import islice
+from config import safe_limit, MAX_ITEMS
+import tree_index
+
+SCHEMAS = [
+    {
+        "name": "github.list_tree",
+        "description": "List files and directories of a repository at a ref from a cached tree index (one request per commit)",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "ref": {"type": "string", "description": "Branch, tag or commit SHA (default: the default branch)"},
+                "path": {"type": "string", "description": "Directory to list (default: repository root)"},
+                "recursive": {"type": "boolean", "default": False, "description": "Include everything below the directory"},
+                "limit": {"type": "integer", "default": 200, "description": f"Max entries (max {MAX_ITEMS})"},
+                "offset": {"type": "integer", "minimum": 0, "default": 0, "description": "Entries to skip, from a previous next_offset"}
+            },
+            "required": ["owner", "repo"]
+        }
+    },
+    {
+        "name": "github.find_files",
+        "description": "Find files in a repository by glob pattern and/or path prefix without walking directories",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "ref": {"type": "string", "description": "Branch, tag or commit SHA (default: the default branch)"},
+                "pattern": {"type": "string", "description": "Glob, e.g. '*.py', 'src/**/test_*.py'. Without '/', matches file names at any depth."},
+                "prefix": {"type": "string", "description": "Only search below this directory"},
+                "type": {"type": "string", "enum": ["blob", "tree"], "default": "blob", "description": "blob for files, tree for directories"},
+                "limit": {"type": "integer", "default": 100, "description": f"Max results (max {MAX_ITEMS})"}
+            },
+            "required": ["owner", "repo"]
+        }
+    }
+]
+
+def _listing(index, indices, limit: int, offset: int = 0) -> dict:
+    window = list(islice(indices, offset, offset + limit + 1))
+    more = len(window) > limit
+    return {
+        "sha": index.sha,
+        "entries": [index.entry(i) for i in window[:limit]],
+        "next_offset": offset + limit if more else None,
+        # GitHub cuts very large trees; the index then only covers part of the repository
+        "truncated": index.truncated
+    }
+
+async def list_tree(args: dict, token: str):
+    owner = args["owner"]
+    repo = args["repo"]
+    path = args.get("path", "")
+    index = await tree_index.get_index(owner, repo, args.get("ref"), token)
+    if isinstance(index, dict):
+        return index
+    if not index.is_dir(path):
+        return {"error": f"Not a directory: '{path}'"}
+    indices = index.under(path) if args.get("recursive") else index.children(path)
+    return _listing(index, indices, safe_limit(args.get("limit", 200), MAX_ITEMS), args.get("offset", 0))
+
+async def find_files(args: dict, token: str):
+    owner = args["owner"]
+    repo = args["repo"]
+    index = await tree_index.get_index(owner, repo, args.get("ref"), token)
+    if isinstance(index, dict):
+        return index
+    indices = index.find(args.get("pattern"), args.get("prefix", ""), args.get("type", "blob"))
+    return _listing(index, indices, safe_limit(args.get("limit", 100), MAX_ITEMS))
+
+HANDLERS = {
+    "github.list_tree": list_tree,
+    "github.find_files": find_files
+}
@@ -0,0 +1,171 @@
+import re
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+
+from config import TREE_INDEX_MAX_TREES, TREE_INDEX_MAX_PATHS
+from github_api import make_request
+from utils.cache import LRUCache
+import metrics
+
+SHA_MEDIA_TYPE = "application/vnd.github.sha"
+FULL_SHA = re.compile(r"^[0-9a-f]{40}$")
+
+_TYPE_CODES = {"blob": ord("b"), "tree": ord("t"), "commit": ord("c")}
+_TYPE_NAMES = {code: name for name, code in _TYPE_CODES.items()}
+
+class TreeIndex:
+    """
+    Compact, sorted index of every path in a commit's tree.
+    Paths are kept in one sorted tuple with parallel typed arrays for the
+    entry type, size and 20-byte binary SHA, instead of a dict per entry.
+    """
+
+    __slots__ = ("sha", "paths", "types", "sizes", "shas", "truncated")
+
+    def __init__(self, sha: str, entries: list, truncated: bool = False):
+        entries = sorted(entries, key=lambda e: e["path"])
+        self.sha = sha
+        self.paths = tuple(e["path"] for e in entries)
+        self.types = bytes(_TYPE_CODES.get(e.get("type"), ord("b")) for e in entries)
+        self.sizes = array("q", (e.get("size", -1) for e in entries))
+        self.shas = b"".join(bytes.fromhex(e["sha"]) for e in entries)
+        self.truncated = truncated
+
+    def __len__(self):
+        return len(self.paths)
+
+    def entry(self, i: int) -> dict:
+        path = self.paths[i]
+        kind = _TYPE_NAMES[self.types[i]]
+        result = {
+            "name": path.rsplit("/", 1)[-1],
+            "path": path,
+            "type": "dir" if kind == "tree" else "file" if kind == "blob" else "submodule",
+            "sha": self.shas[i * 20:(i + 1) * 20].hex(),
+        }
+        if self.sizes[i] >= 0:
+            result["size"] = self.sizes[i]
+        return result
+
+    def lookup(self, path: str):
+        """Index of an exact path, or None."""
+        path = path.strip("/")
+        i = bisect_left(self.paths, path)
+        if i < len(self.paths) and self.paths[i] == path:
+            return i
+        return None
+
+    def blob_sha(self, path: str):
+        """Blob SHA of a file path, or None if it is not a file in this tree."""
+        i = self.lookup(path)
+        if i is None or _TYPE_NAMES[self.types[i]] != "blob":
+            return None
+        return self.shas[i * 20:(i + 1) * 20].hex()
+
+    def is_dir(self, path: str) -> bool:
+        path = path.strip("/")
+        if not path:
+            return True
+        i = self.lookup(path)
+        return i is not None and _TYPE_NAMES[self.types[i]] == "tree"
+
+    def under(self, directory: str):
+        """Indices of every path below a directory ("" for the whole tree)."""
+        prefix = directory.strip("/")
+        if not prefix:
+            return range(len(self.paths))
+        prefix += "/"
+        # "/" sorts right before "0", so the subtree is one contiguous slice
+        start = bisect_left(self.paths, prefix)
+        end = bisect_left(self.paths, prefix[:-1] + "0", start)
+        return range(start, end)
+
+    def children(self, directory: str):
+        """Indices of the immediate children of a directory."""
+        depth = directory.strip("/").count("/") + 1 if directory.strip("/") else 0
+        return (i for i in self.under(directory) if self.paths[i].count("/") == depth)
+
+    def find(self, pattern: str = None, prefix: str = "", kind: str = None):
+        """Indices under `prefix` whose path matches a glob pattern and type."""
+        matcher = _glob(pattern) if pattern else None
+        code = _TYPE_CODES.get(kind) if kind else None
+        for i in self.under(prefix):
+            if code is not None and self.types[i] != code:
+                continue
+            if matcher is not None and not matcher(self.paths[i]):
+                continue
+            yield i
+
+@lru_cache(maxsize=256)
+def _glob(pattern: str):
+    """
+    Compile a glob into a path matcher: `*` and `?` stay within one path
+    segment, `**` spans directories. A pattern without "/" matches the file
+    name at any depth (like .gitignore).
+    """
+    regex = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            regex.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            regex.append("[^/]")
+            i += 1
+        else:
+            regex.append(re.escape(pattern[i]))
+            i += 1
+    compiled = re.compile("".join(regex) + r"\Z")
+    if "/" in pattern:
+        return lambda path: compiled.match(path) is not None
+    return lambda path: compiled.match(path.rsplit("/", 1)[-1]) is not None
+
+# A commit's tree never changes, so indexes never expire; they are only evicted for space
+_indexes = LRUCache(TREE_INDEX_MAX_TREES, max_weight=TREE_INDEX_MAX_PATHS, weigh=len)
+metrics.CACHES.register("tree_index", _indexes)
+# Repositories that currently have an index, so unrelated calls skip ref resolution
+_repos_with_index = LRUCache(TREE_INDEX_MAX_TREES * 4)
+
+async def resolve_ref(owner: str, repo: str, ref: str, token: str):
+    """
+    Resolve a branch, tag or SHA to a full commit SHA.
+    Uses the SHA media type, so the response is 40 bytes and usually a free 304.
+    The call is made even for full SHAs so access to the repository is checked.
+    """
+    sha = await make_request("GET", f"repos/{owner}/{repo}/commits/{ref or 'HEAD'}", token, accept=SHA_MEDIA_TYPE)
+    if isinstance(sha, dict):
+        return sha
+    sha = sha.strip()
+    if not FULL_SHA.match(sha):
+        return {"error": "GitHub API failure", "details": f"Could not resolve ref '{ref}'"}
+    return sha
+
+def cached_index(owner: str, repo: str, sha: str):
+    return _indexes.get((owner.lower(), repo.lower(), sha))
+
+def has_index(owner: str, repo: str) -> bool:
+    return _repos_with_index.get((owner.lower(), repo.lower())) is not None
+
+async def get_index(owner: str, repo: str, ref: str, token: str):
+    """Return the TreeIndex for a ref, fetching `git/trees/{sha}?recursive=1` at most once per commit."""
+    sha = await resolve_ref(owner, repo, ref, token)
+    if isinstance(sha, dict):
+        return sha
+    index = cached_index(owner, repo, sha)
+    if index is not None:
+        return index
+
+    raw = await make_request("GET", f"repos/{owner}/{repo}/git/trees/{sha}", token, params={"recursive": "1"})
+    if isinstance(raw, dict) and "error" in raw:
+        return raw
+    index = TreeIndex(sha, raw.get("tree", []), truncated=raw.get("truncated", False))
+    _indexes.set((owner.lower(), repo.lower(), sha), index)
+    _repos_with_index.set((owner.lower(), repo.lower()), True)
+    return index
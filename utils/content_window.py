@@ -0,0 +1,94 @@
+import base64
+
+class ContentWindow:
+    """
+    Incrementally consume file content and keep only a byte range or a line window.
+    Memory use is bounded by the window (capped at `max_bytes`), not by the file size.
+
+    Byte mode: `offset` / `limit` (bytes).
+    Line mode: `start_line` / `end_line` (1-based, inclusive).
+    """
+
+    def __init__(self, offset=None, limit=None, start_line=None, end_line=None, max_bytes: int = 1_000_000):
+        self.line_mode = start_line is not None or end_line is not None
+        self.max_bytes = max_bytes
+        self.offset = max(0, offset or 0)
+        self.limit = min(limit or max_bytes, max_bytes)
+        self.start_line = max(1, start_line or 1)
+        self.end_line = end_line
+        self.size = 0
+        self.newlines = 0
+        self.truncated = False
+        self.binary = False
+        self._last_byte = b""
+        self._kept = bytearray()
+
+    def feed(self, chunk) -> None:
+        if not chunk:
+            return
+        chunk = bytes(chunk)
+        if self.size == 0 and b"\0" in chunk[:8000]:
+            self.binary = True
+        if self.line_mode:
+            self._feed_lines(chunk)
+        else:
+            self._feed_bytes(chunk)
+        self.size += len(chunk)
+        self.newlines += chunk.count(b"\n")
+        self._last_byte = chunk[-1:]
+
+    def _keep(self, data: bytes):
+        room = self.max_bytes - len(self._kept)
+        if len(data) > room:
+            data = data[:room]
+            self.truncated = True
+        self._kept += data
+
+    def _feed_bytes(self, chunk: bytes):
+        start = max(self.offset - self.size, 0)
+        end = min(self.offset + self.limit - self.size, len(chunk))
+        if start < end:
+            self._keep(chunk[start:end])
+
+    def _feed_lines(self, chunk: bytes):
+        line = self.newlines + 1
+        if self.end_line is not None and line > self.end_line:
+            return
+        # Skip whole chunks that end before the window starts
+        if line + chunk.count(b"\n") < self.start_line:
+            return
+        pos = 0
+        while pos < len(chunk):
+            nl = chunk.find(b"\n", pos)
+            end = len(chunk) if nl == -1 else nl + 1
+            if line >= self.start_line:
+                self._keep(chunk[pos:end])
+            if nl == -1:
+                break
+            line += 1
+            pos = end
+            if self.end_line is not None and line > self.end_line:
+                break
+
+    @property
+    def line_count(self) -> int:
+        if self.size == 0:
+            return 0
+        return self.newlines + (0 if self._last_byte == b"\n" else 1)
+
+    def result(self) -> dict:
+        if self.binary:
+            content, encoding = base64.b64encode(bytes(self._kept)).decode(), "base64"
+        else:
+            content, encoding = bytes(self._kept).decode("utf-8", errors="replace"), "utf-8"
+        if self.line_mode:
+            window = {"start_line": self.start_line, "end_line": self.end_line}
+        else:
+            window = {"offset": self.offset, "limit": self.limit}
+        return {
+            "content": content,
+            "encoding": encoding,
+            "window": window,
+            "window_bytes": len(self._kept),
+            "truncated": self.truncated,
+        }
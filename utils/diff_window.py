@@ -0,0 +1,130 @@
+import re
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@")
+
+class DiffWindow:
+    """
+    Incrementally parse a unified (git) diff line by line, indexing it by file
+    and hunk. Every file is summarized (path, status, +/- counts, hunk count);
+    only the hunks of the selected files and hunk range are kept, capped at
+    `max_bytes`, so memory is bounded by the window, not by the diff size.
+
+    `paths`: files to keep hunks for (None for all).
+    `hunk_start` / `hunk_end`: hunk range within each file (1-based, inclusive).
+    """
+
+    def __init__(self, paths=None, hunk_start=None, hunk_end=None, max_bytes: int = 100_000, keep_hunks: bool = True):
+        self.paths = set(paths) if paths else None
+        self.hunk_start = max(1, hunk_start or 1)
+        self.hunk_end = hunk_end
+        self.max_bytes = max_bytes
+        self.keep_hunks = keep_hunks
+        self.files = []
+        self.kept = []
+        self.kept_bytes = 0
+        self.truncated = False
+        self._file = None
+        self._hunk = None
+        self._in_hunk = False
+
+    def _start_file(self, line: str):
+        # "diff --git a/<old> b/<new>"; the ---/+++ lines refine it when present
+        old, _, new = line[len("diff --git "):].partition(" b/")
+        self._file = {
+            "path": new,
+            "status": "modified",
+            "additions": 0,
+            "deletions": 0,
+            "hunks": 0,
+        }
+        if old[2:] != new:
+            self._file["old_path"] = old[2:]
+        self.files.append(self._file)
+        self._hunk = None
+        self._in_hunk = False
+
+    def _selected(self) -> bool:
+        if not self.keep_hunks or (self.paths is not None and self._file["path"] not in self.paths):
+            return False
+        index = self._file["hunks"]
+        return index >= self.hunk_start and (self.hunk_end is None or index <= self.hunk_end)
+
+    def _start_hunk(self, line: str):
+        self._file["hunks"] += 1
+        self._in_hunk = True
+        self._hunk = None
+        if not self._selected() or self.truncated:
+            return
+        if self.kept_bytes + len(line) + 1 > self.max_bytes:
+            self.truncated = True
+            return
+        if not self.kept or self.kept[-1]["path"] != self._file["path"]:
+            self.kept.append({"path": self._file["path"], "hunks": []})
+        self._hunk = {"index": self._file["hunks"], "header": line, "lines": []}
+        self.kept[-1]["hunks"].append(self._hunk)
+        self.kept_bytes += len(line) + 1
+
+    def _header_line(self, line: str):
+        f = self._file
+        if line.startswith("new file mode"):
+            f["status"] = "added"
+        elif line.startswith("deleted file mode"):
+            f["status"] = "removed"
+        elif line.startswith("rename from "):
+            f["status"] = "renamed"
+            f["old_path"] = line[len("rename from "):]
+        elif line.startswith("rename to "):
+            f["path"] = line[len("rename to "):]
+        elif line.startswith("Binary files ") or line == "GIT binary patch":
+            f["binary"] = True
+        elif line.startswith("+++ b/"):
+            f["path"] = line[len("+++ b/"):]
+
+    def feed(self, line: str) -> None:
+        line = line.rstrip("\r\n")
+        if line.startswith("diff --git "):
+            self._start_file(line)
+            return
+        if self._file is None:
+            return
+        if line.startswith("@@") and _HUNK_HEADER.match(line):
+            self._start_hunk(line)
+            return
+        if not self._in_hunk:
+            self._header_line(line)
+            return
+
+        if line.startswith("+"):
+            self._file["additions"] += 1
+        elif line.startswith("-"):
+            self._file["deletions"] += 1
+        if self._hunk is not None:
+            if self.kept_bytes + len(line) + 1 > self.max_bytes:
+                self.truncated = True
+                self._hunk["truncated"] = True
+                self._hunk = None
+                return
+            self._hunk["lines"].append(line)
+            self.kept_bytes += len(line) + 1
+
+    def summary(self) -> list:
+        return self.files
+
+    def result(self) -> dict:
+        diff = [
+            {
+                "path": kept["path"],
+                "hunks": [
+                    {"index": h["index"], "header": h["header"], "text": "\n".join(h["lines"]),
+                     **({"truncated": True} if h.get("truncated") else {})}
+                    for h in kept["hunks"]
+                ],
+            }
+            for kept in self.kept
+        ]
+        return {
+            "files": self.files,
+            "diff": diff,
+            "diff_bytes": self.kept_bytes,
+            "truncated": self.truncated,
+        }
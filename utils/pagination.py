@@ -0,0 +1,103 @@
+import base64
+import json
+from urllib.parse import urlencode
+
+from config import GITHUB_API_BASE_URL
+
+def parse_link_header(value: str) -> dict:
+    """
+    Parse an RFC 8288 Link header into a {rel: url} mapping.
+    e.g. '<https://api.github.com/x?page=2>; rel="next"' -> {"next": "https://..."}
+    """
+    links = {}
+    if not value:
+        return links
+    for part in value.split(","):
+        section = part.split(";")
+        url = section[0].strip()
+        if not (url.startswith("<") and url.endswith(">")):
+            continue
+        for param in section[1:]:
+            name, _, rel = param.strip().partition("=")
+            if name == "rel":
+                for r in rel.strip('"').split():
+                    links[r] = url[1:-1]
+    return links
+
+def relative_endpoint(url: str):
+    """
+    Turn an absolute API URL from a Link header into an endpoint for make_request.
+    URLs on any other host are rejected so a token is never sent elsewhere.
+    """
+    base = GITHUB_API_BASE_URL.rstrip("/") + "/"
+    if not url or not url.startswith(base):
+        return None
+    return url[len(base):]
+
+def with_query(endpoint: str, params: dict = None) -> str:
+    if not params:
+        return endpoint
+    return f"{endpoint}?{urlencode(params)}"
+
+def _encode(state: dict) -> str:
+    raw = json.dumps(state, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def _decode(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        return None
+    return state if isinstance(state, dict) else None
+
+def encode_cursor(endpoint: str, page_endpoint: str, offset: int = 0) -> str:
+    """
+    Cursor for resuming `endpoint` at `page_endpoint` (a Link next URL), `offset` items in.
+    Only the page's query is kept: GitHub's Link URLs often use another path for
+    the same listing (repositories/{id}/issues for repos/{owner}/{repo}/issues).
+    """
+    _, _, query = page_endpoint.partition("?")
+    return _encode({"e": endpoint.lstrip("/"), "q": query, "o": offset})
+
+def encode_graphql_cursor(listing: str, after: str) -> str:
+    return _encode({"l": listing, "a": after})
+
+def cursor_backend(cursor: str):
+    """Return "rest" or "graphql" for a cursor from this module, None if malformed or absent."""
+    state = _decode(cursor) if cursor else None
+    if state is None:
+        return None
+    if "e" in state:
+        return "rest"
+    if "a" in state:
+        return "graphql"
+    return None
+
+def decode_graphql_cursor(cursor: str, listing: str):
+    """Return the GraphQL `after` value of a cursor, or None if it belongs to another listing."""
+    state = _decode(cursor)
+    if not state or state.get("l") != listing or not isinstance(state.get("a"), str):
+        return None
+    return state["a"]
+
+def decode_cursor(cursor: str, endpoint: str):
+    """
+    Decode a cursor produced by encode_cursor.
+    Returns (page_endpoint, offset), with the page addressed under `endpoint`'s
+    path, or None if the cursor is malformed or belongs to a different listing.
+    """
+    state = _decode(cursor)
+    try:
+        listing = state["e"]
+        query = state.get("q", "")
+        offset = int(state.get("o", 0))
+    except Exception:
+        return None
+    if not isinstance(listing, str) or not isinstance(query, str) or offset < 0:
+        return None
+    endpoint = endpoint.lstrip("/")
+    if listing != endpoint:
+        return None
+    path = endpoint.split("?", 1)[0]
+    return (f"{path}?{query}" if query else path), offset
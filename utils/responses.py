@@ -0,0 +1,59 @@
+import gzip
+import json
+
+from config import MCP_GZIP_LEVEL, MCP_BROTLI_QUALITY
+
+# Both are optional speedups; the stdlib encoder and gzip are the fallbacks
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def dumps(obj) -> bytes:
+    """Encode a JSON-RPC payload to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # Integers beyond 64 bits, non-str keys, ...: let the stdlib handle them
+            pass
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+def _accepted(accept_encoding: str) -> dict:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    accepted = {}
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+def negotiate_encoding(accept_encoding: str):
+    """Pick "br" or "gzip" for a response, or None to send it uncompressed."""
+    accepted = _accepted(accept_encoding)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=MCP_BROTLI_QUALITY)
+    # mtime=0 keeps the output deterministic for identical bodies
+    return gzip.compress(body, compresslevel=MCP_GZIP_LEVEL, mtime=0)
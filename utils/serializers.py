@@ -1,3 +1,6 @@
+import base64
+import binascii
+
 def safe_list(data, serializer):
     """
     Apply a serializer safely to either a single object or a list of objects.
@@ -8,6 +11,40 @@ def safe_list(data, serializer):
         return serializer(data)
     return [serializer(item) for item in data]
 
+def project(obj, fields=None):
+    """
+    Keep only the requested keys of a serialized object.
+    Unknown field names are ignored; no `fields` keeps everything.
+    """
+    if not fields or not isinstance(obj, dict) or "error" in obj:
+        return obj
+    return {k: v for k, v in obj.items() if k in fields}
+
+def serialize_page(page: dict, serializer=None, fields=None) -> dict:
+    """
+    Serialize the items of a paginated result from github_api.paginate,
+    passing error results through unchanged.
+    """
+    if "error" in page:
+        return page
+    result = {
+        "items": page_serializer(serializer, fields)(page["items"]),
+        "next_cursor": page["next_cursor"]
+    }
+    if "streamed" in page:
+        result["streamed"] = page["streamed"]
+    return result
+
+def page_serializer(serializer=None, fields=None):
+    """Return a function serializing one page of raw items, for streamed listings."""
+    def serialize(items: list) -> list:
+        if serializer:
+            items = safe_list(items, serializer)
+        if fields:
+            items = [project(item, fields) for item in items]
+        return items
+    return serialize
+
 def serialize_user(user: dict) -> dict:
     if not isinstance(user, dict):
         return user
@@ -56,6 +93,47 @@ def serialize_issue(issue: dict) -> dict:
         "body": issue.get("body", "")
     }
 
+def _text_matches(item: dict):
+    """Highlights of a search result requested with the text-match media type."""
+    return [
+        {
+            "property": m.get("property"),
+            "fragment": m.get("fragment"),
+            "matches": [match.get("text") for match in m.get("matches", [])]
+        }
+        for m in item.get("text_matches") or []
+    ]
+
+def serialize_search_issue(item: dict) -> dict:
+    if not isinstance(item, dict):
+        return item
+    result = serialize_issue(item)
+    result["type"] = "pull_request" if "pull_request" in item else "issue"
+    result["repository"] = "/".join((item.get("repository_url") or "").split("/")[-2:])
+    result["labels"] = [l.get("name") for l in item.get("labels") or []]
+    result["text_matches"] = _text_matches(item)
+    return result
+
+def serialize_search_code(item: dict) -> dict:
+    if not isinstance(item, dict):
+        return item
+    return {
+        "name": item.get("name"),
+        "path": item.get("path"),
+        "sha": item.get("sha"),
+        "repository": (item.get("repository") or {}).get("full_name"),
+        "url": item.get("html_url") or item.get("url"),
+        "text_matches": _text_matches(item)
+    }
+
+def serialize_search_commit(item: dict) -> dict:
+    if not isinstance(item, dict):
+        return item
+    result = serialize_commit(item)
+    result["repository"] = (item.get("repository") or {}).get("full_name")
+    result["text_matches"] = _text_matches(item)
+    return result
+
 def serialize_pull_request(pr: dict) -> dict:
     if not isinstance(pr, dict):
         return pr
@@ -70,7 +148,68 @@ def serialize_pull_request(pr: dict) -> dict:
         "url": pr.get("html_url") or pr.get("url"),
         "created_at": pr.get("created_at"),
         "merged": pr.get("merged", False),
-        "author": author
+        "author": author,
+        # REST listings leave mergeable_state, additions and deletions null
+        "mergeable_state": pr.get("mergeable_state"),
+        "head_sha": (pr.get("head") or {}).get("sha"),
+        "base_sha": (pr.get("base") or {}).get("sha"),
+        "additions": pr.get("additions"),
+        "deletions": pr.get("deletions")
+    }
+
+def _truncate(text, limit: int):
+    if text and len(text) > limit:
+        return text[:limit] + "\n...[Truncated]..."
+    return text
+
+def serialize_pull_request_file(file_obj: dict, patch_limit: int = 2000) -> dict:
+    if not isinstance(file_obj, dict):
+        return file_obj
+
+    return {
+        "filename": file_obj.get("filename"),
+        "status": file_obj.get("status"),
+        "additions": file_obj.get("additions"),
+        "deletions": file_obj.get("deletions"),
+        "previous_filename": file_obj.get("previous_filename"),
+        "patch": _truncate(file_obj.get("patch"), patch_limit)
+    }
+
+def serialize_review(review: dict) -> dict:
+    if not isinstance(review, dict):
+        return review
+
+    return {
+        "id": review.get("id"),
+        "author": (review.get("user") or {}).get("login", ""),
+        "state": review.get("state"),
+        "submitted_at": review.get("submitted_at"),
+        "body": _truncate(review.get("body"), 2000)
+    }
+
+def serialize_review_comment(comment: dict) -> dict:
+    if not isinstance(comment, dict):
+        return comment
+
+    return {
+        "id": comment.get("id"),
+        "author": (comment.get("user") or {}).get("login", ""),
+        "path": comment.get("path"),
+        "line": comment.get("line") or comment.get("original_line"),
+        "in_reply_to": comment.get("in_reply_to_id"),
+        "created_at": comment.get("created_at"),
+        "body": _truncate(comment.get("body"), 2000)
+    }
+
+def serialize_check_run(run: dict) -> dict:
+    if not isinstance(run, dict):
+        return run
+
+    return {
+        "name": run.get("name"),
+        "status": run.get("status"),
+        "conclusion": run.get("conclusion"),
+        "url": run.get("html_url") or run.get("details_url")
     }
 
 def serialize_commit(commit_obj: dict) -> dict:
@@ -97,13 +236,22 @@ def serialize_file(file_obj: dict) -> dict:
         return file_obj
         
     content = file_obj.get("content", "")
+    encoding = file_obj.get("encoding")
+    # Decode before truncating so the caller gets readable text, not a cut base64 string
+    if content and encoding == "base64":
+        try:
+            content = base64.b64decode(content).decode("utf-8")
+            encoding = "utf-8"
+        except (binascii.Error, UnicodeDecodeError):
+            pass
     if content and len(content) > 5000:
-        content = content[:5000] + "\n...[Content Truncated]..."
+        content = content[:5000] + "\n...[Content Truncated; use offset/limit or start_line/end_line to read more]..."
         
     return {
         "name": file_obj.get("name"),
         "path": file_obj.get("path"),
+        "sha": file_obj.get("sha"),
         "size": file_obj.get("size"),
         "content": content,
-        "encoding": file_obj.get("encoding")
+        "encoding": encoding
     }
@@ -0,0 +1,91 @@
+import re
+
+class ValidationError(ValueError):
+    pass
+
+_INTEGER = re.compile(r"-?[0-9]+")
+
+_TYPE_NAMES = {
+    "string": "a string",
+    "integer": "an integer",
+    "number": "a number",
+    "boolean": "a boolean",
+    "array": "an array",
+    "object": "an object",
+}
+
+def _check_type(type_: str, value):
+    """Return the value (coerced where lossless) if it matches a JSON Schema type, else raise."""
+    if type_ == "string" and isinstance(value, str):
+        return value
+    if type_ == "integer":
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        # Agents frequently send numbers as strings; the handlers always accepted that
+        # ASCII digits only: isdigit() also accepts characters int() rejects, such as "²"
+        if isinstance(value, str) and _INTEGER.fullmatch(value.strip()):
+            return int(value)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+    if type_ == "number" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    if type_ == "boolean" and isinstance(value, bool):
+        return value
+    if type_ == "array" and isinstance(value, list):
+        return value
+    if type_ == "object" and isinstance(value, dict):
+        return value
+    raise ValidationError(_TYPE_NAMES.get(type_, type_))
+
+def compile_schema(schema: dict):
+    """
+    Compile a (subset of) JSON Schema into a validator function.
+    The returned function takes (value, path) and returns the value, with
+    lossless coercions applied, or raises ValidationError.
+    Supported keywords: type, enum, properties, required, items, minimum, maximum.
+    """
+    type_ = schema.get("type")
+    enum = schema.get("enum")
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    properties = {
+        name: compile_schema(sub) for name, sub in schema.get("properties", {}).items()
+    }
+    required = tuple(schema.get("required", ()))
+    items = compile_schema(schema["items"]) if "items" in schema else None
+
+    def validate(value, path):
+        if type_:
+            try:
+                value = _check_type(type_, value)
+            except ValidationError as e:
+                raise ValidationError(f"'{path}' must be {e}")
+        if enum is not None and value not in enum:
+            raise ValidationError(f"'{path}' must be one of {enum}")
+        if minimum is not None and value < minimum:
+            raise ValidationError(f"'{path}' must be >= {minimum}")
+        if maximum is not None and value > maximum:
+            raise ValidationError(f"'{path}' must be <= {maximum}")
+        if isinstance(value, dict) and (properties or required):
+            for name in required:
+                if name not in value:
+                    raise ValidationError(f"'{path}.{name}' is required")
+            coerced = None
+            for name, check in properties.items():
+                if name in value:
+                    checked = check(value[name], f"{path}.{name}")
+                    if checked is not value[name]:
+                        coerced = coerced or dict(value)
+                        coerced[name] = checked
+            if coerced is not None:
+                value = coerced
+        if items is not None and isinstance(value, list):
+            value = [items(item, f"{path}[{i}]") for i, item in enumerate(value)]
+        return value
+
+    return validate
+
+def compile_validator(schema: dict):
+    """Compile a tool input_schema into a function that validates a tool's arguments."""
+    validate = compile_schema(schema)
+    return lambda args: validate(args, "arguments")
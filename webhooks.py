@@ -0,0 +1,85 @@
+import asyncio
+import hashlib
+import hmac
+import json
+
+import redis.asyncio as redis
+
+from config import GITHUB_WEBHOOK_SECRET
+from tokens import redis_client
+import github_api
+
+# Workers publish {"owner", "repo", "areas"} here so every worker drops the same entries
+WEBHOOK_INVALIDATION_CHANNEL = "github_webhook_invalidate"
+
+# Cached areas (see github_api._AREAS) each event can make stale
+EVENT_AREAS = {
+    # The repository's open_issues_count changes with issues and pull requests
+    "issues": ("issues", "repo"),
+    "pull_request": ("pulls", "issues", "repo"),
+    # Comments on pull requests go through the issues API and show in their comment counts
+    "issue_comment": ("issues", "pulls"),
+    "pull_request_review": ("pulls",),
+    "pull_request_review_comment": ("pulls",),
+    "pull_request_review_thread": ("pulls",),
+    # Checks and statuses are read through commits/{ref}/...
+    "check_run": ("code",),
+    "check_suite": ("code",),
+    "status": ("code",),
+    # A push moves branches and can change the head of open pull requests
+    "push": ("code", "pulls", "repo"),
+    "create": ("code", "repo"),
+    "delete": ("code", "repo"),
+}
+
+def verify_signature(body: bytes, signature: str) -> bool:
+    """Check the X-Hub-Signature-256 header against the shared webhook secret."""
+    if not GITHUB_WEBHOOK_SECRET or not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(GITHUB_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature[len("sha256="):])
+
+async def handle_event(event: str, payload: dict) -> dict:
+    """Invalidate the cached responses an event makes stale, on every worker."""
+    areas = EVENT_AREAS.get(event)
+    full_name = (payload.get("repository") or {}).get("full_name") or ""
+    owner, _, repo = full_name.partition("/")
+    if not areas or not owner or not repo:
+        return {"success": True, "event": event, "invalidated": []}
+
+    github_api.invalidate(owner, repo, areas)
+    try:
+        await redis_client.publish(
+            WEBHOOK_INVALIDATION_CHANNEL,
+            json.dumps({"owner": owner, "repo": repo, "areas": list(areas)}),
+        )
+    except (redis.RedisError, OSError):
+        pass
+    return {"success": True, "event": event, "repository": full_name, "invalidated": list(areas)}
+
+async def listen_for_invalidations():
+    """
+    Apply invalidations from webhooks received by other workers.
+    Runs for the lifetime of the app; cached responses are only served
+    without revalidation while it is subscribed.
+    """
+    while True:
+        pubsub = redis_client.pubsub()
+        try:
+            await pubsub.subscribe(WEBHOOK_INVALIDATION_CHANNEL)
+            github_api.set_invalidations_live(True)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    data = json.loads(message["data"])
+                    github_api.invalidate(data["owner"], data["repo"], data["areas"])
+                except (ValueError, KeyError, TypeError):
+                    continue
+        except (redis.RedisError, OSError):
+            pass
+        finally:
+            # Changes may be missed while disconnected, so always revalidate until then
+            github_api.set_invalidations_live(False)
+            await pubsub.aclose()
+        await asyncio.sleep(1)